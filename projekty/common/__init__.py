@@ -0,0 +1,3 @@
+# Kod wspolny dla pow_blockchain i pos_blockchain: magazyn i czytnik blokow,
+# drzewo forkow, stan kont, transakcje i podpisy, mempool, wezel asyncio,
+# symulator sieci, instrumentacja i harness benchmarkow.
@@ -0,0 +1,172 @@
+from typing import Dict, List, Tuple
+
+
+class InsufficientFunds(ValueError):
+    pass
+
+
+class InvalidNonce(ValueError):
+    pass
+
+
+class AccountState:
+    """
+    Stan kont (saldo na nazwe konta) aktualizowany przyrostowo blok po bloku.
+    Dla kazdego zastosowanego bloku pamietany jest log cofania (poprzednie
+    salda i nonce zmienionych kont), wiec reorganizacja cofa tylko odlaczone
+    bloki. Co `snapshot_every` blokow zapisywane jest zdjecie stanu, z ktorego
+    mozna szybko odtworzyc stan na dowolnej wysokosci.
+
+    Podpisana transakcja musi miec nonce rowny liczbie wczesniej zatwierdzonych
+    podpisanych transakcji nadawcy - ta sama transakcja nie przejdzie drugi raz.
+    Transakcje bez podpisu (stare scenariusze) nie maja nonce.
+    """
+    def __init__(self, balances: Dict[str, float] = None, snapshot_every: int = 100,
+                 nonces: Dict[str, int] = None):
+        self.balances: Dict[str, float] = dict(balances or {})
+        self.nonces: Dict[str, int] = dict(nonces or {})  # nadawca -> nastepny oczekiwany nonce
+        self.height = 0
+        self.snapshot_every = snapshot_every
+        # block_hash -> (poprzednie salda, poprzednie nonce)
+        self.undo_logs: Dict[str, Tuple[Dict[str, float], Dict[str, int]]] = {}
+        self.snapshots: Dict[int, Tuple[Dict[str, float], Dict[str, int]]] = {0: (dict(self.balances), dict(self.nonces))}
+
+    def balance(self, name: str) -> float:
+        return self.balances.get(name, 0.0)
+
+    def nonce(self, name: str) -> int:
+        return self.nonces.get(name, 0)
+
+    def compute_changes(self, transactions) -> Tuple[Dict[str, float], Dict[str, int]]:
+        """
+        Liczy nowe salda i nonce kont zmienionych przez transakcje, bez modyfikacji
+        stanu. Rzuca InsufficientFunds, gdy nadawcy brakuje srodkow, i InvalidNonce,
+        gdy podpisana transakcja nie ma kolejnego nonce nadawcy.
+        """
+        balances = self.balances
+        nonces = self.nonces
+        changes: Dict[str, float] = {}
+        nonce_changes: Dict[str, int] = {}
+        for tx in transactions:
+            amount = tx.amount
+            fee = tx.fee
+            if amount < 0 or fee < 0:
+                raise ValueError(f"Ujemna kwota transakcji: {tx}")
+            sender = tx.sender
+            if tx.signature is not None:
+                expected = nonce_changes[sender] if sender in nonce_changes else nonces.get(sender, 0)
+                if tx.nonce != expected:
+                    raise InvalidNonce(f"{sender}: nonce {tx.nonce}, oczekiwany {expected}")
+                nonce_changes[sender] = expected + 1
+            sender_balance = changes[sender] if sender in changes else balances.get(sender, 0.0)
+            if sender_balance < amount + fee:
+                raise InsufficientFunds(f"{sender} ma {sender_balance}, a wysyla {amount} (+ oplata {fee})")
+            # oplata jest spalana - bloki nie maja konta kopacza
+            changes[sender] = sender_balance - amount - fee
+            receiver = tx.receiver
+            changes[receiver] = (changes[receiver] if receiver in changes else balances.get(receiver, 0.0)) + amount
+        return changes, nonce_changes
+
+    def select(self, transactions):
+        """
+        Dzieli transakcje na mozliwe do wykonania po kolei i odrzucone
+        (brak srodkow, ujemna kwota, zuzyty nonce) - bez modyfikacji stanu.
+        Podpisana transakcja z nonce z przyszlosci czeka na poprzedniczke
+        z tej samej listy; bez niej nie jest ani przyjeta, ani odrzucona
+        (zostaje w mempoolu).
+        """
+        balances = self.balances
+        nonces = self.nonces
+        changes: Dict[str, float] = {}
+        nonce_changes: Dict[str, int] = {}
+        waiting: Dict[str, Dict[int, object]] = {}  # nadawca -> nonce -> transakcja
+        accepted, rejected = [], []
+        for tx in transactions:
+            ready = [tx]
+            while ready:
+                tx = ready.pop()
+                sender = tx.sender
+                if tx.signature is not None:
+                    expected = nonce_changes[sender] if sender in nonce_changes else nonces.get(sender, 0)
+                    if tx.nonce < expected:
+                        rejected.append(tx)
+                        continue
+                    if tx.nonce > expected:
+                        waiting.setdefault(sender, {})[tx.nonce] = tx
+                        continue
+                sender_balance = changes[sender] if sender in changes else balances.get(sender, 0.0)
+                if tx.amount < 0 or tx.fee < 0 or sender_balance < tx.amount + tx.fee:
+                    rejected.append(tx)
+                    continue
+                changes[sender] = sender_balance - tx.amount - tx.fee
+                receiver = tx.receiver
+                changes[receiver] = (changes[receiver] if receiver in changes else balances.get(receiver, 0.0)) + tx.amount
+                accepted.append(tx)
+                if tx.signature is not None:
+                    nonce_changes[sender] = tx.nonce + 1
+                    follower = waiting.get(sender, {}).pop(tx.nonce + 1, None)
+                    if follower is not None:
+                        ready.append(follower)
+        return accepted, rejected
+
+    def check_block(self, block):
+        self.compute_changes(block.transactions)
+
+    def apply_block(self, block):
+        changes, nonce_changes = self.compute_changes(block.transactions)
+        balances = self.balances
+        nonces = self.nonces
+        # None oznacza konto, ktorego przed blokiem nie bylo
+        self.undo_logs[block.block_hash] = (
+            {name: balances.get(name) for name in changes},
+            {name: nonces.get(name) for name in nonce_changes}
+        )
+        balances.update(changes)
+        nonces.update(nonce_changes)
+        self.height = block.index
+        if self.height % self.snapshot_every == 0:
+            self.snapshots[self.height] = (dict(balances), dict(nonces))
+
+    def revert_block(self, block):
+        undo_balances, undo_nonces = self.undo_logs.pop(block.block_hash)
+        for values, undo in ((self.balances, undo_balances), (self.nonces, undo_nonces)):
+            for name, previous in undo.items():
+                if previous is None:
+                    del values[name]
+                else:
+                    values[name] = previous
+        self.snapshots.pop(block.index, None)
+        self.height = block.index - 1
+
+    def apply_reorg(self, disconnected: List, connected: List):
+        """
+        Cofa odlaczone bloki (od najnowszego) i stosuje dolaczone. Gdy ktorys
+        z dolaczanych blokow jest niepoprawny, stan wraca do punktu wyjscia.
+        """
+        for block in reversed(disconnected):
+            self.revert_block(block)
+        applied = []
+        try:
+            for block in connected:
+                self.apply_block(block)
+                applied.append(block)
+        except ValueError:
+            for block in reversed(applied):
+                self.revert_block(block)
+            for block in disconnected:
+                self.apply_block(block)
+            raise
+
+    def state_at(self, height: int, chain: List) -> Dict[str, float]:
+        """
+        Salda na wysokosci `height` glownego lancucha `chain`: najblizsze
+        wczesniejsze zdjecie stanu plus odtworzenie blokow od tego miejsca.
+        """
+        base = max(h for h in self.snapshots if h <= height)
+        balances, nonces = self.snapshots[base]
+        replay = AccountState(balances, snapshot_every=self.snapshot_every, nonces=nonces)
+        for block in chain[base + 1:height + 1]:
+            changes, nonce_changes = replay.compute_changes(block.transactions)
+            replay.balances.update(changes)
+            replay.nonces.update(nonce_changes)
+        return replay.balances
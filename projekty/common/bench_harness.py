@@ -0,0 +1,288 @@
+import os
+import csv
+import sys
+import json
+import time
+import random
+import argparse
+import itertools
+import inspect
+import platform
+import statistics
+import contextlib
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List
+from common.cpus import available_cpus
+
+# kwantyle t-Studenta 0.975 (dwustronny 95% przedzial ufnosci) dla df = 1..30
+T_975 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]
+
+# kierunek metryk przy porownaniu; pozostale (np. liczby blokow walidatorow)
+# sa tylko informacyjne i nie sa oznaczane jako regresja
+HIGHER_IS_BETTER = {"tps", "hashrate"}
+LOWER_IS_BETTER = {"seconds", "block_seconds", "fork_seconds", "cpu_time", "rss_mb", "ctx_switches"}
+
+
+def summarize(values: List[float]) -> dict:
+    """
+    Srednia, odchylenie standardowe i 95% przedzial ufnosci sredniej (t-Studenta).
+    """
+    n = len(values)
+    mean = statistics.mean(values)
+    if n < 2:
+        return {"n": n, "mean": mean, "stdev": 0.0, "ci_low": mean, "ci_high": mean}
+    stdev = statistics.stdev(values)
+    # powyzej 30 stopni swobody rozklad t jest bliski normalnemu
+    t = T_975[n - 2] if n - 1 <= len(T_975) else 1.96
+    half = t * stdev / n ** 0.5
+    return {"n": n, "mean": mean, "stdev": stdev, "ci_low": mean - half, "ci_high": mean + half}
+
+
+def describe(summary: dict, digits: int = 3) -> str:
+    """
+    "srednia ± polowa przedzialu ufnosci" do wydrukow scenariuszy.
+    """
+    half = summary["ci_high"] - summary["mean"]
+    return f"{summary['mean']:.{digits}f} ± {half:.{digits}f} (95% CI, n={summary['n']})"
+
+
+def sweep(grid: Dict[str, list]) -> Iterator[dict]:
+    """
+    Wszystkie kombinacje parametrow: {"difficulty": [3, 4], "workers": [1, 2]} -> 4 zestawy.
+    """
+    names = list(grid)
+    for values in itertools.product(*(grid[name] for name in names)):
+        yield dict(zip(names, values))
+
+
+@contextlib.contextmanager
+def quiet(enabled: bool = True):
+    # komunikaty lancucha nie trafiaja do terminala w trakcie pomiaru
+    if not enabled:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def repetition_seeds(repetitions: int, seed: int = None) -> List[int]:
+    """
+    Ziarno dla kazdego powtorzenia wyprowadzone z jednego ziarna bazowego -
+    wyniki nie zaleza od tego, ktory proces wykonal ktore powtorzenie.
+    """
+    rng = random.Random(seed)
+    return [rng.getrandbits(32) for _ in range(repetitions)]
+
+
+def _warm_up(case: Callable[..., dict], params: dict, warmup: int, silent: bool):
+    # przy jobs > 1 wywolywane raz w kazdym procesie roboczym
+    for _ in range(warmup):
+        with quiet(silent):
+            case(**params)
+
+
+def _repetition(case: Callable[..., dict], params: dict, seed: int, silent: bool) -> dict:
+    random.seed(seed)
+    with quiet(silent):
+        return case(**params)
+
+
+def run_case(case: Callable[..., dict], params: dict, repetitions: int = 5, warmup: int = 1,
+             silent: bool = True, jobs: int = 1, seed: int = None) -> Dict[str, List[float]]:
+    """
+    Wywoluje case(**params) warmup razy bez zapisu, potem `repetitions` razy.
+    Przypadek sam oddziela przygotowanie od mierzonego fragmentu i zwraca
+    slownik metryk z jednego powtorzenia; tu zbierane sa tylko wyniki.
+    jobs > 1 - powtorzenia rozdzielane na pule procesow. Kazdy przypadek mierzy
+    zasoby we wlasnym procesie (ResourceSampler), wiec czas CPU i RSS dotycza
+    jednego powtorzenia; przypadki z wlasna pula procesow (workers > 0)
+    warto wtedy uruchamiac z jobs * workers <= liczba rdzeni.
+    """
+    # case musi byc funkcja z poziomu modulu (pickle) przy jobs > 1
+    seeds = repetition_seeds(repetitions, seed)
+    if jobs > 1 and repetitions > 1:
+        with ProcessPoolExecutor(min(jobs, repetitions), initializer=_warm_up,
+                                 initargs=(case, params, warmup, silent)) as pool:
+            results = list(pool.map(_repetition, repeat(case), repeat(params), seeds, repeat(silent)))
+    else:
+        _warm_up(case, params, warmup, silent)
+        results = [_repetition(case, params, s, silent) for s in seeds]
+
+    metrics: Dict[str, List[float]] = {}
+    for result in results:
+        for name, value in result.items():
+            metrics.setdefault(name, []).append(float(value))
+    return metrics
+
+
+def make_entry(name: str, params: dict, metrics: Dict[str, List[float]]) -> dict:
+    return {
+        "case": name,
+        "params": params,
+        "metrics": {metric: summarize(values) for metric, values in metrics.items()},
+        "samples": metrics,
+    }
+
+
+def run_suite(cases: Dict[str, Callable[..., dict]], grids: Dict[str, Dict[str, list]],
+              repetitions: int = 5, warmup: int = 1, progress: bool = True,
+              jobs: int = 1, seed: int = None) -> List[dict]:
+    results = []
+    for name, case in cases.items():
+        for params in sweep(grids.get(name, {})):
+            started = time.perf_counter()
+            entry = make_entry(name, params, run_case(case, params, repetitions, warmup, jobs=jobs, seed=seed))
+            results.append(entry)
+            if progress:
+                print(f"[bench] {name} {params} ({time.perf_counter() - started:.1f} s): " + ", ".join(
+                    f"{metric}={s['mean']:.4g}±{s['mean'] - s['ci_low']:.2g}" for metric, s in entry["metrics"].items()))
+    return results
+
+
+def environment() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "cpus_available": available_cpus(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def write_results(path: str, results: List[dict], meta: dict = None):
+    """
+    JSON (pelne wyniki z probkami) albo CSV (wiersz na metryke) - wg rozszerzenia.
+    """
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["case", "params", "metric", "n", "mean", "stdev", "ci_low", "ci_high"])
+            for entry in results:
+                params = json.dumps(entry["params"], sort_keys=True)
+                for metric, s in entry["metrics"].items():
+                    writer.writerow([entry["case"], params, metric, s["n"], s["mean"], s["stdev"], s["ci_low"], s["ci_high"]])
+        return
+    with open(path, "w") as f:
+        json.dump({"meta": meta or environment(), "results": results}, f, indent=2)
+
+
+def load_results(path: str) -> Dict[tuple, dict]:
+    """
+    Wczytuje wyniki (JSON lub CSV) jako {(case, params, metric): podsumowanie}.
+    """
+    summaries = {}
+    if path.endswith(".csv"):
+        with open(path, newline="") as f:
+            for row in csv.DictReader(f):
+                key = (row["case"], row["params"], row["metric"])
+                summaries[key] = {k: float(row[k]) for k in ("n", "mean", "stdev", "ci_low", "ci_high")}
+        return summaries
+    with open(path) as f:
+        for entry in json.load(f)["results"]:
+            params = json.dumps(entry["params"], sort_keys=True)
+            for metric, s in entry["metrics"].items():
+                summaries[(entry["case"], params, metric)] = s
+    return summaries
+
+
+def compare(baseline_path: str, current_path: str, threshold: float = 0.05) -> List[dict]:
+    """
+    Porownuje dwa pliki wynikow. Regresja to pogorszenie sredniej o wiecej niz
+    `threshold` (wzglednie) przy rozlacznych przedzialach ufnosci.
+    """
+    baseline = load_results(baseline_path)
+    current = load_results(current_path)
+    rows = []
+    for key in sorted(baseline.keys() & current.keys()):
+        base, cur = baseline[key], current[key]
+        change = (cur["mean"] - base["mean"]) / abs(base["mean"]) if base["mean"] else 0.0
+        if key[2] in HIGHER_IS_BETTER:
+            worse = -change
+        elif key[2] in LOWER_IS_BETTER:
+            worse = change
+        else:
+            worse = 0.0
+        separated = cur["ci_high"] < base["ci_low"] or cur["ci_low"] > base["ci_high"]
+        rows.append({
+            "case": key[0], "params": key[1], "metric": key[2],
+            "baseline": base["mean"], "current": cur["mean"], "change": change,
+            "regression": worse > threshold and separated,
+            "improvement": -worse > threshold and separated,
+        })
+    return rows
+
+
+def parse_value(text: str):
+    for kind in (int, float):
+        try:
+            return kind(text)
+        except ValueError:
+            pass
+    if text in ("true", "false"):
+        return text == "true"
+    return text
+
+
+def accepts(case: Callable[..., dict], param: str) -> bool:
+    # czy przypadek przyjmuje parametr (wprost albo przez **kwargs)
+    parameters = inspect.signature(case).parameters
+    return param in parameters or any(p.kind is p.VAR_KEYWORD for p in parameters.values())
+
+
+def main(cases: Dict[str, Callable[..., dict]], default_grids: Dict[str, Dict[str, list]], argv: List[str] = None):
+    """
+    Wspolny interfejs benchmark.py:
+        run [--case NAZWA] [--sweep param=1,2] [--repetitions N] [--warmup N] [--jobs N] [--seed N]
+            [--output plik.json|.csv]
+        compare stary.json nowy.json [--threshold 0.05]
+    Kod wyjscia 1 w trybie compare oznacza wykryta regresje.
+    """
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run")
+    run.add_argument("--case", action="append", choices=sorted(cases))
+    run.add_argument("--sweep", action="append", default=[], help="param=v1,v2 - nadpisuje siatke domyslna przypadkow z tym parametrem")
+    run.add_argument("--repetitions", type=int, default=5)
+    run.add_argument("--warmup", type=int, default=1)
+    run.add_argument("--jobs", type=int, default=1, help="procesy dla powtorzen (0 - liczba rdzeni)")
+    run.add_argument("--seed", type=int, help="ziarno bazowe powtorzen (powtarzalne wyniki)")
+    run.add_argument("--output", default="bench_results.json")
+    cmp = sub.add_parser("compare")
+    cmp.add_argument("baseline")
+    cmp.add_argument("current")
+    cmp.add_argument("--threshold", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    if args.command == "compare":
+        regressions = 0
+        for row in compare(args.baseline, args.current, args.threshold):
+            flag = "REGRESJA" if row["regression"] else ("poprawa" if row["improvement"] else "")
+            regressions += row["regression"]
+            print(f"{row['case']:18s} {row['params']:40s} {row['metric']:14s} "
+                  f"{row['baseline']:12.4g} -> {row['current']:12.4g} ({row['change']:+.1%}) {flag}")
+        print(f"\nRegresje: {regressions}")
+        sys.exit(1 if regressions else 0)
+
+    selected = {name: cases[name] for name in (args.case or cases)}
+    grids = {name: dict(default_grids.get(name, {})) for name in selected}
+    for item in args.sweep:
+        param, values = item.split("=", 1)
+        # parametr trafia tylko do przypadkow, ktore go przyjmuja
+        targets = [name for name in grids if accepts(selected[name], param)]
+        if not targets:
+            parser.error(f"--sweep {param}: zaden z wybranych przypadkow nie przyjmuje tego parametru")
+        skipped = sorted(grids.keys() - set(targets))
+        if skipped:
+            print(f"[bench] --sweep {param} pominiety dla: {', '.join(skipped)}")
+        for name in targets:
+            grids[name][param] = [parse_value(v) for v in values.split(",")]
+    jobs = args.jobs or available_cpus()
+    results = run_suite(selected, grids, args.repetitions, args.warmup, jobs=jobs, seed=args.seed)
+    meta = dict(environment(), jobs=jobs, seed=args.seed, repetitions=args.repetitions, warmup=args.warmup)
+    write_results(args.output, results, meta)
+    print(f"[bench] Wyniki zapisane do {args.output}")
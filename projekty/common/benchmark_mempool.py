@@ -0,0 +1,88 @@
+import sys
+import time
+import random
+import threading
+import tracemalloc
+from common.mempool import Mempool, PriorityMempool
+from common.transaction import Transaction
+
+
+class DictTransaction:
+    # dawna postac Transaction (z __dict__) dla porownania
+    def __init__(self, sender: str, receiver: str, amount: float):
+        self.sender = sender
+        self.receiver = receiver
+        self.amount = amount
+
+
+def random_fields(count: int):
+    for _ in range(count):
+        yield f"User_{random.randint(1, 100)}", f"User_{random.randint(1, 100)}", random.uniform(0.1, 10.0)
+
+
+def measure(build, count: int) -> float:
+    """
+    Zwraca pamiec (MB) zajeta przez strukture zbudowana przez `build`.
+    """
+    random.seed(0)
+    tracemalloc.start()
+    result = build(count)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current / 1024 / 1024
+
+
+def ingest_rate(count: int, batch: int = 1000, block_count: int = 2000) -> float:
+    """
+    Przepustowosc dopisywania do PriorityMempool (tx/s), gdy w tle drugi
+    watek caly czas buduje szablony blokow i usuwa zatwierdzone transakcje.
+    """
+    random.seed(0)
+    transactions = [Transaction(s, r, a, fee=random.uniform(0.0, 1.0)) for s, r, a in random_fields(count)]
+    for tx in transactions:
+        tx.txid  # txid liczony poza pomiarem, jak dla transakcji z sieci
+    mempool = PriorityMempool(max_bytes=50 * 1024 * 1024)
+    done = threading.Event()
+
+    def miner():
+        while not done.is_set():
+            mempool.remove(tx.txid for tx in mempool.build_template(max_count=block_count))
+            time.sleep(0.01)
+
+    thread = threading.Thread(target=miner)
+    thread.start()
+    start = time.perf_counter()
+    for i in range(0, count, batch):
+        mempool.add_many(transactions[i:i + batch])
+    elapsed = time.perf_counter() - start
+    done.set()
+    thread.join()
+    return count / elapsed
+
+
+def main():
+    # uzycie (z katalogu projekty): python -m common.benchmark_mempool [liczba_transakcji]
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    builds = {
+        "lista (dict)": lambda n: [DictTransaction(s, r, a) for s, r, a in random_fields(n)],
+        "lista (__slots__)": lambda n: [Transaction(s, r, a) for s, r, a in random_fields(n)],
+        "Mempool kolumnowy": lambda n: Mempool(Transaction(s, r, a) for s, r, a in random_fields(n)),
+    }
+
+    print(f"=== Pamięć mempoola dla {count} transakcji ===")
+    baseline = None
+    for name, build in builds.items():
+        mb = measure(build, count)
+        if baseline is None:
+            baseline = mb
+        print(f"{name:20s} {mb:10.1f} MB  ({mb / baseline * 100:.0f}% listy obiektów)")
+
+    rate = ingest_rate(min(count, 500_000))
+    print(f"\n=== PriorityMempool: dopisywanie przy równoległym budowaniu bloków ===")
+    print(f"{rate:,.0f} tx/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import sys
+import time
+import random
+from common.account_state import AccountState
+from common.transaction import Transaction
+
+
+class BenchBlock:
+    # minimalny blok - stan kont potrzebuje tylko index, block_hash i transakcji
+    def __init__(self, index: int, transactions):
+        self.index = index
+        self.block_hash = f"block-{index}"
+        self.transactions = transactions
+
+
+def main():
+    # uzycie (z katalogu projekty): python -m common.benchmark_state [transakcje_w_bloku] [liczba_blokow] [liczba_kont]
+    tx_per_block = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    num_blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+    num_accounts = int(sys.argv[3]) if len(sys.argv) > 3 else 10_000
+
+    random.seed(0)
+    accounts = [f"User_{i}" for i in range(num_accounts)]
+    state = AccountState({name: 1e9 for name in accounts}, snapshot_every=5)
+    blocks = [
+        BenchBlock(i, [Transaction(random.choice(accounts), random.choice(accounts), random.uniform(0.1, 10.0))
+                       for _ in range(tx_per_block)])
+        for i in range(1, num_blocks + 1)
+    ]
+
+    print(f"=== Stan kont: {tx_per_block} transakcji/blok, {num_blocks} bloków, {num_accounts} kont ===")
+    start_t = time.perf_counter()
+    for block in blocks:
+        state.apply_block(block)
+    apply_time = time.perf_counter() - start_t
+
+    start_t = time.perf_counter()
+    for block in reversed(blocks[num_blocks // 2:]):
+        state.revert_block(block)
+    revert_time = time.perf_counter() - start_t
+    reverted = num_blocks - num_blocks // 2
+
+    start_t = time.perf_counter()
+    state.state_at(num_blocks // 2, [None] + blocks)
+    rebuild_time = time.perf_counter() - start_t
+
+    total_tx = tx_per_block * num_blocks
+    print(f"Zastosowanie bloków: {apply_time:.3f} s ({total_tx / apply_time:,.0f} tx/s)")
+    print(f"Cofnięcie {reverted} bloków: {revert_time:.4f} s")
+    print(f"Odtworzenie stanu na wysokości {num_blocks // 2} ze zdjęcia: {rebuild_time:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+import os
+import sys
+import json
+import struct
+from array import array
+from typing import Callable, Dict, Iterator, List
+
+# naglowek rekordu: dlugosc JSON-a naglowka bloku i dlugosc JSON-a transakcji
+RECORD_HEADER = struct.Struct(">II")
+
+
+class BlockStore:
+    """
+    Magazyn blokow tylko do dopisywania. Kazdy blok to rekord z prefiksem
+    dlugosci: [dl. naglowka][dl. transakcji][JSON naglowka][JSON transakcji].
+    Obok pliku danych lezy indeks (`path + ".idx"`) z 64-bitowymi offsetami
+    rekordow, wiec odczyt bloku o danej wysokosci to O(1). fsync wykonywany
+    jest grupowo, co `fsync_every` dopisanych blokow.
+
+    Numer rekordu to wysokosc bloku w glownym lancuchu (ChainReader,
+    verify_blocks). Bloki bocznych galezi trafiaja do osobnego magazynu
+    (`path + ".side"`), a reorganizacja przenosi tam odlaczony sufiks
+    i obcina plik glowny - zob. write_insert.
+    """
+    def __init__(self, path: str, fsync_every: int = 16, truncate: bool = False):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.side_path = path + ".side"
+        self.fsync_every = fsync_every
+        self._unsynced = 0
+        self._side: "BlockStore" = None  # otwierany przy pierwszym bloku bocznym
+        if truncate:
+            for leftover in (self.side_path, self.side_path + ".idx"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+
+        mode = "w+b" if truncate or not os.path.exists(path) else "r+b"
+        self.data = open(path, mode)
+        self.offsets = array("Q")
+        if not truncate and os.path.exists(self.index_path):
+            self._load_index()
+        valid = self._recover()
+        # poprawna czesc indeksu zostaje, dopisujemy tylko odtworzone offsety
+        self.index = open(self.index_path, "r+b" if os.path.exists(self.index_path) else "w+b")
+        self.index.truncate(valid * self.offsets.itemsize)
+        self.index.seek(0, os.SEEK_END)
+        self._write_offsets(self.offsets[valid:])
+        self.index.flush()
+        self.data.seek(0, os.SEEK_END)
+
+    def _load_index(self):
+        with open(self.index_path, "rb") as f:
+            raw = f.read()
+        self.offsets.frombytes(raw[:len(raw) - len(raw) % self.offsets.itemsize])
+        if sys.byteorder == "big":  # indeks zapisujemy jako little-endian
+            self.offsets.byteswap()
+
+    def _write_offsets(self, offsets: array):
+        if sys.byteorder == "big":
+            offsets = array("Q", offsets)
+            offsets.byteswap()
+        self.index.write(offsets.tobytes())
+
+    def _recover(self) -> int:
+        """
+        Dopasowuje indeks do pliku danych: usuwa offsety spoza pliku, doczytuje
+        rekordy brakujace w indeksie i obcina niedokonczony ostatni rekord.
+        Zwraca liczbe offsetow z pliku indeksu, ktore pozostaja poprawne.
+        """
+        size = self.data.seek(0, os.SEEK_END)
+        while self.offsets and self.offsets[-1] >= size:
+            self.offsets.pop()
+
+        position = 0
+        if self.offsets:
+            position = self.offsets.pop()  # ostatni rekord sprawdzamy ponownie
+        valid = len(self.offsets)
+        while position + RECORD_HEADER.size <= size:
+            self.data.seek(position)
+            header_len, tx_len = RECORD_HEADER.unpack(self.data.read(RECORD_HEADER.size))
+            end = position + RECORD_HEADER.size + header_len + tx_len
+            if end > size:
+                break
+            self.offsets.append(position)
+            position = end
+
+        if position < size:  # przerwany zapis - ogon pliku nie jest pelnym rekordem
+            self.data.truncate(position)
+        return valid
+
+    def append(self, record: dict) -> int:
+        """
+        Dopisuje blok (slownik z Block.to_dict()) i zwraca jego numer w magazynie.
+        """
+        header = dict(record)
+        transactions = header.pop("transactions", [])
+        header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+        tx_bytes = json.dumps(transactions, separators=(",", ":")).encode("utf-8")
+
+        offset = self.data.tell()
+        self.data.write(RECORD_HEADER.pack(len(header_bytes), len(tx_bytes)))
+        self.data.write(header_bytes)
+        self.data.write(tx_bytes)
+        self.offsets.append(offset)
+        self._write_offsets(array("Q", [offset]))
+
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+        return len(self.offsets) - 1
+
+    def sync(self):
+        # najpierw dane, potem indeks - indeks nigdy nie wskazuje na niezapisany rekord
+        self.data.flush()
+        os.fsync(self.data.fileno())
+        self.index.flush()
+        os.fsync(self.index.fileno())
+        self._unsynced = 0
+        if self._side is not None:
+            self._side.sync()
+
+    def truncate(self, height: int):
+        """
+        Usuwa rekordy od wysokosci `height` (odlaczony sufiks glownego lancucha).
+        """
+        if height >= len(self.offsets):
+            return
+        # najpierw indeks - nie moze wskazywac poza obciety plik danych
+        self.index.flush()
+        self.index.truncate(height * self.offsets.itemsize)
+        self.index.seek(0, os.SEEK_END)
+        self.data.flush()
+        self.data.truncate(self.offsets[height])
+        self.data.seek(0, os.SEEK_END)
+        del self.offsets[height:]
+        self.sync()
+
+    def _side_store(self) -> "BlockStore":
+        if self._side is None:
+            self._side = BlockStore(self.side_path, self.fsync_every)
+        return self._side
+
+    def append_side(self, record: dict) -> int:
+        """
+        Dopisuje blok spoza glownego lancucha do magazynu bocznego.
+        """
+        return self._side_store().append(record)
+
+    def side_records(self) -> Iterator[dict]:
+        # bloki bocznych galezi w kolejnosci zapisu
+        if self._side is None and not os.path.exists(self.side_path):
+            return iter(())
+        return iter(self._side_store())
+
+    def write_insert(self, block, disconnected: List, connected: List, fork_height: int):
+        """
+        Zapisuje wynik BlockTree.insert (bloki z to_dict()): blok boczny trafia
+        do magazynu bocznego, przedluzenie - na koniec pliku glownego, a przy
+        reorganizacji odlaczone bloki przechodza do magazynu bocznego (utrwalone
+        przed obcieciem), plik glowny jest obcinany do punktu rozwidlenia
+        i dopisywana jest nowa galaz. `fork_height` to wysokosc pierwszego
+        dolaczonego bloku w drzewie - indeksom blokow magazyn nie ufa.
+        """
+        if not connected:
+            self.append_side(block.to_dict())
+            return
+        if disconnected:
+            for old in disconnected:
+                self.append_side(old.to_dict())
+            self._side_store().sync()
+            self.truncate(fork_height)
+        if len(self) != fork_height:
+            raise ValueError(f"Magazyn ma {len(self)} blokow, a galaz zaczyna sie na wysokosci {fork_height}")
+        for new in connected:
+            self.append(new.to_dict())
+
+    def load(self, from_dict: Callable[[dict], object], known: Callable[[str], bool]) -> Iterator:
+        """
+        Bloki do odtworzenia drzewa: glowny lancuch po kolei, potem bloki boczne.
+        Blok boczny zapisany przed swoim rodzicem (rodzic odlaczony pozniej)
+        czeka, az `known(prev_hash)` - rodzic trafi do drzewa wywolujacego.
+        """
+        for record in self:
+            yield from_dict(record)
+        waiting: Dict[str, list] = {}
+        for record in self.side_records():
+            ready = [from_dict(record)]
+            while ready:
+                block = ready.pop()
+                if not known(block.prev_hash):
+                    waiting.setdefault(block.prev_hash, []).append(block)
+                    continue
+                yield block
+                ready.extend(waiting.pop(block.block_hash, []))
+
+    def sync_main(self, main: List):
+        """
+        Po wczytaniu: sprowadza plik glowny do najlepszego lancucha `main`
+        (np. po przerwanej reorganizacji). Rozbieznosc moze byc tylko w sufiksie.
+        """
+        height = min(len(self), len(main))
+        while height > 0 and self.read(height - 1)["block_hash"] != main[height - 1].block_hash:
+            height -= 1
+        if height == len(self) and height == len(main):
+            return
+        for stale in range(height, len(self)):
+            self.append_side(self.read(stale))
+        if self._side is not None:
+            self._side.sync()
+        self.truncate(height)
+        for block in main[height:]:
+            self.append(block.to_dict())
+
+    def _read_at(self, offset: int) -> dict:
+        self.data.flush()
+        self.data.seek(offset)
+        header_len, tx_len = RECORD_HEADER.unpack(self.data.read(RECORD_HEADER.size))
+        record = json.loads(self.data.read(header_len))
+        record["transactions"] = json.loads(self.data.read(tx_len))
+        self.data.seek(0, os.SEEK_END)
+        return record
+
+    def read(self, height: int) -> dict:
+        return self._read_at(self.offsets[height])
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def __getitem__(self, height: int) -> dict:
+        return self.read(height)
+
+    def __iter__(self) -> Iterator[dict]:
+        # strumieniowo, rekord po rekordzie - bez ladowania calego pliku
+        for height in range(len(self.offsets)):
+            yield self.read(height)
+
+    def close(self):
+        if self.data.closed:
+            return
+        self.sync()
+        self.data.close()
+        self.index.close()
+        if self._side is not None:
+            self._side.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_blocks(path: str) -> Iterator[dict]:
+    """
+    Czyta rekordy bezposrednio z pliku danych, bez indeksu.
+    """
+    with open(path, "rb") as f:
+        while True:
+            raw = f.read(RECORD_HEADER.size)
+            if len(raw) < RECORD_HEADER.size:
+                break
+            header_len, tx_len = RECORD_HEADER.unpack(raw)
+            header = f.read(header_len)
+            transactions = f.read(tx_len)
+            if len(header) < header_len or len(transactions) < tx_len:
+                break
+            record = json.loads(header)
+            record["transactions"] = json.loads(transactions)
+            yield record
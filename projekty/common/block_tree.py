@@ -0,0 +1,89 @@
+from typing import Callable, Dict, List, Tuple
+
+
+class TreeNode:
+    __slots__ = ("block", "parent", "height", "cumulative")
+
+    def __init__(self, block, parent: "TreeNode", height: int, cumulative: float):
+        self.block = block
+        self.parent = parent
+        self.height = height
+        self.cumulative = cumulative  # laczna praca (PoW) lub waga stake'u (PoS) od genesis
+
+
+class BlockTree:
+    """
+    Drzewo blokow indeksowane hashem. Wybor galezi: wygrywa najwieksza
+    skumulowana waga (przy remisie zostaje galaz widziana wczesniej), co przy
+    wstawianiu kosztuje O(1). `main` to lista blokow najlepszego lancucha -
+    reorganizacja podmienia tylko rozbiezny sufiks, bez kopiowania prefiksu.
+    """
+    def __init__(self, genesis, weight: Callable[[object], float]):
+        self.weight = weight
+        root = TreeNode(genesis, None, 0, weight(genesis))
+        self.nodes: Dict[str, TreeNode] = {genesis.block_hash: root}
+        self.main: List = [genesis]
+        self.tip = root
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, block_hash: str) -> bool:
+        return block_hash in self.nodes
+
+    def get(self, block_hash: str):
+        return self.nodes[block_hash].block
+
+    def node(self, block_hash: str) -> TreeNode:
+        return self.nodes[block_hash]
+
+    def insert(self, block) -> Tuple[List, List]:
+        """
+        Wstawia blok pod jego rodzica (prev_hash); indeks bloku musi byc wysokoscia
+        rodzica + 1. Zwraca (odlaczone, dolaczone) bloki glownego lancucha - obie
+        listy puste, gdy blok trafil na boczna galaz.
+        """
+        if block.block_hash in self.nodes:
+            return [], []
+        parent = self.nodes.get(block.prev_hash)
+        if parent is None:
+            raise ValueError(f"Nieznany rodzic bloku {block.index}: {block.prev_hash}")
+        # indeks bloku to jego wysokosc - od niej zaleza pozycje w magazynie
+        if block.index != parent.height + 1:
+            raise ValueError(f"Blok {block.index}: indeks niezgodny z wysokoscia rodzica {parent.height}")
+
+        node = TreeNode(block, parent, parent.height + 1, parent.cumulative + self.weight(block))
+        self.nodes[block.block_hash] = node
+        if node.cumulative > self.tip.cumulative:
+            return self._switch_tip(node)
+        return [], []
+
+    def discard(self, block_hash: str, previous_tip: TreeNode):
+        """
+        Usuwa swiezo wstawiony lisc (np. odrzucony przez stan kont)
+        i przywraca poprzedni wierzcholek glownego lancucha.
+        """
+        node = self.nodes.pop(block_hash)
+        if self.tip is node:
+            self._switch_tip(previous_tip)
+
+    def _switch_tip(self, new_tip: TreeNode) -> Tuple[List, List]:
+        if new_tip.parent is self.tip:  # zwykle przedluzenie lancucha
+            self.main.append(new_tip.block)
+            self.tip = new_tip
+            return [], [new_tip.block]
+
+        # cofamy sie od nowego wierzcholka do wezla lezacego na glownym lancuchu
+        branch = []
+        node = new_tip
+        while not (node.height < len(self.main) and self.main[node.height] is node.block):
+            branch.append(node.block)
+            node = node.parent
+
+        fork_height = node.height + 1
+        disconnected = self.main[fork_height:]
+        del self.main[fork_height:]
+        branch.reverse()
+        self.main.extend(branch)
+        self.tip = new_tip
+        return disconnected, branch
@@ -0,0 +1,140 @@
+import os
+import mmap
+import json
+import struct
+from array import array
+from collections.abc import Sequence
+from common.block_store import RECORD_HEADER
+from common.transaction import Transaction
+
+INDEX_ENTRY = struct.Struct("<Q")
+
+
+class LazyTransactions(Sequence):
+    """
+    Lista transakcji bloku dekodowana z pliku dopiero przy pierwszym uzyciu.
+    """
+    def __init__(self, data: mmap.mmap, start: int, length: int):
+        self._data = data
+        self._start = start
+        self._length = length
+        self._items = None
+
+    def _load(self) -> list:
+        if self._items is None:
+            raw = self._data[self._start:self._start + self._length]
+            self._items = [Transaction.from_dict(tx) for tx in json.loads(raw)]
+        return self._items
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def __getitem__(self, key):
+        return self._load()[key]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __repr__(self):
+        return repr(self._load())
+
+
+class ChainReader(Sequence):
+    """
+    Czytnik lancucha zapisanego przez BlockStore, oparty na mmap. Offsety
+    czytane sa z zmapowanego pliku .idx, wiec otwarcie nie zalezy od dlugosci
+    lancucha. Obiekty Block powstaja dopiero przy dostepie (chain[i], wycinki,
+    iteracja), a ich transakcje - przy pierwszym odczycie. `block_class` to klasa
+    bloku projektu (Block z block.py albo block_pos.py).
+    """
+    def __init__(self, path: str, block_class):
+        self.path = path
+        self.block_class = block_class
+        self._file = open(path, "rb")
+        self._size = os.fstat(self._file.fileno()).st_size
+        self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self._size else b""
+
+        self._index_file = None
+        self._index = None
+        self._indexed = 0
+        index_path = path + ".idx"
+        if os.path.exists(index_path) and os.path.getsize(index_path) >= INDEX_ENTRY.size:
+            self._index_file = open(index_path, "rb")
+            self._index = mmap.mmap(self._index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._indexed = len(self._index) // INDEX_ENTRY.size
+            # indeks moze wyprzedzac dane po przerwanym zapisie
+            while self._indexed and not self._is_complete(self._offset(self._indexed - 1)):
+                self._indexed -= 1
+        # ...albo zostawac za nimi (awaria miedzy zapisem danych i indeksu) -
+        # rekordy za ostatnim zindeksowanym doczytujemy z pliku danych
+        self._tail = self._scan(self._record_end(self._offset(self._indexed - 1)) if self._indexed else 0)
+        self._count = self._indexed + len(self._tail)
+
+    def _scan(self, position: int) -> array:
+        # przejscie po naglowkach rekordow od `position`, bez dekodowania JSON
+        offsets = array("Q")
+        while self._is_complete(position):
+            offsets.append(position)
+            position = self._record_end(position)
+        return offsets
+
+    def _record_end(self, position: int) -> int:
+        header_len, tx_len = RECORD_HEADER.unpack_from(self._data, position)
+        return position + RECORD_HEADER.size + header_len + tx_len
+
+    def _is_complete(self, position: int) -> bool:
+        if position + RECORD_HEADER.size > self._size:
+            return False
+        return self._record_end(position) <= self._size
+
+    def _offset(self, height: int) -> int:
+        if height >= self._indexed:
+            return self._tail[height - self._indexed]
+        return INDEX_ENTRY.unpack_from(self._index, height * INDEX_ENTRY.size)[0]
+
+    def _materialize(self, height: int):
+        position = self._offset(height)
+        header_len, tx_len = RECORD_HEADER.unpack_from(self._data, position)
+        header_start = position + RECORD_HEADER.size
+        record = json.loads(self._data[header_start:header_start + header_len])
+        record["transactions"] = []
+        block = self.block_class.from_dict(record)
+        block.transactions = LazyTransactions(self._data, header_start + header_len, tx_len)
+        return block
+
+    def record(self, height: int) -> dict:
+        """
+        Surowy rekord bloku (jak Block.to_dict()) razem z transakcjami.
+        """
+        position = self._offset(range(self._count)[height])
+        header_len, tx_len = RECORD_HEADER.unpack_from(self._data, position)
+        header_start = position + RECORD_HEADER.size
+        record = json.loads(self._data[header_start:header_start + header_len])
+        record["transactions"] = json.loads(self._data[header_start + header_len:header_start + header_len + tx_len])
+        return record
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return [self._materialize(height) for height in range(self._count)[key]]
+        return self._materialize(range(self._count)[key])
+
+    def __iter__(self):
+        for height in range(self._count):
+            yield self._materialize(height)
+
+    def close(self):
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+        self._file.close()
+        if self._index is not None:
+            self._index.close()
+            self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
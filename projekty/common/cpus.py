@@ -0,0 +1,34 @@
+import os
+import math
+
+CGROUP_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+
+
+def cgroup_cpu_limit(path: str = CGROUP_CPU_MAX) -> int:
+    """
+    Limit CPU kontenera z cgroup v2 ("kwota okres", np. "200000 100000" -> 2);
+    None, gdy limitu nie ma albo plik nie istnieje.
+    """
+    try:
+        with open(path) as f:
+            quota, period = f.read().split()[:2]
+    except (OSError, ValueError):
+        return None
+    if quota == "max":
+        return None
+    return max(1, math.ceil(int(quota) / int(period)))
+
+
+def available_cpus() -> int:
+    """
+    Liczba rdzeni, ktorych proces moze faktycznie uzyc: maska affinity
+    (taskset, cpuset kontenera) ograniczona limitem cgroup. os.cpu_count()
+    liczy wszystkie rdzenie maszyny - pula wiekszego rozmiaru tylko przelacza
+    procesy zamiast przyspieszac.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    return min(cpus, limit) if limit else cpus
@@ -0,0 +1,129 @@
+"""
+Ed25519 (RFC 8032) w czystym Pythonie - bez zewnetrznych zaleznosci,
+wg implementacji referencyjnej z RFC. Wolne, ale wystarczajace do symulacji
+i do pomiaru kosztu weryfikacji podpisow.
+"""
+import hashlib
+import os
+
+p = 2 ** 255 - 19
+L = 2 ** 252 + 27742317777372353535851937790883648493
+d = -121665 * pow(121666, p - 2, p) % p
+SQRT_M1 = pow(2, (p - 1) // 4, p)
+
+
+def _sha512_int(data: bytes) -> int:
+    return int.from_bytes(hashlib.sha512(data).digest(), "little")
+
+
+# punkty w rozszerzonych wspolrzednych (X, Y, Z, T), x = X/Z, y = Y/Z, x*y = T/Z
+def _point_add(P, Q):
+    A = (P[1] - P[0]) * (Q[1] - Q[0]) % p
+    B = (P[1] + P[0]) * (Q[1] + Q[0]) % p
+    C = 2 * P[3] * Q[3] * d % p
+    D = 2 * P[2] * Q[2] % p
+    E, F, G, H = B - A, D - C, D + C, B + A
+    return (E * F % p, G * H % p, F * G % p, E * H % p)
+
+
+def _point_mul(s: int, P):
+    Q = (0, 1, 1, 0)  # punkt neutralny
+    while s > 0:
+        if s & 1:
+            Q = _point_add(Q, P)
+        P = _point_add(P, P)
+        s >>= 1
+    return Q
+
+
+def _point_equal(P, Q) -> bool:
+    if (P[0] * Q[2] - Q[0] * P[2]) % p != 0:
+        return False
+    return (P[1] * Q[2] - Q[1] * P[2]) % p == 0
+
+
+def _recover_x(y: int, sign: int):
+    if y >= p:
+        return None
+    x2 = (y * y - 1) * pow(d * y * y + 1, p - 2, p)
+    if x2 == 0:
+        return None if sign else 0
+    x = pow(x2, (p + 3) // 8, p)
+    if (x * x - x2) % p != 0:
+        x = x * SQRT_M1 % p
+    if (x * x - x2) % p != 0:
+        return None
+    if (x & 1) != sign:
+        x = p - x
+    return x
+
+
+_gy = 4 * pow(5, p - 2, p) % p
+_gx = _recover_x(_gy, 0)
+G = (_gx, _gy, 1, _gx * _gy % p)
+
+
+def _point_compress(P) -> bytes:
+    zinv = pow(P[2], p - 2, p)
+    x = P[0] * zinv % p
+    y = P[1] * zinv % p
+    return int.to_bytes(y | ((x & 1) << 255), 32, "little")
+
+
+def _point_decompress(s: bytes):
+    if len(s) != 32:
+        return None
+    y = int.from_bytes(s, "little")
+    sign = y >> 255
+    y &= (1 << 255) - 1
+    x = _recover_x(y, sign)
+    if x is None:
+        return None
+    return (x, y, 1, x * y % p)
+
+
+def _secret_expand(secret: bytes):
+    if len(secret) != 32:
+        raise ValueError("Klucz prywatny Ed25519 ma 32 bajty")
+    h = hashlib.sha512(secret).digest()
+    a = int.from_bytes(h[:32], "little")
+    a &= (1 << 254) - 8
+    a |= (1 << 254)
+    return a, h[32:]
+
+
+def generate_private_key() -> bytes:
+    return os.urandom(32)
+
+
+def public_key(secret: bytes) -> bytes:
+    a, _ = _secret_expand(secret)
+    return _point_compress(_point_mul(a, G))
+
+
+def sign(secret: bytes, message: bytes) -> bytes:
+    a, prefix = _secret_expand(secret)
+    A = _point_compress(_point_mul(a, G))
+    r = _sha512_int(prefix + message) % L
+    R = _point_compress(_point_mul(r, G))
+    h = _sha512_int(R + A + message) % L
+    s = (r + h * a) % L
+    return R + int.to_bytes(s, 32, "little")
+
+
+def verify(public: bytes, message: bytes, signature: bytes) -> bool:
+    if len(public) != 32 or len(signature) != 64:
+        return False
+    A = _point_decompress(public)
+    if A is None:
+        return False
+    R = _point_decompress(signature[:32])
+    if R is None:
+        return False
+    s = int.from_bytes(signature[32:], "little")
+    if s >= L:
+        return False
+    h = _sha512_int(signature[:32] + public + message) % L
+    sB = _point_mul(s, G)
+    hA = _point_mul(h, A)
+    return _point_equal(sB, _point_add(R, hA))
@@ -0,0 +1,53 @@
+import hashlib
+import struct
+from common.merkle import MerkleTree
+
+# wersje schematu haszowania bloku
+HASH_V1 = 1  # stary schemat: konkatenacja str() pol bez separatorow
+HASH_V2 = 2  # binarny naglowek o stalym ukladzie
+HASH_V3 = 3  # PoW: HASH_V2 z 32-bajtowym celem trudnosci przed nonce
+
+# wersja | index | timestamp | prev_hash | korzen Merkle'a transakcji
+# nonce (PoW) lub id walidatora (PoS) dopisywane jest na koncu, dzieki czemu
+# prefiks naglowka jest staly podczas kopania
+HEADER_PREFIX = struct.Struct(">BQd32s32s")
+NONCE = struct.Struct(">Q")
+VALIDATOR_ID_SIZE = 32
+
+
+def hash_to_bytes(value: str) -> bytes:
+    """
+    Zamienia hash hex (64 znaki) na 32 bajty. Inne napisy (np. prev_hash="0"
+    w bloku genesis) sa haszowane, zeby pole zawsze mialo 32 bajty.
+    """
+    if len(value) == 64:
+        try:
+            return bytes.fromhex(value)
+        except ValueError:
+            pass
+    return hashlib.sha256(value.encode("utf-8")).digest()
+
+
+def transactions_root(transactions) -> bytes:
+    return MerkleTree(tx.serialize() for tx in transactions).root()
+
+
+# naglowki pakowane sa do lokalnego bufora - wezel kopie w watku executora,
+# a petla zdarzen w tym samym czasie haszuje bloki z sieci
+def header_prefix(index: int, timestamp: float, prev_hash: str, tx_root: bytes, target: bytes = None) -> bytes:
+    # z celem (Target.threshold) naglowek HASH_V3 zatwierdza trudnosc, ktora blok deklaruje
+    if target is None:
+        return HEADER_PREFIX.pack(HASH_V2, index, timestamp, hash_to_bytes(prev_hash), tx_root)
+    return HEADER_PREFIX.pack(HASH_V3, index, timestamp, hash_to_bytes(prev_hash), tx_root) + target
+
+
+def pow_header(index: int, timestamp: float, prev_hash: str, tx_root: bytes, nonce: int,
+               target: bytes = None) -> bytes:
+    return header_prefix(index, timestamp, prev_hash, tx_root, target) + NONCE.pack(nonce)
+
+
+def pos_header(index: int, timestamp: float, prev_hash: str, tx_root: bytes, validator: str) -> bytes:
+    buffer = bytearray(HEADER_PREFIX.size + VALIDATOR_ID_SIZE)
+    HEADER_PREFIX.pack_into(buffer, 0, HASH_V2, index, timestamp, hash_to_bytes(prev_hash), tx_root)
+    buffer[HEADER_PREFIX.size:] = hashlib.sha256(validator.encode("utf-8")).digest()
+    return bytes(buffer)
@@ -0,0 +1,237 @@
+import sys
+import json
+import time
+import bisect
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Tuple
+
+# granice kubelkow histogramow (gorne, wlacznie), jak w Prometheusie
+SECONDS_BUCKETS = (1e-6, 1e-5, 1e-4, 1e-3, 0.01, 0.1, 0.5, 1.0, 5.0, 10.0, 60.0)
+RATE_BUCKETS = (1e3, 1e4, 1e5, 3e5, 1e6, 3e6, 1e7, 1e8)
+
+
+class Counter:
+    __slots__ = ("name", "help", "value")
+
+    def __init__(self, name: str, help: str = ""):
+        self.name = name
+        self.help = help
+        self.value = 0
+
+
+class Histogram:
+    """
+    Histogram o stalych kubelkach: liczniki w kubelkach, suma i liczba obserwacji.
+    """
+    __slots__ = ("name", "help", "buckets", "counts", "sum", "count")
+
+    def __init__(self, name: str, help: str = "", buckets: Tuple[float, ...] = SECONDS_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # ostatni kubelek to +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+
+class Metrics:
+    """
+    Liczniki, histogramy i zdarzenia z goracej sciezki (kopanie, tworzenie blokow).
+    Wylaczone (domyslnie) kosztuja jedno sprawdzenie `metrics.enabled` na blok -
+    kod instrumentowany wola inc/observe/emit tylko pod tym warunkiem.
+    Zdarzenia trafiaja do sinkow: funkcji (nazwa_zdarzenia, pola).
+    """
+    def __init__(self):
+        self.enabled = False
+        self.counters: Dict[str, Counter] = {}
+        self.histograms: Dict[str, Histogram] = {}
+        self.sinks: List[Callable[[str, dict], None]] = []
+        self.lock = threading.Lock()  # wezel kopie w watku executora
+
+    def counter(self, name: str, help: str = "") -> Counter:
+        if name not in self.counters:
+            self.counters[name] = Counter(name, help)
+        return self.counters[name]
+
+    def histogram(self, name: str, help: str = "", buckets: Tuple[float, ...] = SECONDS_BUCKETS) -> Histogram:
+        if name not in self.histograms:
+            self.histograms[name] = Histogram(name, help, buckets)
+        return self.histograms[name]
+
+    def inc(self, name: str, value: int = 1):
+        with self.lock:
+            self.counter(name).value += value
+
+    def observe(self, name: str, value: float):
+        with self.lock:
+            self.histogram(name).observe(value)
+
+    def emit(self, event: str, **fields):
+        for sink in self.sinks:
+            sink(event, fields)
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def add_sink(self, sink: Callable[[str, dict], None]):
+        # dodanie sinka wlacza instrumentacje
+        self.sinks.append(sink)
+        self.enabled = True
+
+    def remove_sink(self, sink: Callable[[str, dict], None]):
+        self.sinks.remove(sink)
+
+    def reset(self):
+        with self.lock:
+            for counter in self.counters.values():
+                counter.value = 0
+            for histogram in self.histograms.values():
+                histogram.counts = [0] * len(histogram.counts)
+                histogram.sum = 0.0
+                histogram.count = 0
+
+    def prometheus_text(self) -> str:
+        """
+        Stan licznikow i histogramow w formacie tekstowym Prometheusa.
+        """
+        lines = []
+        with self.lock:
+            for counter in self.counters.values():
+                lines.append(f"# HELP {counter.name} {counter.help}")
+                lines.append(f"# TYPE {counter.name} counter")
+                lines.append(f"{counter.name} {counter.value}")
+            for histogram in self.histograms.values():
+                lines.append(f"# HELP {histogram.name} {histogram.help}")
+                lines.append(f"# TYPE {histogram.name} histogram")
+                cumulative = 0
+                for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{histogram.name}_bucket{{le="{bound}"}} {cumulative}')
+                lines.append(f"{histogram.name}_sum {histogram.sum}")
+                lines.append(f"{histogram.name}_count {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+# wspolny rejestr procesu
+metrics = Metrics()
+metrics.counter("hashes_total", "Liczba sprawdzonych hashy (kopanie PoW)")
+metrics.counter("blocks_sealed_total", "Liczba wykopanych blokow PoW")
+metrics.counter("blocks_created_total", "Liczba utworzonych blokow PoS")
+metrics.counter("messages_rejected_total", "Liczba odrzuconych komunikatow od wezlow")
+metrics.counter("blocks_rejected_total", "Liczba blokow z sieci odrzuconych przez wezel")
+metrics.counter("orphans_dropped_total", "Liczba sierot usunietych z puli (limit lub czas zycia)")
+metrics.histogram("seal_seconds", "Czas kopania bloku PoW")
+metrics.histogram("hash_rate", "Szybkosc kopania bloku [H/s]", RATE_BUCKETS)
+metrics.histogram("serialize_seconds", "Czas serializacji naglowka i transakcji bloku")
+metrics.histogram("validator_draw_seconds", "Czas losowania walidatora PoS")
+
+
+class PrintSink:
+    """
+    Dotychczasowe komunikaty tekstowe - wlaczane jawnie przez metrics.add_sink(PrintSink()).
+    """
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def __call__(self, event: str, fields: dict):
+        text = self.format(event, fields)
+        if text is not None:
+            print(text, file=self.stream or sys.stdout)
+
+    @staticmethod
+    def format(event: str, f: dict) -> str:
+        if event == "mining_started":
+            return f"[Blockchain] Mining block {f['index']} with difficulty={f['difficulty']} ({f['mode']})..."
+        if event == "block_sealed":
+            return f"[Block {f['index']}] Found valid hash: {f['hash']}\nAttempts ({f['method']}): {f['attempts']}"
+        if event == "mining_cancelled":
+            return f"[Blockchain] Mining block {f['index']} cancelled"
+        if event == "block_added":
+            return f"[Blockchain] Block {f['index']} mined: {f['hash']}"
+        if event == "block_created":
+            return (f"[PoS] Block {f['index']} created by {f['validator']}. Hash: {f['hash']}\n"
+                    f"      Time to confirm block: {f['hash_seconds']:.6f} seconds\n")
+        if event == "node_block_mined":
+            return f"[{f['node']}] Block {f['index']} mined: {f['hash']}"
+        if event == "node_block_created":
+            return f"[{f['node']}] Block {f['index']} created by {f['validator']}. Hash: {f['hash']}"
+        if event == "block_rejected":
+            return f"[{f['node']}] Odrzucony blok {f['index']}: {f['error']}"
+        return f"[{event}] " + ", ".join(f"{k}={v}" for k, v in f.items())
+
+
+class JsonLinesSink:
+    """
+    Slad zdarzen: jeden obiekt JSON na linie z czasem (time.time()) i nazwa zdarzenia.
+    """
+    def __init__(self, path: str):
+        self.file = open(path, "a")
+        self.lock = threading.Lock()
+
+    def __call__(self, event: str, fields: dict):
+        line = json.dumps({"ts": time.time(), "event": event, **fields})
+        with self.lock:
+            self.file.write(line + "\n")
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def serve_prometheus(port: int = 9100, host: str = "127.0.0.1", registry: Metrics = None) -> ThreadingHTTPServer:
+    """
+    Lokalny endpoint /metrics w watku w tle; server.shutdown() go zatrzymuje.
+    Wlacza zbieranie metryk.
+    """
+    registry = registry or metrics
+    registry.enable()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path != "/metrics":
+                self.send_error(404)
+                return
+            body = registry.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def add_arguments(parser):
+    parser.add_argument("--metrics-port", type=int, help="endpoint Prometheusa /metrics na tym porcie")
+    parser.add_argument("--trace", help="plik JSON-lines ze zdarzeniami kopania i tworzenia blokow")
+    parser.add_argument("--verbose", action="store_true", help="komunikaty o kazdym bloku na stdout")
+
+
+def configure(args):
+    """
+    Wlacza eksportery wybrane opcjami z add_arguments.
+    """
+    if args.verbose:
+        metrics.add_sink(PrintSink())
+    if args.trace:
+        metrics.add_sink(JsonLinesSink(args.trace))
+    if args.metrics_port is not None:
+        serve_prometheus(args.metrics_port)
@@ -0,0 +1,253 @@
+import heapq
+import threading
+import time
+from array import array
+from collections import deque
+from collections.abc import Sequence
+from typing import Dict, Iterable, List, Tuple
+from common.transaction import Transaction
+
+
+class Mempool:
+    """
+    Kolumnowy mempool: nazwy nadawcow i odbiorcow sa internowane do
+    identyfikatorow (array "I"), a kwoty i oplaty trzymane w tablicach "d".
+    Klucz publiczny, podpis i nonce zapisywane sa tylko dla podpisanych
+    transakcji (slownik po pozycji), wiec odczytana transakcja daje sie zweryfikowac.
+    Obiekty Transaction powstaja dopiero przy odczycie, a wycinek mempool[a:b]
+    to widok bez kopiowania danych.
+    """
+    def __init__(self, transactions: Iterable[Transaction] = ()):
+        self.names: List[str] = []
+        self.name_ids: Dict[str, int] = {}
+        self.senders = array("I")
+        self.receivers = array("I")
+        self.amounts = array("d")
+        self.fees = array("d")
+        self.signatures: Dict[int, Tuple[bytes, bytes, int]] = {}  # pozycja -> (klucz publiczny, podpis, nonce)
+        self.extend(transactions)
+
+    def _intern(self, name: str) -> int:
+        name_id = self.name_ids.get(name)
+        if name_id is None:
+            name_id = len(self.names)
+            self.names.append(name)
+            self.name_ids[name] = name_id
+        return name_id
+
+    def add(self, sender: str, receiver: str, amount: float, fee: float = 0.0,
+            public_key: bytes = None, signature: bytes = None, nonce: int = 0):
+        if signature is not None:
+            self.signatures[len(self.amounts)] = (public_key, signature, nonce)
+        self.senders.append(self._intern(sender))
+        self.receivers.append(self._intern(receiver))
+        self.amounts.append(amount)
+        self.fees.append(fee)
+
+    def append(self, tx: Transaction):
+        self.add(tx.sender, tx.receiver, tx.amount, tx.fee, tx.public_key, tx.signature, tx.nonce)
+
+    def extend(self, transactions: Iterable[Transaction]):
+        for tx in transactions:
+            self.append(tx)
+
+    def transaction(self, position: int) -> Transaction:
+        names = self.names
+        public_key, signature, nonce = self.signatures.get(position, (None, None, 0))
+        return Transaction(names[self.senders[position]], names[self.receivers[position]], self.amounts[position],
+                           fee=self.fees[position], public_key=public_key, signature=signature, nonce=nonce)
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return MempoolView(self, range(len(self))[key])
+        return self.transaction(range(len(self))[key])
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self.transaction(position)
+
+
+class MempoolView(Sequence):
+    """
+    Widok na fragment mempoola (np. transakcje jednego bloku). Przechowuje
+    tylko zakres pozycji - dane zostaja w kolumnach mempoola.
+    """
+    def __init__(self, mempool: Mempool, positions: range):
+        self.mempool = mempool
+        self.positions = positions
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return MempoolView(self.mempool, self.positions[key])
+        return self.mempool.transaction(self.positions[key])
+
+    def __iter__(self):
+        transaction = self.mempool.transaction
+        for position in self.positions:
+            yield transaction(position)
+
+    def __repr__(self):
+        return f"MempoolView({list(self)})"
+
+
+class MempoolEntry:
+    __slots__ = ("tx", "size", "fee_rate", "arrival", "seq")
+
+    def __init__(self, tx: Transaction, size: int, arrival: float, seq: int):
+        self.tx = tx
+        self.size = size
+        self.fee_rate = tx.fee / size  # oplata na bajt
+        self.arrival = arrival
+        self.seq = seq
+
+
+class PriorityMempool:
+    """
+    Mempool z priorytetem oplaty. Transakcje indeksowane sa po txid (duplikat
+    wykrywany w O(1)), a kolejnosc wyznaczaja dwa kopce: malejacy po oplacie
+    na bajt - do budowy szablonu bloku - i rosnacy - do wyrzucania najtanszych
+    transakcji po przekroczeniu max_bytes. Kolejka przybycia pozwala usuwac
+    transakcje starsze niz max_age sekund. Usuniete wpisy zostaja w kopcach
+    i sa pomijane przy zdejmowaniu (usuwanie leniwe). Wszystkie operacje
+    wykonywane sa pod blokada, wiec dopisywanie moze isc rownolegle z kopaniem.
+    """
+    def __init__(self, max_bytes: int = None, max_age: float = None, clock=time.monotonic):
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.clock = clock
+        self.entries: Dict[str, MempoolEntry] = {}
+        self.total_bytes = 0
+        self._best = []     # (-fee_rate, seq, txid) - najpierw najwyzsza oplata, potem najstarsze
+        self._worst = []    # (fee_rate, -seq, txid) - najpierw najnizsza oplata, potem najnowsze
+        self._arrivals = deque()  # (czas, txid) w kolejnosci przybycia
+        self._seq = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, txid: str) -> bool:
+        return txid in self.entries
+
+    def _add(self, tx: Transaction, now: float) -> bool:
+        txid = tx.txid
+        if txid in self.entries:
+            return False
+        self._seq += 1
+        entry = MempoolEntry(tx, tx.size, now, self._seq)
+        self.entries[txid] = entry
+        self.total_bytes += entry.size
+        heapq.heappush(self._best, (-entry.fee_rate, entry.seq, txid))
+        heapq.heappush(self._worst, (entry.fee_rate, -entry.seq, txid))
+        self._arrivals.append((now, txid))
+        return True
+
+    def add(self, tx: Transaction) -> bool:
+        """
+        Dodaje transakcje; zwraca False dla duplikatu lub gdy od razu
+        zostala wyrzucona jako najtansza.
+        """
+        with self.lock:
+            added = self._add(tx, self.clock())
+            self._evict()
+            return added and tx.txid in self.entries
+
+    def add_many(self, transactions: Iterable[Transaction]) -> int:
+        # jedna blokada na cala partie - przy duzym naplywie transakcji
+        with self.lock:
+            now = self.clock()
+            added = sum(self._add(tx, now) for tx in transactions)
+            self._evict()
+            return added
+
+    def _remove(self, txid: str):
+        entry = self.entries.pop(txid, None)
+        if entry is not None:
+            self.total_bytes -= entry.size
+        return entry
+
+    def remove(self, txids: Iterable[str]) -> int:
+        with self.lock:
+            removed = sum(self._remove(txid) is not None for txid in txids)
+            self._compact()
+            return removed
+
+    def remove_block(self, block) -> int:
+        """
+        Usuwa transakcje zatwierdzone w bloku.
+        """
+        return self.remove(tx.txid for tx in block.transactions)
+
+    def _evict(self):
+        entries = self.entries
+        if self.max_age is not None:
+            deadline = self.clock() - self.max_age
+            arrivals = self._arrivals
+            while arrivals and arrivals[0][0] < deadline:
+                _, txid = arrivals.popleft()
+                entry = entries.get(txid)
+                if entry is not None and entry.arrival < deadline:
+                    self._remove(txid)
+        if self.max_bytes is not None:
+            worst = self._worst
+            while self.total_bytes > self.max_bytes and worst:
+                _, seq, txid = heapq.heappop(worst)
+                entry = entries.get(txid)
+                if entry is not None and entry.seq == -seq:
+                    self._remove(txid)
+        self._compact()
+
+    def _compact(self):
+        # przebudowa kopcow, gdy wiekszosc wpisow to juz usuniete transakcje
+        live = len(self.entries)
+        if len(self._best) > 2 * live + 1024:
+            self._best = [item for item in self._best if self._is_live(item[2], item[1])]
+            heapq.heapify(self._best)
+        if len(self._worst) > 2 * live + 1024:
+            self._worst = [item for item in self._worst if self._is_live(item[2], -item[1])]
+            heapq.heapify(self._worst)
+        if len(self._arrivals) > 2 * live + 1024:
+            self._arrivals = deque(item for item in self._arrivals if item[1] in self.entries)
+
+    def _is_live(self, txid: str, seq: int) -> bool:
+        entry = self.entries.get(txid)
+        return entry is not None and entry.seq == seq
+
+    def build_template(self, max_bytes: int = None, max_count: int = None, max_misses: int = 64) -> List[Transaction]:
+        """
+        Wybiera transakcje do bloku w kolejnosci oplaty na bajt, az do limitu
+        bajtow lub liczby transakcji. Zdejmuje z kopca tylko k wpisow
+        i odklada je z powrotem - O(k log n). Transakcje zostaja w mempoolu
+        do zatwierdzenia bloku (remove_block). Po max_misses kolejnych
+        transakcjach niemieszczacych sie w limicie bajtow wybor sie konczy.
+        """
+        with self.lock:
+            best = self._best
+            entries = self.entries
+            taken = []
+            popped = []
+            used_bytes = 0
+            misses = 0
+            while best and (max_count is None or len(taken) < max_count):
+                item = heapq.heappop(best)
+                entry = entries.get(item[2])
+                if entry is None or entry.seq != item[1]:
+                    continue  # wpis usuniety - nie wraca do kopca
+                popped.append(item)
+                if max_bytes is not None and used_bytes + entry.size > max_bytes:
+                    misses += 1
+                    if misses >= max_misses:
+                        break
+                    continue
+                misses = 0
+                used_bytes += entry.size
+                taken.append(entry.tx)
+            for item in popped:
+                heapq.heappush(best, item)
+            return taken
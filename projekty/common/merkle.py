@@ -0,0 +1,84 @@
+import hashlib
+from typing import Iterable, List, Tuple
+
+# prefiksy domeny - lisc nie moze udawac wezla wewnetrznego
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(data: bytes) -> bytes:
+    return hashlib.sha256(LEAF_PREFIX + data).digest()
+
+
+def node_hash(left: bytes, right: bytes) -> bytes:
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+
+class MerkleTree:
+    """
+    Drzewo Merkle'a z zapamietanymi wezlami wewnetrznymi. levels[0] to liscie,
+    ostatni poziom to korzen. Wezel bez pary jest przenoszony poziom wyzej bez
+    haszowania, wiec dopisanie liscia przelicza tylko jedna sciezke - O(log n).
+    """
+    def __init__(self, leaves: Iterable[bytes] = ()):
+        self.levels: List[List[bytes]] = [[leaf_hash(data) for data in leaves]]
+        # budowa od dolu - O(n) dla calej listy
+        while len(self.levels[-1]) > 1:
+            nodes = self.levels[-1]
+            self.levels.append([
+                node_hash(nodes[i], nodes[i + 1]) if i + 1 < len(nodes) else nodes[i]
+                for i in range(0, len(nodes), 2)
+            ])
+
+    def __len__(self) -> int:
+        return len(self.levels[0])
+
+    def append(self, data: bytes):
+        self.levels[0].append(leaf_hash(data))
+        level = 0
+        index = len(self.levels[0]) - 1
+        while len(self.levels[level]) > 1:
+            if level + 1 == len(self.levels):
+                self.levels.append([])
+            nodes = self.levels[level]
+            parent_index = index // 2
+            left = 2 * parent_index
+            parent = node_hash(nodes[left], nodes[left + 1]) if left + 1 < len(nodes) else nodes[left]
+
+            upper = self.levels[level + 1]
+            if parent_index < len(upper):
+                upper[parent_index] = parent
+            else:
+                upper.append(parent)
+            level += 1
+            index = parent_index
+
+    def extend(self, items: Iterable[bytes]):
+        for data in items:
+            self.append(data)
+
+    def root(self) -> bytes:
+        if not self.levels[0]:
+            return hashlib.sha256(b"").digest()
+        return self.levels[-1][0]
+
+    def proof(self, index: int) -> List[Tuple[bytes, bool]]:
+        """
+        Dowod przynaleznosci liscia `index`: lista (hash_sasiada, sasiad_z_lewej).
+        """
+        if not 0 <= index < len(self):
+            raise IndexError(f"Brak liscia o indeksie {index}")
+        path = []
+        for nodes in self.levels[:-1]:
+            sibling = index ^ 1
+            if sibling < len(nodes):  # wezel bez pary nie ma sasiada na tym poziomie
+                path.append((nodes[sibling], sibling < index))
+            index //= 2
+        return path
+
+    @staticmethod
+    def verify_proof(data: bytes, proof: List[Tuple[bytes, bool]], root: bytes) -> bool:
+        h = leaf_hash(data)
+        for sibling, sibling_is_left in proof:
+            h = node_hash(sibling, h) if sibling_is_left else node_hash(h, sibling)
+        return h == root
@@ -0,0 +1,148 @@
+import numpy as np
+from typing import Sequence
+
+# proby liczone w paczkach - tablice stanu wyscigu nie rosna ponad ten rozmiar
+CHUNK = 1_000_000
+
+
+def normalize(weights: Sequence[float]) -> np.ndarray:
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.ndim != 1 or len(weights) == 0 or np.any(weights < 0) or weights.sum() <= 0:
+        raise ValueError("Wagi musza byc niepustym wektorem nieujemnych liczb o dodatniej sumie")
+    return weights / weights.sum()
+
+
+def stake_weights(validators) -> np.ndarray:
+    """
+    Stake'i walidatorow (obiekty z polem stake, np. ValidatorInfo) jako wektor wag.
+    """
+    return np.array([float(v.stake) for v in validators])
+
+
+class RaceResult:
+    """
+    Wyniki wyscigu prywatnej galezi: sukces kazdej proby i glebokosc
+    reorganizacji (liczba zastapionych uczciwych blokow) w udanych probach.
+    """
+    def __init__(self, success: np.ndarray, depth: np.ndarray):
+        self.success = success
+        self.depth = depth
+
+    @property
+    def trials(self) -> int:
+        return len(self.success)
+
+    @property
+    def success_rate(self) -> float:
+        return float(self.success.mean())
+
+    @property
+    def stderr(self) -> float:
+        p = self.success_rate
+        return (p * (1 - p) / self.trials) ** 0.5
+
+    @property
+    def mean_depth(self) -> float:
+        depths = self.depth[self.success]
+        return float(depths.mean()) if len(depths) else float("nan")
+
+    def __repr__(self):
+        return (f"RaceResult(proby={self.trials}, sukces={self.success_rate:.4f} ± {1.96 * self.stderr:.4f}, "
+                f"srednia glebokosc reorganizacji={self.mean_depth:.2f})")
+
+
+def block_winners(weights: Sequence[float], blocks: int, trials: int, rng: np.random.Generator = None) -> np.ndarray:
+    """
+    Liczba blokow wygranych przez kazdego uczestnika w `blocks` blokach,
+    `trials` niezaleznych przebiegow (tablica trials x uczestnicy). Zwyciezca
+    bloku losowany jest proporcjonalnie do wagi - mocy obliczeniowej (PoW)
+    albo stake'u (PoS) - wiec rozklad jest wielomianowy.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    return rng.multinomial(blocks, normalize(weights), size=trials)
+
+
+def race(
+    weights: Sequence[float],
+    attacker: int,
+    confirmations: int = 6,
+    give_up: int = 10,
+    trials: int = 1_000_000,
+    block_weights: Sequence[float] = None,
+    max_steps: int = 10_000,
+    rng: np.random.Generator = None
+) -> RaceResult:
+    """
+    Wyscig prywatnej galezi atakujacego (indeks `attacker`) z publicznym lancuchem,
+    z tymi samymi regulami co AttackerNode / PosAttackerNode w symulatorach:
+    kazdy blok dostaje uczestnik wylosowany wg `weights`; atak udaje sie, gdy
+    uczciwy lancuch ma >= confirmations blokow od rozwidlenia, a galaz
+    atakujacego jest ciezsza; rezygnacja przy stracie give_up blokow.
+    block_weights - waga bloku przy wyborze galezi (stake walidatora w PoS);
+    None oznacza najdluzszy lancuch (PoW, kazdy blok wazy 1).
+    Wszystkie proby posuwaja sie krok po kroku jednoczesnie (wektorowo).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    cumulative = np.cumsum(normalize(weights))
+    block_weights = np.ones(len(cumulative)) if block_weights is None else np.asarray(block_weights, dtype=np.float64)
+    success = np.zeros(trials, dtype=bool)
+    depth = np.zeros(trials, dtype=np.int64)
+
+    for start in range(0, trials, CHUNK):
+        count = min(CHUNK, trials - start)
+        index = np.arange(count)  # proby jeszcze nierozstrzygniete
+        private_height = np.zeros(count, dtype=np.int64)
+        public_height = np.zeros(count, dtype=np.int64)
+        private_weight = np.zeros(count)
+        public_weight = np.zeros(count)
+        for _ in range(max_steps):
+            if len(index) == 0:
+                break
+            winner = np.minimum(np.searchsorted(cumulative, rng.random(len(index))), len(cumulative) - 1)
+            mine = winner == attacker
+            private_height += mine
+            public_height += ~mine
+            private_weight += np.where(mine, block_weights[winner], 0.0)
+            public_weight += np.where(mine, 0.0, block_weights[winner])
+
+            won = (private_weight > public_weight) & (public_height >= confirmations)
+            lost = ~won & (public_height - private_height >= give_up)
+            success[start + index[won]] = True
+            depth[start + index[won]] = public_height[won]
+            keep = ~(won | lost)
+            index, private_height, public_height = index[keep], private_height[keep], public_height[keep]
+            private_weight, public_weight = private_weight[keep], public_weight[keep]
+    return RaceResult(success, depth)
+
+
+def fork_overtakes(
+    weights: Sequence[float],
+    attacker: int,
+    main_blocks: int,
+    fork_length: int,
+    trials: int = 1_000_000,
+    block_weights: Sequence[float] = None,
+    rng: np.random.Generator = None
+):
+    """
+    Nothing at stake: po rozwidleniu glowny lancuch dostaje `main_blocks` blokow
+    od walidatorow losowanych wg `weights`, a atakujacy buduje za darmo fork
+    z `fork_length` wlasnych blokow. Zwraca (czy fork przejal lancuch,
+    minimalna dlugosc forka potrzebna do przejecia) dla kazdej proby.
+    block_weights - waga bloku przy wyborze galezi, domyslnie `weights`
+    (stake walidatora, jak w BlockchainPoS).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    probabilities = normalize(weights)
+    block_weights = np.asarray(weights if block_weights is None else block_weights, dtype=np.float64)
+    won = np.empty(trials, dtype=bool)
+    needed = np.empty(trials, dtype=np.int64)
+    for start in range(0, trials, CHUNK):
+        count = min(CHUNK, trials - start)
+        # liczba blokow kazdego walidatora w galezi glownej wystarczy do jej wagi
+        counts = rng.multinomial(main_blocks, probabilities, size=count)
+        main_weight = counts @ block_weights
+        # fork musi byc ciezszy (BlockTree przelacza czubek tylko przy wiekszej wadze)
+        won[start:start + count] = fork_length * block_weights[attacker] > main_weight
+        needed[start:start + count] = np.floor(main_weight / block_weights[attacker]).astype(np.int64) + 1
+    return won, needed
@@ -0,0 +1,293 @@
+import time
+import asyncio
+import json
+import struct
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Set
+from common.transaction import Transaction
+from common.mempool import PriorityMempool
+from common.instrumentation import metrics
+
+# pola komunikatow z sieci i ich typy - zly typ wykrywany jest przy odbiorze,
+# a nie dopiero przy skladaniu bloku
+NUMBER = (int, float)
+TX_FIELDS = {"sender": str, "receiver": str, "amount": NUMBER, "fee": NUMBER,
+             "public_key": str, "signature": str, "nonce": int}
+TX_REQUIRED = ("sender", "receiver", "amount")
+BLOCK_FIELDS = {"index": int, "prev_hash": str, "timestamp": NUMBER, "block_hash": str, "transactions": list}
+# bledy jednego komunikatu (zly ksztalt, typ, zakres liczby) - nie przerywaja polaczenia
+MESSAGE_ERRORS = (ValueError, KeyError, TypeError, AttributeError, OverflowError, struct.error)
+
+
+def check_fields(data, fields: dict, required, what: str) -> dict:
+    if not isinstance(data, dict):
+        raise ValueError(f"{what}: oczekiwany obiekt JSON")
+    for name in required:
+        if name not in data:
+            raise ValueError(f"{what}: brak pola {name}")
+    for name, kind in fields.items():
+        value = data.get(name)
+        # bool to podklasa int w Pythonie, ale nie jest liczba w komunikacie
+        if value is not None and (not isinstance(value, kind) or isinstance(value, bool)):
+            raise ValueError(f"{what}: pole {name} ma zly typ")
+    return data
+
+
+def check_message(message) -> dict:
+    """
+    Sprawdza ksztalt komunikatu z sieci przed jego obsluga; ValueError przy bledzie.
+    """
+    if not isinstance(message, dict):
+        raise ValueError("komunikat: oczekiwany obiekt JSON")
+    kind = message.get("type")
+    if kind == "tx":
+        check_fields(message.get("tx"), TX_FIELDS, TX_REQUIRED, "transakcja")
+    elif kind == "block":
+        block = check_fields(message.get("block"), BLOCK_FIELDS, BLOCK_FIELDS, "blok")
+        for tx in block["transactions"]:
+            check_fields(tx, TX_FIELDS, TX_REQUIRED, "transakcja bloku")
+    else:
+        raise ValueError(f"nieznany typ komunikatu: {kind!r}")
+    return message
+
+
+class Node:
+    """
+    Wezel sieci oparty na asyncio. Transakcje i bloki przychodza przez TCP
+    (lub gniazdo Unix) jako JSON, jeden komunikat na linie:
+        {"type": "tx", "tx": {...}}
+        {"type": "block", "block": {...}}
+    Nowe transakcje trafiaja do mempoola, nowe bloki do lancucha, a jedne
+    i drugie sa rozsylane dalej do pozostalych polaczonych wezlow (gossip).
+    Blok, ktorego rodzic jeszcze nie dotarl, czeka w puli sierot - najwyzej
+    max_orphans blokow, kazdy najwyzej orphan_ttl sekund.
+
+    Hash i drzewo Merkle'a bloku oraz podpisy transakcji (Ed25519 w czystym
+    Pythonie) liczone sa w executorze, zeby nie blokowac petli zdarzen;
+    lancuch zmieniany jest tylko w watku petli.
+
+    Klasa bazowa nie produkuje blokow - robia to PowNode (kopanie w executorze)
+    i PosNode (bloki lidera slotu) przez metode produce().
+    """
+    def __init__(self, chain, mempool: PriorityMempool = None, name: str = "node", block_size: int = 100,
+                 max_orphans: int = 256, orphan_ttl: float = 600.0, clock=time.monotonic):
+        self.chain = chain
+        self.mempool = mempool if mempool is not None else PriorityMempool()
+        if getattr(chain, "mempool", None) is None:
+            chain.mempool = self.mempool  # zatwierdzone transakcje znikaja z mempoola
+        self.name = name
+        self.block_size = block_size
+        self.server: asyncio.AbstractServer = None
+        self.address = None
+        self.peers: List[asyncio.StreamWriter] = []
+        # sieroty w kolejnosci przyjecia: hash -> (blok, czas przyjecia)
+        self.orphans: "OrderedDict[str, tuple]" = OrderedDict()
+        self.orphan_children: Dict[str, List[str]] = {}  # prev_hash -> hashe sierot
+        self.max_orphans = max_orphans
+        self.orphan_ttl = orphan_ttl
+        self.clock = clock
+        # jeden watek - weryfikator (cache podpisow) nie jest uzywany wspolbieznie
+        self.verify_executor = ThreadPoolExecutor(max_workers=1)
+        self.seen_blocks: Set[str] = set()
+        self.tasks: List[asyncio.Task] = []
+        self.new_transactions = asyncio.Event()
+        self.running = False
+        self.rejected_messages = 0  # komunikaty odrzucone przez zly ksztalt lub tresc
+
+    # --- siec ---
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, path: str = None):
+        """
+        Uruchamia serwer na TCP (port=0 - dowolny wolny port) albo na gniezdzie Unix (path).
+        """
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self._accept, path=path)
+            self.address = path
+        else:
+            self.server = await asyncio.start_server(self._accept, host, port)
+            self.address = self.server.sockets[0].getsockname()[:2]
+        self.running = True
+        self.tasks.append(asyncio.create_task(self.produce()))
+
+    async def connect(self, host: str = "127.0.0.1", port: int = None, path: str = None):
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        self._add_peer(reader, writer)
+
+    async def _accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._add_peer(reader, writer)
+
+    def _add_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.peers.append(writer)
+        self.tasks.append(asyncio.create_task(self._read_loop(reader, writer)))
+
+    async def _read_loop(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            async for line in reader:
+                # blad jednego komunikatu nie zamyka polaczenia z wezlem
+                try:
+                    await self.handle_message(json.loads(line), writer)
+                except MESSAGE_ERRORS as e:
+                    self.reject_message(e)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if writer in self.peers:
+                self.peers.remove(writer)
+            writer.close()
+
+    def broadcast(self, message: dict, exclude: asyncio.StreamWriter = None):
+        data = json.dumps(message, separators=(",", ":")).encode("utf-8") + b"\n"
+        for writer in self.peers:
+            if writer is not exclude and not writer.is_closing():
+                writer.write(data)
+
+    async def handle_message(self, message: dict, origin: asyncio.StreamWriter = None):
+        kind = check_message(message)["type"]
+        if kind == "tx":
+            self.submit_transaction(Transaction.from_dict(message["tx"]), origin)
+        elif kind == "block":
+            await self.receive_block(self.block_from_dict(message["block"]), origin)
+
+    def reject_message(self, error: Exception):
+        self.rejected_messages += 1
+        if metrics.enabled:
+            metrics.inc("messages_rejected_total")
+            metrics.emit("message_rejected", node=self.name, error=f"{type(error).__name__}: {error}")
+
+    # --- transakcje i bloki ---
+
+    def submit_transaction(self, tx: Transaction, origin: asyncio.StreamWriter = None) -> bool:
+        """
+        Przyjmuje transakcje od klienta lub z sieci; nowe rozsyla dalej.
+        """
+        if not self.mempool.add(tx):
+            return False
+        self.new_transactions.set()
+        self.broadcast({"type": "tx", "tx": tx.to_dict()}, exclude=origin)
+        return True
+
+    async def receive_block(self, block, origin: asyncio.StreamWriter = None) -> bool:
+        if block.block_hash in self.seen_blocks or block.block_hash in self.chain.tree.nodes:
+            return False
+        self.seen_blocks.add(block.block_hash)
+        if block.prev_hash not in self.chain.tree.nodes:
+            self.add_orphan(block)
+            return False
+
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(self.verify_executor, self.precheck_block, block)
+        previous_tip = self.chain.get_last_block()
+        try:
+            self.accept_block(block)
+        except ValueError as e:
+            if metrics.enabled:
+                metrics.inc("blocks_rejected_total")
+                metrics.emit("block_rejected", node=self.name, index=block.index, error=str(e))
+            return False
+        self.broadcast({"type": "block", "block": block.to_dict()}, exclude=origin)
+        if self.chain.get_last_block() is not previous_tip:
+            self.on_new_tip()
+
+        # bloki czekajace na ten blok jako rodzica
+        for orphan in self.pop_orphans(block.block_hash):
+            self.seen_blocks.discard(orphan.block_hash)
+            await self.receive_block(orphan)
+        return True
+
+    def precheck_block(self, block):
+        """
+        Kosztowna czesc weryfikacji bloku - wolana w executorze. Drzewo Merkle'a
+        zostaje w bloku, a wyniki podpisow w cache weryfikatora, wiec insert_block
+        na petli zdarzen tylko je porownuje. Bledy zglasza dopiero insert_block.
+        """
+        block.calculate_hash()
+        verifier = getattr(self.chain, "verifier", None)
+        if verifier is not None:
+            verifier.verify(block.transactions)
+
+    def add_orphan(self, block):
+        now = self.clock()
+        self.expire_orphans(now)
+        while len(self.orphans) >= self.max_orphans:
+            self.drop_orphan(next(iter(self.orphans)))
+        self.orphans[block.block_hash] = (block, now)
+        self.orphan_children.setdefault(block.prev_hash, []).append(block.block_hash)
+
+    def expire_orphans(self, now: float):
+        # sieroty sa w kolejnosci przyjecia - najstarsze na poczatku
+        while self.orphans:
+            block_hash, (_, received) = next(iter(self.orphans.items()))
+            if now - received < self.orphan_ttl:
+                break
+            self.drop_orphan(block_hash)
+
+    def drop_orphan(self, block_hash: str):
+        block, _ = self.orphans.pop(block_hash)
+        children = self.orphan_children[block.prev_hash]
+        children.remove(block_hash)
+        if not children:
+            del self.orphan_children[block.prev_hash]
+        # usunieta sierota moze przyjsc ponownie, gdy rodzic bedzie juz znany
+        self.seen_blocks.discard(block_hash)
+        if metrics.enabled:
+            metrics.inc("orphans_dropped_total")
+
+    def pop_orphans(self, parent_hash: str) -> list:
+        return [self.orphans.pop(block_hash)[0] for block_hash in self.orphan_children.pop(parent_hash, [])]
+
+    def publish_block(self, block):
+        self.seen_blocks.add(block.block_hash)
+        self.broadcast({"type": "block", "block": block.to_dict()})
+
+    async def template(self) -> list:
+        """
+        Transakcje do nowego bloku - z mempoola, po odrzuceniu tych z blednym
+        podpisem (sprawdzanym w executorze) albo bez pokrycia (usuwane z mempoola).
+        """
+        transactions = self.mempool.build_template(max_count=self.block_size)
+        rejected = []
+        verifier = getattr(self.chain, "verifier", None)
+        if verifier is not None:
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(self.verify_executor, verifier.verify, transactions)
+            rejected = [tx for tx, ok in zip(transactions, results) if not ok]
+            transactions = [tx for tx, ok in zip(transactions, results) if ok]
+        state = getattr(self.chain, "state", None)
+        if state is not None:
+            transactions, unfunded = state.select(transactions)
+            rejected += unfunded
+        if rejected:
+            self.mempool.remove(tx.txid for tx in rejected)
+        return transactions
+
+    # --- do nadpisania w podklasach ---
+
+    def block_from_dict(self, data: dict):
+        raise NotImplementedError
+
+    def accept_block(self, block):
+        self.chain.insert_block(block)
+
+    def on_new_tip(self):
+        pass
+
+    async def produce(self):
+        pass
+
+    async def close(self):
+        self.running = False
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.tasks = []
+        for writer in self.peers:
+            writer.close()
+        self.peers = []
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        self.verify_executor.shutdown()
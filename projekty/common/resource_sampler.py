@@ -0,0 +1,199 @@
+import os
+import csv
+import time
+import resource
+import threading
+from contextlib import contextmanager
+from typing import List
+
+PROC = "/proc"
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+PAGE_SIZE = resource.getpagesize()
+
+
+class ResourceSample:
+    """
+    Odczyt licznikow w jednej chwili: czas CPU (user + system, s) procesu i jego
+    potomkow, RSS (MB) procesu i zyjacych potomkow, liczba przelaczen kontekstu.
+    """
+    __slots__ = ("wall", "cpu_time", "rss_mb", "ctx_switches")
+
+    def __init__(self, wall: float, cpu_time: float, rss_mb: float, ctx_switches: int):
+        self.wall = wall
+        self.cpu_time = cpu_time
+        self.rss_mb = rss_mb
+        self.ctx_switches = ctx_switches
+
+
+class BlockUsage:
+    """
+    Zuzycie zasobow przez jedna operacje (np. dodanie bloku) - roznica
+    odczytow przed i po, bez usypiania watku.
+    """
+    __slots__ = ("wall", "cpu_time", "rss_mb", "peak_rss_mb", "ctx_switches")
+
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu_time = 0.0
+        self.rss_mb = 0.0
+        self.peak_rss_mb = 0.0
+        self.ctx_switches = 0
+
+    @property
+    def cpu_percent(self) -> float:
+        # >100% oznacza kilka rdzeni (procesy robocze kopania)
+        return self.cpu_time / self.wall * 100 if self.wall > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "wall": self.wall,
+            "cpu_time": self.cpu_time,
+            "cpu_percent": self.cpu_percent,
+            "rss_mb": self.rss_mb,
+            "peak_rss_mb": self.peak_rss_mb,
+            "ctx_switches": self.ctx_switches
+        }
+
+
+def _read_stat(pid: int):
+    # pole 2 (comm) moze zawierac spacje - dzielimy za ostatnim nawiasem
+    with open(f"{PROC}/{pid}/stat", "rb") as f:
+        fields = f.read().rsplit(b")", 1)[1].split()
+    # fields[0] to pole 3 (state): utime=14, stime=15, cutime=16, cstime=17, rss=24
+    utime, stime, cutime, cstime = (int(x) for x in fields[11:15])
+    return utime + stime, cutime + cstime, int(fields[21])
+
+
+def _read_ctx_switches(pid: int) -> int:
+    total = 0
+    with open(f"{PROC}/{pid}/status", "rb") as f:
+        for line in f:
+            if line.startswith((b"voluntary_ctxt_switches", b"nonvoluntary_ctxt_switches")):
+                total += int(line.split()[1])
+    return total
+
+
+def _children(pid: int) -> List[int]:
+    children = []
+    try:
+        for tid in os.listdir(f"{PROC}/{pid}/task"):
+            with open(f"{PROC}/{pid}/task/{tid}/children", "rb") as f:
+                children.extend(int(child) for child in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+class ResourceSampler:
+    """
+    Probkowanie zasobow bez blokowania: kazdy odczyt to kilka plikow z /proc
+    (dziesiatki mikrosekund), bez cpu_percent(interval=...) i bez sleep.
+    measure() obejmuje operacje odczytem przed i po i liczy roznice;
+    start() wlacza dodatkowo probkowanie w tle ze stalym okresem (period),
+    z ktorego measure() bierze szczytowy RSS w trakcie operacji.
+    Bez /proc (np. macOS) liczniki pochodza z resource.getrusage - RSS jest
+    wtedy szczytowym RSS procesu.
+    """
+    def __init__(self, pid: int = None, period: float = 0.1, include_children: bool = True):
+        self.pid = pid or os.getpid()
+        self.period = period
+        self.include_children = include_children
+        self.use_proc = os.path.exists(f"{PROC}/{self.pid}/stat")
+        self.samples: List[ResourceSample] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread = None
+
+    def sample(self) -> ResourceSample:
+        wall = time.perf_counter()
+        if not self.use_proc:
+            return self._sample_rusage(wall)
+
+        ticks, child_ticks, rss_pages = _read_stat(self.pid)
+        ctx = _read_ctx_switches(self.pid)
+        # /proc liczy w tyknieciach zegara (zwykle 10 ms) - dla wlasnego procesu
+        # process_time() ma rozdzielczosc nanosekund, co ma znaczenie dla blokow PoS
+        own_cpu = time.process_time() if self.pid == os.getpid() else ticks / CLOCK_TICKS
+        # zakonczeni potomkowie sa juz wliczeni w cutime/cstime rodzica
+        ticks = child_ticks
+        if self.include_children:
+            pending = _children(self.pid)
+            while pending:
+                child = pending.pop()
+                try:
+                    child_ticks_self, _, child_rss = _read_stat(child)
+                    ctx += _read_ctx_switches(child)
+                except OSError:  # proces wlasnie sie zakonczyl
+                    continue
+                ticks += child_ticks_self
+                rss_pages += child_rss
+                pending.extend(_children(child))
+        return ResourceSample(wall, own_cpu + ticks / CLOCK_TICKS, rss_pages * PAGE_SIZE / 1024 / 1024, ctx)
+
+    def _sample_rusage(self, wall: float) -> ResourceSample:
+        own = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu = own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+        ctx = own.ru_nvcsw + own.ru_nivcsw + children.ru_nvcsw + children.ru_nivcsw
+        # ru_maxrss: kB na Linuksie, bajty na macOS
+        scale = 1024 * 1024 if os.uname().sysname == "Darwin" else 1024
+        return ResourceSample(wall, cpu, own.ru_maxrss / scale, ctx)
+
+    def _run(self):
+        # staly okres liczony od startu - czas odczytu nie przesuwa probek
+        next_time = time.perf_counter()
+        while not self._stop.is_set():
+            self.samples.append(self.sample())
+            next_time += self.period
+            self._stop.wait(max(0.0, next_time - time.perf_counter()))
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    @contextmanager
+    def measure(self):
+        """
+        with sampler.measure() as usage: ... - po wyjsciu usage zawiera
+        czas, czas CPU, RSS i przelaczenia kontekstu zuzyte przez blok kodu.
+        """
+        usage = BlockUsage()
+        first = len(self.samples)
+        before = self.sample()
+        try:
+            yield usage
+        finally:
+            after = self.sample()
+            usage.wall = after.wall - before.wall
+            usage.cpu_time = after.cpu_time - before.cpu_time
+            usage.rss_mb = after.rss_mb
+            usage.ctx_switches = after.ctx_switches - before.ctx_switches
+            usage.peak_rss_mb = max([before.rss_mb, after.rss_mb] + [s.rss_mb for s in self.samples[first:]])
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def write_usage_csv(path: str, rows: List[dict]):
+    """
+    Zapisuje pomiary blok po bloku (slowniki, np. z BlockUsage.to_dict()) do CSV.
+    """
+    if not rows:
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
@@ -0,0 +1,86 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List
+from common import ed25519
+from common.transaction import address
+from common.cpus import available_cpus
+
+
+class InvalidSignature(ValueError):
+    pass
+
+
+def verify_batch(items: List[tuple]) -> List[bool]:
+    """
+    Zadanie procesu roboczego - weryfikuje partie (wiadomosc, klucz, podpis).
+    """
+    return [ed25519.verify(public_key, payload, signature) for payload, public_key, signature in items]
+
+
+class SignatureVerifier:
+    """
+    Etap weryfikacji podpisow przed skladaniem bloku. Podpisy sprawdzane sa
+    partiami w puli procesow, a wynik zapamietywany po txid - transakcja
+    ponownie wlaczona do bloku (np. po reorganizacji) nie jest weryfikowana
+    drugi raz. require_signatures=False przepuszcza transakcje bez podpisu.
+    """
+    def __init__(self, workers: int = None, batch_size: int = 64, require_signatures: bool = True):
+        self.workers = workers or available_cpus()
+        self.batch_size = batch_size
+        self.require_signatures = require_signatures
+        self.cache: Dict[str, bool] = {}
+        self.verified = 0  # liczba faktycznie wykonanych weryfikacji
+        self.executor: ProcessPoolExecutor = None
+
+    def verify(self, transactions) -> List[bool]:
+        """
+        Zwraca wynik weryfikacji dla kazdej transakcji, w tej samej kolejnosci.
+        """
+        cache = self.cache
+        pending = {}
+        for tx in transactions:
+            if tx.signature is None:
+                continue
+            txid = tx.txid
+            if txid in cache or txid in pending:
+                continue
+            if tx.sender != address(tx.public_key):
+                # poprawny podpis cudzym kluczem nie autoryzuje wyplaty z konta nadawcy
+                cache[txid] = False
+            else:
+                pending[txid] = (tx.signing_payload(), tx.public_key, tx.signature)
+
+        if pending:
+            txids = list(pending)
+            items = list(pending.values())
+            batches = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+            if self.workers > 1 and len(batches) > 1:
+                if self.executor is None:
+                    # pula startuje raz, przy pierwszej wiekszej partii
+                    self.executor = ProcessPoolExecutor(self.workers)
+                results = [ok for batch in self.executor.map(verify_batch, batches) for ok in batch]
+            else:
+                results = verify_batch(items)
+            cache.update(zip(txids, results))
+            self.verified += len(items)
+
+        unsigned = not self.require_signatures
+        return [cache[tx.txid] if tx.signature is not None else unsigned for tx in transactions]
+
+    def check_block(self, block):
+        """
+        Rzuca InvalidSignature, gdy ktorakolwiek transakcja bloku ma zly lub brakujacy podpis.
+        """
+        for tx, ok in zip(block.transactions, self.verify(block.transactions)):
+            if not ok:
+                raise InvalidSignature(f"Blok {block.index}: niepoprawny podpis transakcji {tx}")
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
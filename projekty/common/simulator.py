@@ -0,0 +1,201 @@
+import heapq
+import random
+import statistics
+from typing import Callable, Dict, List, Set, Tuple
+
+
+class Simulator:
+    """
+    Symulacja zdarzen dyskretnych: kolejka (czas, numer, funkcja, argumenty).
+    Czas sieci przeskakuje od zdarzenia do zdarzenia, wiec godziny dzialania
+    sieci liczone sa w sekundach czasu rzeczywistego.
+    """
+    def __init__(self, seed: int = None):
+        self.now = 0.0
+        self.rng = random.Random(seed)
+        self.queue = []
+        self._seq = 0  # kolejnosc zdarzen o tym samym czasie
+        self.events = 0
+        self.created: Dict[str, float] = {}  # block_hash -> czas utworzenia bloku
+
+    def schedule(self, delay: float, callback: Callable, *args):
+        self._seq += 1
+        heapq.heappush(self.queue, (self.now + delay, self._seq, callback, args))
+
+    def run(self, until: float):
+        queue = self.queue
+        while queue and queue[0][0] <= until:
+            self.now, _, callback, args = heapq.heappop(queue)
+            self.events += 1
+            callback(*args)
+        self.now = until
+
+
+class Link:
+    __slots__ = ("latency", "bandwidth", "busy_until")
+
+    def __init__(self, latency: float, bandwidth: float):
+        self.latency = latency        # sekundy
+        self.bandwidth = bandwidth    # bajty na sekunde
+        self.busy_until = 0.0         # koniec wysylania poprzedniego komunikatu
+
+
+class Network:
+    """
+    Pelna siatka laczy miedzy wezlami. Komunikat o rozmiarze `size` czeka,
+    az lacze skonczy wysylac poprzednie, wysylany jest size / bandwidth sekund
+    i dociera po dodatkowym opoznieniu latency (+ losowy jitter).
+    Podzial sieci (partition) wstrzymuje komunikaty miedzy grupami az do
+    konca podzialu - wtedy wezly synchronizuja sie tak, jakby nadrabialy braki.
+    """
+    def __init__(self, sim: Simulator, num_nodes: int, latency: float = 0.1,
+                 bandwidth: float = 10_000_000, jitter: float = 0.0):
+        self.sim = sim
+        self.num_nodes = num_nodes
+        self.jitter = jitter
+        self.links: Dict[Tuple[int, int], Link] = {
+            (a, b): Link(latency, bandwidth)
+            for a in range(num_nodes) for b in range(num_nodes) if a != b
+        }
+        self.partitions: List[Tuple[float, float, List[Set[int]]]] = []
+        self.messages = 0
+        self.bytes_sent = 0
+
+    def set_link(self, a: int, b: int, latency: float = None, bandwidth: float = None):
+        # lacze w obie strony
+        for key in ((a, b), (b, a)):
+            link = self.links[key]
+            if latency is not None:
+                link.latency = latency
+            if bandwidth is not None:
+                link.bandwidth = bandwidth
+
+    def add_partition(self, start: float, end: float, groups: List[Set[int]]):
+        self.partitions.append((start, end, [set(group) for group in groups]))
+
+    def _partition_end(self, a: int, b: int, at: float) -> float:
+        for start, end, groups in self.partitions:
+            if start <= at < end:
+                group_a = next((g for g in groups if a in g), None)
+                if group_a is None or b not in group_a:
+                    return end
+        return at
+
+    def send(self, src: int, dst: int, size: int, callback: Callable, *args):
+        sim = self.sim
+        link = self.links[(src, dst)]
+        start = max(sim.now, link.busy_until)
+        start = self._partition_end(src, dst, start)
+        link.busy_until = start + size / link.bandwidth
+        delay = link.busy_until + link.latency - sim.now
+        if self.jitter:
+            delay += sim.rng.uniform(0.0, self.jitter)
+        self.messages += 1
+        self.bytes_sent += size
+        sim.schedule(delay, callback, *args)
+
+
+class SimNode:
+    """
+    Wezel symulacji wokol prawdziwego lancucha (Blockchain / BlockchainPoS).
+    Bloki rozsylane sa zalewowo: kazdy nowy blok trafia do wszystkich sasiadow,
+    a blok bez znanego rodzica czeka w puli sierot.
+    """
+    def __init__(self, node_id: int, chain, sim: Simulator, network: Network, block_size: int):
+        self.id = node_id
+        self.chain = chain
+        self.sim = sim
+        self.network = network
+        self.block_size = block_size
+        self.peers: List["SimNode"] = []
+        self.arrivals: Dict[str, float] = {}  # block_hash -> czas dotarcia do wezla
+        self.orphans: Dict[str, list] = {}
+        self.honest = True
+
+    def broadcast(self, block, exclude: int = None):
+        for peer in self.peers:
+            if peer.id != exclude:
+                self.network.send(self.id, peer.id, self.block_size, peer.receive, block, self.id)
+
+    def publish(self, block):
+        self.arrivals[block.block_hash] = self.sim.now
+        previous_tip = self.chain.get_last_block()
+        self.chain.insert_block(block)
+        self.broadcast(block)
+        if self.chain.get_last_block() is not previous_tip:
+            self.on_new_tip()
+
+    def receive(self, block, origin: int = None):
+        if block.block_hash in self.arrivals:
+            return
+        if block.prev_hash not in self.chain.tree.nodes:
+            self.orphans.setdefault(block.prev_hash, []).append(block)
+            return
+        self.arrivals[block.block_hash] = self.sim.now
+        previous_tip = self.chain.get_last_block()
+        self.chain.insert_block(block)
+        self.broadcast(block, exclude=origin)
+        if self.chain.get_last_block() is not previous_tip:
+            self.on_new_tip()
+        for orphan in self.orphans.pop(block.block_hash, []):
+            self.receive(orphan)
+
+    def on_new_tip(self):
+        pass
+
+
+class SimReport:
+    """
+    Wyniki symulacji: odsetek osieroconych blokow, czas do finalnosci
+    (blok przykryty `confirmations` blokami na wszystkich uczciwych wezlach)
+    i skutecznosc atakujacego (udane / wszystkie proby przepisania lancucha).
+    """
+    def __init__(self, duration: float, produced: int, main_blocks: int, finality: List[float],
+                 attacks: int = 0, attack_successes: int = 0, events: int = 0, seconds: float = 0.0):
+        self.duration = duration
+        self.produced = produced
+        self.main_blocks = main_blocks
+        self.finality = finality
+        self.attacks = attacks
+        self.attack_successes = attack_successes
+        self.events = events
+        self.seconds = seconds
+
+    @property
+    def orphan_rate(self) -> float:
+        return 1.0 - self.main_blocks / self.produced if self.produced else 0.0
+
+    @property
+    def mean_finality(self) -> float:
+        return statistics.mean(self.finality) if self.finality else float("nan")
+
+    @property
+    def attack_success_rate(self) -> float:
+        return self.attack_successes / self.attacks if self.attacks else 0.0
+
+    def __repr__(self):
+        return (f"SimReport({self.duration / 3600:.1f} h sieci w {self.seconds:.2f} s, bloki={self.produced}, "
+                f"osierocone={self.orphan_rate:.2%}, finalnosc={self.mean_finality:.1f} s, "
+                f"ataki={self.attack_successes}/{self.attacks})")
+
+
+def finality_times(nodes: List[SimNode], created: Dict[str, float], confirmations: int) -> List[float]:
+    """
+    Dla kazdego bloku glownego lancucha: czas od utworzenia do chwili, gdy na
+    kazdym uczciwym wezle dotarl blok lezacy `confirmations` wysokosci wyzej.
+    """
+    honest = [node for node in nodes if node.honest]
+    main = honest[0].chain.chain
+    times = []
+    for height in range(1, len(main) - confirmations):
+        cover = main[height + confirmations].block_hash
+        arrivals = [node.arrivals.get(cover) for node in honest]
+        if None in arrivals:
+            continue
+        times.append(max(arrivals) - created[main[height].block_hash])
+    return times
+
+
+def build_network(nodes: List[SimNode]):
+    for node in nodes:
+        node.peers = [peer for peer in nodes if peer is not node]
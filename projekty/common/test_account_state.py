@@ -0,0 +1,97 @@
+import pytest
+from common import ed25519
+from common.account_state import AccountState, InsufficientFunds, InvalidNonce
+from common.transaction import Transaction, address
+
+
+class FakeBlock:
+    # stan kont potrzebuje tylko index, block_hash i transakcji
+    def __init__(self, index: int, name: str, transactions):
+        self.index = index
+        self.block_hash = name
+        self.transactions = transactions
+
+
+def signed(key: bytes, receiver: str, amount: float, nonce: int) -> Transaction:
+    tx = Transaction(address(ed25519.public_key(key)), receiver, amount, nonce=nonce)
+    tx.sign(key)
+    return tx
+
+
+@pytest.fixture(scope="module")
+def key() -> bytes:
+    return ed25519.generate_private_key()
+
+
+def test_reorg_apply_revert_round_trip(key):
+    sender = address(ed25519.public_key(key))
+    state = AccountState({sender: 100.0, "Alice": 50.0}, snapshot_every=2)
+    common = FakeBlock(1, "c1", [Transaction("Alice", "Bob", 10.0)])
+    a = [FakeBlock(2, "a2", [signed(key, "Carol", 5.0, 0)]),
+         FakeBlock(3, "a3", [signed(key, "Dave", 7.0, 1), Transaction("Bob", "Eve", 4.0)])]
+    b = [FakeBlock(2, "b2", [signed(key, "Frank", 30.0, 0)]),
+         FakeBlock(3, "b3", [Transaction("Alice", "Frank", 1.0)]),
+         FakeBlock(4, "b4", [signed(key, "Gina", 2.0, 1)])]
+
+    state.apply_block(common)
+    before = (dict(state.balances), dict(state.nonces))
+    for block in a:
+        state.apply_block(block)
+    on_a = (dict(state.balances), dict(state.nonces))
+    assert state.nonce(sender) == 2
+
+    state.apply_reorg(a, b)
+    assert state.balances["Frank"] == 31.0 and "Carol" not in state.balances
+    assert state.nonce(sender) == 2
+    state.apply_reorg(b, a)
+    assert (state.balances, state.nonces) == on_a
+    for block in reversed(a):
+        state.revert_block(block)
+    assert (state.balances, state.nonces) == before
+    assert state.height == 1
+
+
+def test_failed_reorg_restores_state(key):
+    state = AccountState({"Alice": 10.0})
+    a = [FakeBlock(1, "a1", [Transaction("Alice", "Bob", 3.0)])]
+    b = [FakeBlock(1, "b1", [Transaction("Alice", "Bob", 1.0)]),
+         FakeBlock(2, "b2", [Transaction("Bob", "Carol", 5.0)])]
+    state.apply_block(a[0])
+    snapshot = dict(state.balances)
+    with pytest.raises(InsufficientFunds):
+        state.apply_reorg(a, b)
+    assert state.balances == snapshot
+    assert set(state.undo_logs) == {"a1"}
+
+
+def test_replayed_transaction_rejected(key):
+    sender = address(ed25519.public_key(key))
+    state = AccountState({sender: 100.0})
+    tx = signed(key, "Bob", 1.0, 0)
+    state.apply_block(FakeBlock(1, "h1", [tx]))
+    with pytest.raises(InvalidNonce):
+        state.check_block(FakeBlock(2, "h2", [tx]))
+    with pytest.raises(InvalidNonce):
+        state.check_block(FakeBlock(2, "h2", [signed(key, "Bob", 1.0, 1), signed(key, "Bob", 1.0, 1)]))
+
+
+def test_select_orders_by_nonce(key):
+    sender = address(ed25519.public_key(key))
+    state = AccountState({sender: 100.0}, nonces={sender: 1})
+    stale = signed(key, "Bob", 1.0, 0)
+    first, second, gap = signed(key, "Bob", 1.0, 1), signed(key, "Bob", 1.0, 2), signed(key, "Bob", 1.0, 5)
+    accepted, rejected = state.select([second, stale, gap, first])
+    assert accepted == [first, second]
+    assert rejected == [stale]  # nonce z przyszlosci czeka, nie jest odrzucany
+
+
+def test_state_at_rebuilds_from_snapshot(key):
+    sender = address(ed25519.public_key(key))
+    state = AccountState({sender: 100.0}, snapshot_every=2)
+    chain = [None] + [FakeBlock(i, f"h{i}", [signed(key, "Bob", float(i), i - 1)]) for i in range(1, 6)]
+    history = {}
+    for block in chain[1:]:
+        state.apply_block(block)
+        history[block.index] = dict(state.balances)
+    for height in range(1, 6):
+        assert state.state_at(height, chain) == history[height]
@@ -0,0 +1,60 @@
+import json
+import random
+import pytest
+from common import bench_harness
+
+
+def sized(size: int = 1) -> dict:
+    return {"seconds": size + random.random()}
+
+
+def fixed() -> dict:
+    return {"tps": 100.0}
+
+
+CASES = {"sized": sized, "fixed": fixed}
+GRIDS = {"sized": {"size": [1]}}
+
+
+def test_summarize_confidence_interval():
+    summary = bench_harness.summarize([1.0, 2.0, 3.0])
+    assert summary["mean"] == 2.0 and summary["stdev"] == 1.0
+    # t(0.975, df=2) = 4.303
+    assert summary["ci_high"] - summary["mean"] == pytest.approx(4.303 / 3 ** 0.5)
+    assert bench_harness.summarize([5.0])["ci_low"] == 5.0
+
+
+def test_main_sweeps_only_cases_accepting_param(tmp_path, capsys):
+    path = str(tmp_path / "results.json")
+    bench_harness.main(CASES, GRIDS, ["run", "--sweep", "size=1,3", "--repetitions", "4", "--warmup", "0",
+                                      "--seed", "7", "--output", path])
+    assert "pominiety dla: fixed" in capsys.readouterr().out
+    with open(path) as f:
+        output = json.load(f)
+    assert output["meta"]["seed"] == 7
+    runs = [(entry["case"], entry["params"]) for entry in output["results"]]
+    assert runs == [("sized", {"size": 1}), ("sized", {"size": 3}), ("fixed", {})]
+
+    for entry in output["results"][:2]:
+        samples = entry["samples"]["seconds"]
+        summary = entry["metrics"]["seconds"]
+        assert len(samples) == 4
+        assert summary == bench_harness.summarize(samples)
+        assert summary["ci_low"] < summary["mean"] < summary["ci_high"]
+        assert entry["params"]["size"] <= summary["mean"] < entry["params"]["size"] + 1
+    assert output["results"][2]["metrics"]["tps"]["stdev"] == 0.0
+
+
+def test_main_rejects_sweep_no_case_accepts(tmp_path):
+    with pytest.raises(SystemExit):
+        bench_harness.main(CASES, GRIDS, ["run", "--case", "fixed", "--sweep", "size=1,2",
+                                          "--output", str(tmp_path / "results.json")])
+
+
+def test_compare_flags_regression(tmp_path):
+    baseline, current = str(tmp_path / "base.json"), str(tmp_path / "cur.json")
+    bench_harness.write_results(baseline, [bench_harness.make_entry("sized", {}, {"seconds": [1.0, 1.1, 0.9]})])
+    bench_harness.write_results(current, [bench_harness.make_entry("sized", {}, {"seconds": [2.0, 2.1, 1.9]})])
+    [row] = bench_harness.compare(baseline, current)
+    assert row["regression"] and not row["improvement"]
+    assert row["change"] == pytest.approx(1.0)
@@ -0,0 +1,189 @@
+import os
+import pytest
+from common.block_store import BlockStore, read_blocks
+from common.chain_reader import ChainReader
+
+
+class FakeBlock:
+    # BlockStore potrzebuje tylko to_dict, index, prev_hash i block_hash
+    def __init__(self, index: int, block_hash: str, prev_hash: str):
+        self.index = index
+        self.block_hash = block_hash
+        self.prev_hash = prev_hash
+
+    def to_dict(self) -> dict:
+        return {"index": self.index, "prev_hash": self.prev_hash, "block_hash": self.block_hash, "transactions": []}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FakeBlock":
+        return cls(data["index"], data["block_hash"], data["prev_hash"])
+
+
+def record(index: int, name: str = None) -> dict:
+    return {"index": index, "block_hash": name or f"h{index}", "transactions": [{"sender": "a", "amount": index}]}
+
+
+def hashes(store) -> list:
+    return [r["block_hash"] for r in store]
+
+
+def test_append_and_read(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    with BlockStore(path) as store:
+        assert [store.append(record(i)) for i in range(5)] == list(range(5))
+        assert store.read(3) == record(3)
+    with BlockStore(path) as store:
+        assert list(store) == [record(i) for i in range(5)]
+    assert list(read_blocks(path)) == [record(i) for i in range(5)]
+
+
+def test_recover_truncated_tail(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    with BlockStore(path) as store:
+        for i in range(3):
+            store.append(record(i))
+    size = os.path.getsize(path)
+    # przerwany zapis: naglowek kolejnego rekordu bez calej tresci
+    with open(path, "ab") as f:
+        f.write(b"\x00\x00\x00\x40\x00\x00\x00\x02{\"ind")
+
+    with BlockStore(path) as store:
+        assert len(store) == 3
+        assert os.path.getsize(path) == size
+        store.append(record(3))
+    with BlockStore(path) as store:
+        assert hashes(store) == ["h0", "h1", "h2", "h3"]
+
+
+def test_index_ahead_of_data(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    with BlockStore(path) as store:
+        for i in range(4):
+            store.append(record(i))
+        cut = store.offsets[3]
+    # indeks utrwalony, ostatni rekord nie - obciety plik danych
+    with open(path, "r+b") as f:
+        f.truncate(cut)
+
+    with BlockStore(path) as store:
+        assert hashes(store) == ["h0", "h1", "h2"]
+    assert os.path.getsize(path + ".idx") == 3 * 8
+    with ChainReader(path, FakeBlock) as reader:
+        assert len(reader) == 3
+
+
+def test_reader_scans_records_behind_index(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    with BlockStore(path) as store:
+        for i in range(5):
+            store.append(record(i))
+    # awaria miedzy zapisem danych i indeksu - indeks zna tylko 2 rekordy
+    with open(path + ".idx", "r+b") as f:
+        f.truncate(2 * 8)
+
+    with ChainReader(path, FakeBlock) as reader:
+        assert len(reader) == 5
+        assert [reader.record(i)["block_hash"] for i in range(5)] == ["h0", "h1", "h2", "h3", "h4"]
+
+
+def test_rebuild_missing_index(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    with BlockStore(path) as store:
+        for i in range(4):
+            store.append(record(i))
+    os.remove(path + ".idx")
+    with BlockStore(path) as store:
+        assert hashes(store) == ["h0", "h1", "h2", "h3"]
+    assert os.path.getsize(path + ".idx") == 4 * 8
+
+
+def test_truncate_keeps_height_positions(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    with BlockStore(path) as store:
+        for i in range(5):
+            store.append(record(i))
+        store.truncate(2)
+        store.append(record(2, "x2"))
+        assert hashes(store) == ["h0", "h1", "x2"]
+    with BlockStore(path) as store:
+        assert hashes(store) == ["h0", "h1", "x2"]
+    with ChainReader(path, FakeBlock) as reader:
+        assert reader.record(2)["block_hash"] == "x2"
+
+
+def test_write_insert_moves_reorg_to_side_store(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    genesis = FakeBlock(0, "g", "0")
+    a1, a2 = FakeBlock(1, "a1", "g"), FakeBlock(2, "a2", "a1")
+    b1, b2, b3 = FakeBlock(1, "b1", "g"), FakeBlock(2, "b2", "b1"), FakeBlock(3, "b3", "b2")
+    with BlockStore(path) as store:
+        store.append(genesis.to_dict())
+        store.write_insert(a1, [], [a1], 1)
+        store.write_insert(a2, [], [a2], 2)
+        # boczna galaz nie zmienia pozycji w pliku glownym
+        store.write_insert(b1, [], [], 3)
+        store.write_insert(b2, [], [], 3)
+        assert hashes(store) == ["g", "a1", "a2"]
+        store.write_insert(b3, [a1, a2], [b1, b2, b3], 1)
+        assert hashes(store) == ["g", "b1", "b2", "b3"]
+        assert [r["block_hash"] for r in store.side_records()] == ["b1", "b2", "a1", "a2"]
+
+    with BlockStore(path) as store:
+        assert hashes(store) == ["g", "b1", "b2", "b3"]
+        assert len(list(store.side_records())) == 4
+
+
+def test_write_insert_truncates_at_fork_height(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    genesis = FakeBlock(0, "g", "0")
+    # indeks bloku nie decyduje o miejscu obciecia - tylko wysokosc z drzewa
+    a1 = FakeBlock(57, "a1", "g")
+    b1, b2 = FakeBlock(1, "b1", "g"), FakeBlock(2, "b2", "b1")
+    with BlockStore(path) as store:
+        store.append(genesis.to_dict())
+        store.write_insert(a1, [], [a1], 1)
+        store.write_insert(b2, [a1], [b1, b2], 1)
+        assert hashes(store) == ["g", "b1", "b2"]
+        with pytest.raises(ValueError, match="wysokosci 5"):
+            store.write_insert(b2, [], [b2], 5)
+        assert hashes(store) == ["g", "b1", "b2"]
+
+
+def test_load_waits_for_parent_written_later(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    with BlockStore(path) as store:
+        store.append(FakeBlock(0, "g", "0").to_dict())
+        # dziecko trafilo do magazynu bocznego przed odlaczonym pozniej rodzicem
+        store.append_side(FakeBlock(2, "c2", "c1").to_dict())
+        store.append_side(FakeBlock(1, "c1", "g").to_dict())
+
+        known = set()
+        order = []
+        for block in store.load(FakeBlock.from_dict, known.__contains__):
+            known.add(block.block_hash)
+            order.append(block.block_hash)
+    assert order == ["g", "c1", "c2"]
+
+
+def test_sync_main_repairs_interrupted_reorg(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    main = [FakeBlock(0, "g", "0"), FakeBlock(1, "b1", "g"), FakeBlock(2, "b2", "b1")]
+    with BlockStore(path) as store:
+        for r in (main[0].to_dict(), FakeBlock(1, "a1", "g").to_dict()):
+            store.append(r)
+        store.sync_main(main)
+        assert hashes(store) == ["g", "b1", "b2"]
+        assert [r["block_hash"] for r in store.side_records()] == ["a1"]
+        store.sync_main(main)  # zgodny plik - bez zmian
+        assert len(list(store.side_records())) == 1
+
+
+def test_truncate_flag_removes_side_store(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    with BlockStore(path) as store:
+        store.append(record(0))
+        store.append_side(record(1))
+    assert os.path.exists(path + ".side")
+    with BlockStore(path, truncate=True) as store:
+        assert len(store) == 0
+        assert list(store.side_records()) == []
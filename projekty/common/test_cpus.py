@@ -0,0 +1,14 @@
+from common.cpus import available_cpus, cgroup_cpu_limit
+
+
+def test_cgroup_cpu_limit(tmp_path):
+    path = tmp_path / "cpu.max"
+    path.write_text("250000 100000\n")
+    assert cgroup_cpu_limit(str(path)) == 3
+    path.write_text("max 100000\n")
+    assert cgroup_cpu_limit(str(path)) is None
+    assert cgroup_cpu_limit(str(tmp_path / "missing")) is None
+
+
+def test_available_cpus_is_positive():
+    assert available_cpus() >= 1
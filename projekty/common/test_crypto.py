@@ -0,0 +1,78 @@
+import pytest
+from common import ed25519
+from common.merkle import MerkleTree
+from common.sigverify import SignatureVerifier
+from common.transaction import Transaction, address
+
+# RFC 8032, rozdzial 7.1: TEST 1, TEST 2, TEST 3 (sekret, klucz publiczny, wiadomosc, podpis)
+RFC8032_VECTORS = [
+    ("9d61b19deffd5a60ba844af492ec2cc44449c5697b326919703bac031cae7f60",
+     "d75a980182b10ab7d54bfed3c964073a0ee172f3daa62325af021a68f707511a",
+     "",
+     "e5564300c360ac729086e2cc806e828a84877f1eb8e5d974d873e065224901555fb8821590a33bacc61e39701cf9b46bd25bf5f0595bbe24655141438e7a100b"),
+    ("4ccd089b28ff96da9db6c346ec114e0f5b8a319f35aba624da8cf6ed4fb8a6fb",
+     "3d4017c3e843895a92b70aa74d1b7ebc9c982ccf2ec4968cc0cd55f12af4660c",
+     "72",
+     "92a009a9f0d4cab8720e820b5f642540a2b27b5416503f8fb3762223ebdb69da085ac1e43e15996e458f3613d0f11d8c387b2eaeb4302aeeb00d291612bb0c00"),
+    ("c5aa8df43f9f837bedb7442f31dcb7b166d38535076f094b85ce3a2e0b4458f7",
+     "fc51cd8e6218a1a38da47ed00230f0580816ed13ba3303ac5deb911548908025",
+     "af82",
+     "6291d657deec24024827e69c3abe01a30ce548a284743a445e3680d7db5ac3ac18ff9b538d16f290ae67f760984dc6594a7c15e9716ed28dc027beceea1ec40a"),
+]
+
+
+@pytest.mark.parametrize("secret, public, message, signature", RFC8032_VECTORS)
+def test_rfc8032_vectors(secret, public, message, signature):
+    secret, message = bytes.fromhex(secret), bytes.fromhex(message)
+    assert ed25519.public_key(secret).hex() == public
+    assert ed25519.sign(secret, message).hex() == signature
+    assert ed25519.verify(bytes.fromhex(public), message, bytes.fromhex(signature))
+    assert not ed25519.verify(bytes.fromhex(public), message + b"x", bytes.fromhex(signature))
+
+
+@pytest.mark.parametrize("size", range(1, 10))
+def test_merkle_proofs_for_odd_and_even_sizes(size):
+    leaves = [f"tx-{i}".encode() for i in range(size)]
+    tree = MerkleTree(leaves)
+    incremental = MerkleTree()
+    incremental.extend(leaves)
+    assert incremental.root() == tree.root()
+    for index, data in enumerate(leaves):
+        proof = tree.proof(index)
+        assert MerkleTree.verify_proof(data, proof, tree.root())
+        assert not MerkleTree.verify_proof(b"other", proof, tree.root())
+    with pytest.raises(IndexError):
+        tree.proof(size)
+
+
+@pytest.fixture(scope="module")
+def keys():
+    return ed25519.generate_private_key(), ed25519.generate_private_key()
+
+
+def test_signature_bound_to_sender(keys):
+    owner, stranger = keys
+    with pytest.raises(ValueError):
+        Transaction("Alice", "Bob", 1.0).sign(owner)
+
+    tx = Transaction(address(ed25519.public_key(owner)), "Bob", 1.0, nonce=3)
+    tx.sign(owner)
+    assert tx.verify()
+    restored = Transaction.from_dict(tx.to_dict())
+    assert restored.nonce == 3 and restored.verify() and restored.txid == tx.txid
+
+    # poprawny podpis cudzym kluczem nie pozwala wydac srodkow nadawcy
+    forged = Transaction(tx.sender, "Mallory", 1.0, nonce=3)
+    forged.public_key = ed25519.public_key(stranger)
+    forged.signature = ed25519.sign(stranger, forged.signing_payload())
+    assert not forged.verify()
+    assert SignatureVerifier(workers=1).verify([tx, forged]) == [True, False]
+
+
+def test_nonce_is_signed(keys):
+    owner = keys[0]
+    tx = Transaction(address(ed25519.public_key(owner)), "Bob", 1.0, nonce=0)
+    tx.sign(owner)
+    replay = Transaction.from_dict(dict(tx.to_dict(), nonce=1))
+    assert not replay.verify()
+    assert replay.txid != tx.txid
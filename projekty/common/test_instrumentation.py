@@ -0,0 +1,69 @@
+import io
+import json
+import urllib.request
+from common.instrumentation import JsonLinesSink, Metrics, PrintSink, serve_prometheus
+
+
+def test_counters_histograms_and_prometheus_text():
+    registry = Metrics()
+    registry.counter("hashes_total", "Liczba hashy")
+    registry.histogram("seal_seconds", "Czas kopania", buckets=(0.1, 1.0))
+    registry.inc("hashes_total", 5)
+    for value in (0.05, 0.5, 0.7, 3.0):
+        registry.observe("seal_seconds", value)
+
+    histogram = registry.histograms["seal_seconds"]
+    assert histogram.counts == [1, 2, 1] and histogram.mean == 1.0625
+    text = registry.prometheus_text()
+    assert "# TYPE hashes_total counter\nhashes_total 5\n" in text
+    # kubelki skumulowane, jak w Prometheusie
+    assert 'seal_seconds_bucket{le="1.0"} 3\nseal_seconds_bucket{le="+Inf"} 4\n' in text
+    assert "seal_seconds_count 4\n" in text
+
+    registry.reset()
+    assert registry.counters["hashes_total"].value == 0 and histogram.counts == [0, 0, 0]
+
+
+def test_sinks_receive_events_and_enable_metrics():
+    registry = Metrics()
+    events = []
+    assert not registry.enabled
+    registry.add_sink(lambda event, fields: events.append((event, fields)))
+    assert registry.enabled
+    registry.emit("block_added", index=3, hash="ab", mining_time=0.5)
+    assert events == [("block_added", {"index": 3, "hash": "ab", "mining_time": 0.5})]
+
+
+def test_print_sink_formats_known_and_unknown_events():
+    stream = io.StringIO()
+    sink = PrintSink(stream)
+    sink("block_added", {"index": 3, "hash": "ab"})
+    sink("custom", {"a": 1, "b": "x"})
+    assert stream.getvalue() == "[Blockchain] Block 3 mined: ab\n[custom] a=1, b=x\n"
+
+
+def test_json_lines_sink_appends_events(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    sink = JsonLinesSink(path)
+    sink("mining_started", {"index": 1, "difficulty": 3})
+    sink("block_sealed", {"index": 1})
+    sink.close()
+    with open(path) as f:
+        records = [json.loads(line) for line in f]
+    assert [r["event"] for r in records] == ["mining_started", "block_sealed"]
+    assert records[0]["difficulty"] == 3 and records[0]["ts"] <= records[1]["ts"]
+
+
+def test_prometheus_endpoint_serves_metrics():
+    registry = Metrics()
+    registry.inc("blocks_sealed_total")
+    server = serve_prometheus(port=0, registry=registry)
+    try:
+        host, port = server.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics") as response:
+            body = response.read().decode()
+        assert registry.enabled
+        assert "blocks_sealed_total 1" in body
+    finally:
+        server.shutdown()
+        server.server_close()
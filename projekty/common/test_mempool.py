@@ -0,0 +1,97 @@
+from common import ed25519
+from common.mempool import Mempool, PriorityMempool
+from common.transaction import Transaction, address
+
+
+def test_columnar_mempool_round_trip():
+    secret = bytes(range(32))
+    signed = Transaction(address(ed25519.public_key(secret)), "bob", 2.5, fee=0.1, nonce=3)
+    signed.sign(secret)
+    transactions = [Transaction("alice", "bob", 1.0), signed, Transaction("bob", "alice", 0.5, fee=0.2)]
+
+    pool = Mempool(transactions)
+    assert len(pool) == 3
+    # nazwy internowane raz, niezaleznie od liczby transakcji
+    assert sorted(pool.names) == sorted({"alice", "bob", signed.sender})
+    assert [tx.txid for tx in pool] == [tx.txid for tx in transactions]
+    assert pool[1].verify() and pool[1].nonce == 3
+
+
+def test_mempool_view_is_lazy_slice():
+    pool = Mempool(Transaction(f"u{i}", "sink", float(i)) for i in range(10))
+    view = pool[2:8:2]
+    assert len(view) == 3
+    assert [tx.amount for tx in view] == [2.0, 4.0, 6.0]
+    assert view[-1].sender == "u6"
+    assert [tx.amount for tx in view[1:]] == [4.0, 6.0]
+    # widok czyta kolumny mempoola - dopisane transakcje nie zmieniaja zakresu
+    pool.append(Transaction("late", "sink", 99.0))
+    assert len(view) == 3 and pool[-1].amount == 99.0
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def paying(fee: float, name: str = "a") -> Transaction:
+    # ta sama dlugosc nazw - ten sam rozmiar, kolejnosc wyznacza sama oplata
+    return Transaction(name, "b", 1.0, fee=fee)
+
+
+def test_template_orders_by_fee_rate_then_arrival():
+    pool = PriorityMempool()
+    low, high, tie_first, tie_second = paying(0.1, "w"), paying(0.9, "x"), paying(0.5, "y"), paying(0.5, "z")
+    assert pool.add_many([low, high, tie_first, tie_second]) == 4
+    assert not pool.add(paying(0.1, "w"))  # duplikat po txid
+
+    assert pool.build_template() == [high, tie_first, tie_second, low]
+    assert pool.build_template(max_count=2) == [high, tie_first]
+    # szablon nie usuwa transakcji z mempoola
+    assert len(pool) == 4
+    assert pool.build_template(max_bytes=2 * high.size) == [high, tie_first]
+
+
+def test_template_skips_removed_and_committed_transactions():
+    pool = PriorityMempool()
+    transactions = [paying(fee, name) for fee, name in ((0.3, "p"), (0.2, "q"), (0.1, "r"))]
+    pool.add_many(transactions)
+    pool.remove([transactions[1].txid])
+    assert pool.build_template() == [transactions[0], transactions[2]]
+
+    class Block:
+        pass
+    block = Block()
+    block.transactions = transactions[:1]
+    assert pool.remove_block(block) == 1
+    assert pool.build_template() == [transactions[2]]
+    assert pool.total_bytes == transactions[2].size
+
+
+def test_eviction_drops_cheapest_over_max_bytes():
+    size = paying(0.1).size
+    pool = PriorityMempool(max_bytes=2 * size)
+    cheap, mid, rich = paying(0.1, "c"), paying(0.2, "m"), paying(0.3, "r")
+    assert pool.add(cheap) and pool.add(mid)
+    assert pool.add(rich)
+    assert cheap.txid not in pool and pool.total_bytes == 2 * size
+    # nowa transakcja tansza od wszystkich wylatuje od razu
+    assert not pool.add(paying(0.05, "n"))
+    assert pool.build_template() == [rich, mid]
+
+
+def test_eviction_drops_transactions_older_than_max_age():
+    clock = Clock()
+    pool = PriorityMempool(max_age=10.0, clock=clock)
+    old = paying(0.9, "o")
+    pool.add(old)
+    clock.now = 6.0
+    young = paying(0.1, "y")
+    pool.add(young)
+    clock.now = 11.0
+    pool.add(paying(0.2, "n"))
+    assert old.txid not in pool and young.txid in pool
+    assert len(pool) == 2
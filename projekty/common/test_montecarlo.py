@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+from common import montecarlo
+from common.montecarlo import block_winners, fork_overtakes, normalize, race
+
+
+def rng() -> np.random.Generator:
+    return np.random.default_rng(12345)
+
+
+def test_normalize_rejects_bad_weights():
+    assert list(normalize([1, 3])) == [0.25, 0.75]
+    for weights in ([], [1, -1], [0, 0], [[1, 2]]):
+        with pytest.raises(ValueError):
+            normalize(weights)
+
+
+def test_block_winners_follow_weights():
+    wins = block_winners([60, 30, 10], blocks=100, trials=2000, rng=rng())
+    assert wins.shape == (2000, 3)
+    assert (wins.sum(axis=1) == 100).all()
+    assert wins.mean(axis=0) == pytest.approx([60, 30, 10], abs=1.0)
+
+
+def test_race_success_grows_with_attacker_share():
+    rates = [race([1 - share, share], 1, trials=20_000, rng=rng()).success_rate for share in (0.0, 0.1, 0.3, 0.9)]
+    assert rates[0] == 0.0
+    assert rates[0] < rates[1] < rates[2] < rates[3]
+    assert rates[3] > 0.95
+
+    result = race([0.6, 0.4], 1, confirmations=3, trials=5000, rng=rng())
+    # udany atak zastepuje co najmniej `confirmations` uczciwych blokow
+    assert (result.depth[result.success] >= 3).all()
+    assert result.stderr == pytest.approx((result.success_rate * (1 - result.success_rate) / 5000) ** 0.5)
+
+
+def test_race_uses_block_weights_for_fork_choice():
+    # rzadkie, ale ciezkie bloki atakujacego (duzy stake, rzadko lider)
+    light = race([0.8, 0.2], 1, trials=5000, rng=rng())
+    heavy = race([0.8, 0.2], 1, trials=5000, block_weights=[1.0, 10.0], rng=rng())
+    assert heavy.success_rate > 3 * light.success_rate
+
+
+def test_race_is_chunked(monkeypatch):
+    monkeypatch.setattr(montecarlo, "CHUNK", 7)
+    result = race([0.5, 0.5], 1, trials=30, rng=rng())
+    assert result.trials == 30 and result.depth.shape == (30,)
+
+
+def test_fork_overtakes_compares_branch_weights(monkeypatch):
+    # rowne bloki: fork 3 blokow nie przejmie galezi 4 blokow, potrzeba 5
+    won, needed = fork_overtakes([1, 1], 0, main_blocks=4, fork_length=3, trials=100, rng=rng())
+    assert not won.any() and (needed == 5).all()
+
+    monkeypatch.setattr(montecarlo, "CHUNK", 16)
+    won, needed = fork_overtakes([3, 1], 1, main_blocks=2, fork_length=4, trials=100, rng=rng())
+    # galaz glowna wazy od 2 (dwa bloki Minora) do 6 (dwa bloki Dominanta)
+    assert set(needed) <= {3, 5, 7}
+    assert (won == (needed <= 4)).all()
+    assert 0 < won.mean() < 1
@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import pytest
+from common.block_tree import BlockTree
+from common.node import Node
+from common.transaction import Transaction
+
+
+class FakeBlock:
+    def __init__(self, index: int, block_hash: str, prev_hash: str, transactions: list = ()):
+        self.index = index
+        self.block_hash = block_hash
+        self.prev_hash = prev_hash
+        self.transactions = list(transactions)
+        self.hashed_in = None
+
+    def calculate_hash(self) -> str:
+        self.hashed_in = threading.current_thread()
+        return self.block_hash
+
+    def to_dict(self) -> dict:
+        return {"index": self.index, "prev_hash": self.prev_hash, "block_hash": self.block_hash,
+                "timestamp": 0.0, "transactions": []}
+
+
+class FakeVerifier:
+    # podpis "poprawny" ma kazda transakcja z kwota inna niz 13
+    def __init__(self):
+        self.threads = []
+
+    def verify(self, transactions) -> list:
+        self.threads.append(threading.current_thread())
+        return [tx.amount != 13 for tx in transactions]
+
+
+class FakeChain:
+    def __init__(self, verifier: FakeVerifier = None):
+        self.tree = BlockTree(FakeBlock(0, "g", "0"), lambda block: 1.0)
+        self.verifier = verifier
+        self.mempool = None
+
+    def get_last_block(self):
+        return self.tree.main[-1]
+
+    def insert_block(self, block):
+        if block.block_hash.startswith("bad"):
+            raise ValueError(f"Blok {block.index}: odrzucony")
+        return self.tree.insert(block)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def run(node: Node, *coroutines):
+    async def main():
+        results = [await coroutine for coroutine in coroutines]
+        await node.close()
+        return results
+    return asyncio.run(main())
+
+
+def test_orphan_connected_when_parent_arrives():
+    node = Node(FakeChain())
+    parent, child = FakeBlock(1, "a1", "g"), FakeBlock(2, "a2", "a1")
+    assert run(node, node.receive_block(child), node.receive_block(parent)) == [False, True]
+    assert node.chain.tree.main[-1] is child
+    assert not node.orphans and not node.orphan_children
+
+
+def test_rejected_block_keeps_tip_and_orphans_wait():
+    node = Node(FakeChain())
+    bad, child = FakeBlock(1, "bad1", "g"), FakeBlock(2, "b2", "bad1")
+    assert run(node, node.receive_block(child), node.receive_block(bad)) == [False, False]
+    assert node.chain.get_last_block().block_hash == "g"
+    assert list(node.orphans) == ["b2"]
+
+
+def test_orphan_pool_is_capped():
+    node = Node(FakeChain(), max_orphans=2)
+    orphans = [FakeBlock(5, f"o{i}", f"missing{i}") for i in range(3)]
+    run(node, *(node.receive_block(block) for block in orphans))
+    assert list(node.orphans) == ["o1", "o2"]
+    assert "missing0" not in node.orphan_children
+    # usunieta sierota moze przyjsc ponownie
+    assert "o0" not in node.seen_blocks
+
+
+def test_orphans_expire():
+    clock = Clock()
+    node = Node(FakeChain(), orphan_ttl=10.0, clock=clock)
+
+    async def arrive():
+        await node.receive_block(FakeBlock(5, "old", "x"))
+        clock.now = 5.0
+        await node.receive_block(FakeBlock(5, "young", "y"))
+        clock.now = 12.0
+        await node.receive_block(FakeBlock(5, "new", "z"))
+
+    run(node, arrive())
+    assert list(node.orphans) == ["young", "new"]
+    assert set(node.orphan_children) == {"y", "z"}
+
+
+def test_verification_runs_off_the_event_loop():
+    verifier = FakeVerifier()
+    node = Node(FakeChain(verifier))
+    block = FakeBlock(1, "a1", "g", [Transaction("a", "b", 1.0)])
+    good, forged = Transaction("a", "b", 2.0, fee=1.0), Transaction("c", "d", 13, fee=2.0)
+    node.mempool.add_many([good, forged])
+
+    async def main():
+        loop_thread = threading.current_thread()
+        await node.receive_block(block)
+        transactions = await node.template()
+        await node.close()
+        return loop_thread, transactions
+
+    loop_thread, transactions = asyncio.run(main())
+    assert block.hashed_in is not loop_thread
+    assert verifier.threads and all(thread is not loop_thread for thread in verifier.threads)
+    # transakcja z blednym podpisem znika z szablonu i z mempoola
+    assert transactions == [good]
+    assert forged.txid not in node.mempool
+
+
+def test_malformed_message_rejected():
+    node = Node(FakeChain())
+    with pytest.raises(ValueError, match="brak pola"):
+        run(node, node.handle_message({"type": "block", "block": {"index": 1}}))
@@ -0,0 +1,63 @@
+import csv
+import sys
+import time
+import subprocess
+from common import resource_sampler
+from common.resource_sampler import ResourceSampler, write_usage_csv
+
+
+def busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_measure_counts_cpu_of_the_block():
+    sampler = ResourceSampler()
+    with sampler.measure() as usage:
+        busy(0.1)
+    assert usage.wall >= 0.1
+    assert 0.05 < usage.cpu_time <= usage.wall + 0.05
+    assert usage.peak_rss_mb >= usage.rss_mb > 0
+    assert set(usage.to_dict()) >= {"cpu_percent", "ctx_switches"}
+
+
+def test_measure_includes_child_processes():
+    sampler = ResourceSampler()
+    with sampler.measure() as usage:
+        subprocess.run([sys.executable, "-c", "import time\nend = time.time() + 0.3\nwhile time.time() < end: pass"],
+                       check=True)
+    # proces glowny tylko czeka - czas CPU pochodzi z potomka
+    assert usage.cpu_time > 0.2
+
+
+def test_background_sampling_has_fixed_period():
+    with ResourceSampler(period=0.02) as sampler:
+        with sampler.measure() as usage:
+            time.sleep(0.15)
+    count = len(sampler.samples)
+    time.sleep(0.05)
+    assert count >= 5 and len(sampler.samples) == count  # watek zatrzymany
+    assert usage.peak_rss_mb >= max(s.rss_mb for s in sampler.samples[1:-1])
+
+
+def test_stat_parser_handles_spaces_in_command(tmp_path, monkeypatch):
+    fields = ["S"] + ["0"] * 10 + ["7", "3", "20", "10"] + ["0"] * 6 + ["42"] + ["0"] * 20
+    (tmp_path / "99").mkdir()
+    (tmp_path / "99" / "stat").write_text("99 (a (b) c) " + " ".join(fields))
+    monkeypatch.setattr(resource_sampler, "PROC", str(tmp_path))
+    assert resource_sampler._read_stat(99) == (10, 30, 42)
+
+
+def test_rusage_fallback_and_csv(tmp_path):
+    sampler = ResourceSampler()
+    sampler.use_proc = False
+    with sampler.measure() as usage:
+        busy(0.05)
+    assert usage.cpu_time > 0 and usage.rss_mb > 0
+
+    path = str(tmp_path / "usage.csv")
+    write_usage_csv(path, [usage.to_dict(), usage.to_dict()])
+    with open(path, newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 2 and float(rows[0]["cpu_time"]) == usage.cpu_time
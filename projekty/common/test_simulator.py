@@ -0,0 +1,97 @@
+import pytest
+from common.block_tree import BlockTree
+from common.simulator import Network, SimNode, SimReport, Simulator, build_network, finality_times
+
+
+class FakeBlock:
+    def __init__(self, index: int, block_hash: str, prev_hash: str):
+        self.index = index
+        self.block_hash = block_hash
+        self.prev_hash = prev_hash
+
+
+class FakeChain:
+    def __init__(self):
+        self.tree = BlockTree(FakeBlock(0, "g", "0"), lambda block: 1.0)
+
+    @property
+    def chain(self) -> list:
+        return self.tree.main
+
+    def get_last_block(self):
+        return self.tree.main[-1]
+
+    def insert_block(self, block):
+        return self.tree.insert(block)
+
+
+def test_events_run_in_time_then_schedule_order():
+    sim = Simulator()
+    seen = []
+    sim.schedule(2.0, seen.append, "late")
+    sim.schedule(1.0, seen.append, "first")
+    sim.schedule(1.0, seen.append, "second")
+    sim.run(1.5)
+    assert seen == ["first", "second"] and sim.now == 1.5
+    sim.run(3.0)
+    assert seen == ["first", "second", "late"] and sim.events == 3
+
+
+def test_link_serializes_messages_by_bandwidth():
+    sim = Simulator()
+    network = Network(sim, 2, latency=0.5, bandwidth=1000)
+    arrivals = []
+    for _ in range(2):
+        network.send(0, 1, 1000, lambda: arrivals.append(sim.now))
+    sim.run(10.0)
+    # drugi komunikat czeka, az lacze wysle pierwszy
+    assert arrivals == pytest.approx([1.5, 2.5])
+    assert network.messages == 2 and network.bytes_sent == 2000
+
+
+def test_partition_holds_messages_until_it_ends():
+    sim = Simulator()
+    network = Network(sim, 3, latency=0.1, bandwidth=1e9)
+    network.add_partition(0.0, 5.0, [{0, 1}, {2}])
+    arrivals = {}
+    network.send(0, 1, 10, lambda: arrivals.setdefault(1, sim.now))
+    network.send(0, 2, 10, lambda: arrivals.setdefault(2, sim.now))
+    sim.run(10.0)
+    assert arrivals[1] == pytest.approx(0.1)
+    assert arrivals[2] == pytest.approx(5.1)
+
+
+def test_nodes_flood_blocks_and_connect_orphans():
+    sim = Simulator()
+    network = Network(sim, 3, latency=1.0, bandwidth=1e9)
+    nodes = [SimNode(i, FakeChain(), sim, network, block_size=100) for i in range(3)]
+    build_network(nodes)
+    parent, child = FakeBlock(1, "a1", "g"), FakeBlock(2, "a2", "a1")
+
+    # dziecko dociera do wezla 2 przed rodzicem
+    nodes[2].receive(child)
+    assert "a1" in nodes[2].orphans
+    nodes[0].publish(parent)
+    sim.run(2.0)
+    assert nodes[2].chain.get_last_block() is child
+    assert not nodes[2].orphans
+    assert nodes[1].arrivals["a1"] == pytest.approx(1.0)
+
+
+def test_finality_and_report():
+    nodes = [SimNode(i, FakeChain(), Simulator(), None, 0) for i in range(2)]
+    blocks = [FakeBlock(h, f"b{h}", f"b{h - 1}" if h > 1 else "g") for h in range(1, 5)]
+    for node in nodes:
+        for block in blocks:
+            node.chain.insert_block(block)
+    created = {block.block_hash: float(block.index) for block in blocks}
+    for block in blocks:
+        nodes[0].arrivals[block.block_hash] = block.index + 0.5
+        nodes[1].arrivals[block.block_hash] = block.index + 1.0
+    # blok 1 przykryty blokiem 3 (2 potwierdzenia) na obu wezlach w chwili 4.0
+    assert finality_times(nodes, created, 2) == [3.0, 3.0]
+
+    report = SimReport(3600.0, produced=10, main_blocks=8, finality=[3.0, 5.0], attacks=4, attack_successes=1)
+    assert report.orphan_rate == pytest.approx(0.2)
+    assert report.mean_finality == 4.0
+    assert report.attack_success_rate == 0.25
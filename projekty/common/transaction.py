@@ -0,0 +1,117 @@
+import struct
+import hashlib
+from common import ed25519
+
+NONCE = struct.Struct(">Q")
+ADDRESS_HEX = 40  # adres konta: 20 bajtow sha256 klucza publicznego, hex
+
+
+def address(public_key: bytes) -> str:
+    """
+    Adres konta wyprowadzony z klucza publicznego Ed25519. Podpisana
+    transakcja musi miec taki nadawce - podpis wiaze sie z kontem.
+    """
+    return hashlib.sha256(public_key).hexdigest()[:ADDRESS_HEX]
+
+
+class Transaction:
+    # bez __dict__ - przy milionach transakcji w mempoolu narzut na obiekt sie liczy
+    __slots__ = ("sender", "receiver", "amount", "fee", "public_key", "signature", "nonce", "_txid")
+
+    def __init__(
+        self,
+        sender: str,
+        receiver: str,
+        amount: float,
+        fee: float = 0.0,
+        public_key: bytes = None,
+        signature: bytes = None,
+        nonce: int = 0
+    ):
+        self.sender = sender
+        self.receiver = receiver
+        self.amount = amount
+        self.fee = fee  # oplata - decyduje o kolejnosci w mempoolu
+        # podpis Ed25519 nadawcy; transakcje bez podpisu zostaja dla starych scenariuszy
+        self.public_key = public_key
+        self.signature = signature
+        # kolejny numer transakcji nadawcy - podpisany, wiec transakcji nie da sie powtorzyc
+        self.nonce = nonce
+        self._txid = None
+
+    def to_bytes(self) -> bytes:
+        # dlugosc + utf-8 dla nazw, amount jako double - bez niejednoznacznosci
+        sender = self.sender.encode("utf-8")
+        receiver = self.receiver.encode("utf-8")
+        data = struct.pack(
+            f">H{len(sender)}sH{len(receiver)}sd",
+            len(sender), sender, len(receiver), receiver, float(self.amount)
+        )
+        if self.fee:
+            # oplata dopisywana tylko gdy niezerowa - stare bloki maja te same hashe
+            data += struct.pack(">d", float(self.fee))
+        return data
+
+    @property
+    def size(self) -> int:
+        # rozmiar w bajtach liczony do limitu bloku
+        return len(self.serialize())
+
+    def signing_payload(self) -> bytes:
+        # nonce i klucz publiczny sa czescia podpisywanej wiadomosci
+        if self.public_key is None:
+            return self.to_bytes()
+        return self.to_bytes() + NONCE.pack(self.nonce) + self.public_key
+
+    def serialize(self) -> bytes:
+        """
+        Pelna tresc transakcji razem z podpisem - lisc drzewa Merkle bloku
+        i podstawa txid. Dla transakcji bez podpisu to samo co to_bytes().
+        """
+        return self.signing_payload() + (self.signature or b"")
+
+    def sign(self, private_key: bytes):
+        public_key = ed25519.public_key(private_key)
+        if self.sender != address(public_key):
+            raise ValueError(f"Nadawca {self.sender} nie jest adresem klucza {address(public_key)}")
+        self.public_key = public_key
+        self.signature = ed25519.sign(private_key, self.signing_payload())
+        self._txid = None
+
+    def verify(self) -> bool:
+        if self.public_key is None or self.signature is None:
+            return False
+        if self.sender != address(self.public_key):
+            return False
+        return ed25519.verify(self.public_key, self.signing_payload(), self.signature)
+
+    @property
+    def txid(self) -> str:
+        """
+        Identyfikator transakcji - sha256 z tresci i podpisu.
+        """
+        if self._txid is None:
+            self._txid = hashlib.sha256(self.serialize()).hexdigest()
+        return self._txid
+
+    def to_dict(self) -> dict:
+        data = {"sender": self.sender, "receiver": self.receiver, "amount": self.amount}
+        if self.fee:
+            data["fee"] = self.fee
+        if self.signature is not None:
+            data["public_key"] = self.public_key.hex()
+            data["signature"] = self.signature.hex()
+            data["nonce"] = self.nonce
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Transaction":
+        if "signature" in data:
+            return cls(
+                data["sender"], data["receiver"], data["amount"], data.get("fee", 0.0),
+                bytes.fromhex(data["public_key"]), bytes.fromhex(data["signature"]), data.get("nonce", 0)
+            )
+        return cls(data["sender"], data["receiver"], data["amount"], data.get("fee", 0.0))
+
+    def __repr__(self):
+        return f"Transaction(sender={self.sender}, receiver={self.receiver}, amount={self.amount})"
@@ -0,0 +1,122 @@
+import atexit
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Sequence, Tuple
+from common.chain_reader import ChainReader
+from common.cpus import available_cpus
+
+# pula procesow wspolna dla kolejnych weryfikacji (validate_new po kazdym bloku
+# nie placi za start procesow); tworzona przy pierwszym uzyciu
+_executor: ProcessPoolExecutor = None
+_executor_workers = 0
+
+
+class ValidationReport:
+    """
+    Wynik weryfikacji zakresu blokow: lista bledow (indeks, opis), indeksy
+    starych blokow PoW bez celu (legacy - ich pracy nie da sie sprawdzic),
+    liczba sprawdzonych blokow i przepustowosc w blokach na sekunde.
+    """
+    def __init__(self, start: int, stop: int, errors: List[Tuple[int, str]], seconds: float,
+                 legacy: List[int] = None):
+        self.start = start
+        self.stop = stop
+        self.errors = errors
+        self.seconds = seconds
+        self.legacy = legacy or []
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors and not self.legacy
+
+    @property
+    def checked(self) -> int:
+        return self.stop - self.start
+
+    @property
+    def blocks_per_sec(self) -> float:
+        return self.checked / self.seconds if self.seconds > 0 else 0.0
+
+    def __repr__(self):
+        return (f"ValidationReport(blocks={self.start}..{self.stop}, ok={self.ok}, "
+                f"errors={len(self.errors)}, legacy={len(self.legacy)}, {self.blocks_per_sec:.0f} blocks/s)")
+
+
+def read_records(path: str, block_class, start: int, stop: int) -> List[dict]:
+    # zadanie procesu roboczego: rekordy czytane wprost z magazynu zamiast
+    # serializacji blokow w procesie glownym. Czytnik otwierany jest przy kazdym
+    # zadaniu (z indeksem to O(1)) - reorganizacja moze nadpisac plik bez zmiany
+    # jego dlugosci, a zapamietany mmap i offsety wskazywalyby stare bajty
+    with ChainReader(path, block_class) as reader:
+        return [reader.record(height) for height in range(start, stop)]
+
+
+def check_links(links: List[tuple], prev: tuple = None) -> List[Tuple[int, str]]:
+    # tani przebieg koncowy: ciaglosc indeksow i prev_hash;
+    # ogniwa to krotki zaczynajace sie od (index, prev_hash, block_hash)
+    errors = []
+    for link in links:
+        if prev is not None:
+            if link[0] != prev[0] + 1:
+                errors.append((link[0], f"nieciagly indeks po bloku {prev[0]}"))
+            if link[1] != prev[2]:
+                errors.append((link[0], "prev_hash nie wskazuje na poprzedni blok"))
+        prev = link
+    return errors
+
+
+def get_executor(workers: int) -> ProcessPoolExecutor:
+    global _executor, _executor_workers
+    if _executor is None or _executor_workers != workers:
+        close_executor()
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_workers = workers
+    return _executor
+
+
+def close_executor():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown()
+        _executor = None
+
+
+atexit.register(close_executor)
+
+
+def check_chunks(
+    blocks: Sequence,
+    start: int,
+    stop: int,
+    workers: int,
+    chunk_size: int,
+    check_records: Callable,
+    check_range: Callable
+) -> Tuple[List[Tuple[int, str]], List[tuple]]:
+    """
+    Dzieli zakres [start, stop) na paczki i sprawdza je `check_records`
+    (lista rekordow -> (bledy, ogniwa)). Male zakresy i workers=1 sprawdzane
+    sa w biezacym procesie. Dla ChainReadera procesy robocze dostaja tylko
+    zakresy wysokosci (`check_range(path, start, stop)`) i czytaja plik same.
+    """
+    workers = workers or available_cpus()
+    bounds = [(i, min(i + chunk_size, stop)) for i in range(start, stop, chunk_size)]
+    in_process = workers == 1 or len(bounds) <= 1
+    if isinstance(blocks, ChainReader):
+        if in_process:
+            results = [check_records([blocks.record(h) for h in range(lo, hi)]) for lo, hi in bounds]
+        else:
+            results = list(get_executor(workers).map(
+                check_range, [blocks.path] * len(bounds), *zip(*bounds)))
+    else:
+        chunks = [[block.to_dict() for block in blocks[lo:hi]] for lo, hi in bounds]
+        if in_process:
+            results = [check_records(chunk) for chunk in chunks]
+        else:
+            results = list(get_executor(workers).map(check_records, chunks))
+
+    errors = []
+    links = []
+    for chunk_errors, chunk_links in results:
+        errors.extend(chunk_errors)
+        links.extend(chunk_links)
+    return errors, links
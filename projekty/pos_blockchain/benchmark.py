@@ -0,0 +1,181 @@
+import math
+import random
+import common_path  # noqa: F401
+from blockchain_pos import BlockchainPoS
+from validator_info import ValidatorInfo
+from common.transaction import Transaction, address
+from common.mempool import PriorityMempool
+from common.sigverify import SignatureVerifier
+from common.resource_sampler import ResourceSampler
+from pos_sim import simulate
+from common import bench_harness
+from common import ed25519
+
+# klucze uzytkownikow generowane raz na proces - podpisywanie jest czescia
+# przygotowania, a nie pomiaru
+_keys = []
+
+
+def user_keys(users: int) -> dict:
+    """
+    Adres konta -> klucz prywatny dla `users` uzytkownikow.
+    """
+    while len(_keys) < users:
+        _keys.append(ed25519.generate_private_key())
+    return {address(ed25519.public_key(key)): key for key in _keys[:users]}
+
+
+def random_transactions(count: int, users: int = 100, signed: bool = False):
+    # podpisane transakcje wysylane sa z adresow kluczy, z kolejnymi nonce nadawcy
+    keys = user_keys(users) if signed else {}
+    names = list(keys) if signed else [f"User_{n}" for n in range(1, users + 1)]
+    nonces = {}
+    transactions = []
+    for _ in range(count):
+        sender = random.choice(names)
+        tx = Transaction(sender, random.choice(names), random.uniform(0.1, 10.0))
+        if signed:
+            tx.nonce = nonces.get(sender, 0)
+            nonces[sender] = tx.nonce + 1
+            tx.sign(keys[sender])
+        transactions.append(tx)
+    return transactions
+
+
+def validator_set(validators: int):
+    """
+    3 walidatorow - uklad ze scenariuszy main_pos.py (60/30/10),
+    dla innej liczby rowne stake'i.
+    """
+    if validators == 3:
+        return [
+            ValidatorInfo(name="Dominant", stake=60.0),
+            ValidatorInfo(name="Secondary", stake=30.0),
+            ValidatorInfo(name="Minor", stake=10.0)
+        ]
+    return [ValidatorInfo(name=f"Validator_{i}", stake=100.0 / validators) for i in range(validators)]
+
+
+def usage_metrics(*usages) -> dict:
+    # kilka mierzonych fragmentow jednego powtorzenia sumujemy
+    wall = sum(u.wall for u in usages)
+    cpu_time = sum(u.cpu_time for u in usages)
+    return {
+        "cpu_time": cpu_time,
+        "cpu_percent": cpu_time / wall * 100 if wall > 0 else 0.0,
+        "rss_mb": max(u.peak_rss_mb for u in usages),
+        "ctx_switches": sum(u.ctx_switches for u in usages),
+    }
+
+
+def block_counts(chain: BlockchainPoS, validators) -> dict:
+    """
+    top_share - udzial w blokach walidatora z najwiekszym stake'iem; przy malych
+    zbiorach (do 10) takze liczba blokow kazdego walidatora (blocks_<nazwa>).
+    """
+    counts = {v.name: 0 for v in validators}
+    for block in chain.chain[1:]:
+        counts[block.validator] += 1
+    top = max(validators, key=lambda v: v.stake).name
+    metrics = {"top_share": counts[top] / max(1, len(chain.chain) - 1)}
+    if len(validators) <= 10:
+        metrics.update({f"blocks_{name}": count for name, count in counts.items()})
+    return metrics
+
+
+def tx_load(validators: int = 3, tx_per_block: int = 20, transactions: int = 1000, blocks: int = None,
+            signed: bool = False, workers: int = None) -> dict:
+    """
+    Zatwierdzanie `transactions` transakcji z mempoola (scenariusz 3+4).
+    workers - procesy weryfikacji podpisow przy signed=True. Mempool, podpisy
+    i lancuch powstaja przed pomiarem; mierzona jest tylko petla blokow.
+    Zwraca tez rozklad blokow miedzy walidatorow (block_counts).
+    """
+    blocks = blocks or math.ceil(transactions / tx_per_block)
+    validator_list = validator_set(validators)
+    verifier = SignatureVerifier(workers) if signed else None
+    mempool = PriorityMempool()
+    mempool.add_many(random_transactions(transactions, signed=signed))
+    chain = BlockchainPoS(validators=validator_list, verifier=verifier, mempool=mempool)
+    sampler = ResourceSampler()
+    try:
+        with sampler.measure() as usage:
+            for _ in range(blocks):
+                chain.add_block(mempool.build_template(max_count=tx_per_block))
+    finally:
+        if verifier is not None:
+            verifier.close()
+    return dict(
+        seconds=usage.wall,
+        tps=transactions / usage.wall if usage.wall > 0 else 0.0,
+        block_seconds=usage.wall / blocks,
+        **usage_metrics(usage),
+        **block_counts(chain, validator_list)
+    )
+
+
+def nothing_at_stake(validators: int = 3, tx_per_block: int = 20, blocks: int = 50, fork_at: int = 39,
+                     fork_length: int = 10) -> dict:
+    """
+    Scenariusz 5: glowny lancuch `blocks` blokow, potem walidator z najwiekszym
+    stake'iem buduje fork od bloku fork_at. fork_won = 1, gdy fork przejal lancuch.
+    """
+    validator_list = validator_set(validators)
+    attacker = max(validator_list, key=lambda v: v.stake).name
+    transactions = random_transactions(tx_per_block * (blocks + fork_length))
+    batches = [transactions[i:i + tx_per_block] for i in range(0, len(transactions), tx_per_block)]
+    chain = BlockchainPoS(validators=validator_list)
+    sampler = ResourceSampler()
+    with sampler.measure() as main_usage:
+        for i in range(blocks):
+            chain.add_block(batches[i])
+    main_tip = chain.get_last_block().block_hash
+    main = block_counts(chain, validator_list)
+    parent = chain.chain[fork_at].block_hash
+    # fork w drzewie blokow - bez kopiowania prefiksu lancucha
+    with sampler.measure() as fork_usage:
+        for i in range(fork_length):
+            parent = chain.create_block(batches[blocks + i], attacker, parent_hash=parent).block_hash
+    seconds = main_usage.wall + fork_usage.wall
+    return dict(
+        seconds=seconds,
+        fork_seconds=fork_usage.wall,
+        tps=tx_per_block * blocks / main_usage.wall if main_usage.wall > 0 else 0.0,
+        fork_won=float(chain.get_last_block().block_hash != main_tip),
+        **usage_metrics(main_usage, fork_usage),
+        **main
+    )
+
+
+def attack(attacker_share: float = 0.3, confirmations: int = 6, days: float = 1.0, nodes: int = 10) -> dict:
+    """
+    Atak prywatnej galezi w symulatorze sieci (pos_sim) - kazde powtorzenie
+    z innym ziarnem.
+    """
+    report = simulate(num_nodes=nodes, duration=days * 24 * 3600, attacker_share=attacker_share,
+                      confirmations=confirmations, seed=random.getrandbits(32))
+    return {
+        "success_rate": report.attack_success_rate,
+        "orphan_rate": report.orphan_rate,
+        "seconds": report.seconds,
+    }
+
+
+CASES = {
+    "tx_load": tx_load,
+    "nothing_at_stake": nothing_at_stake,
+    "attack": attack,
+}
+
+# siatki domyslne - nadpisywane przez --sweep param=v1,v2
+GRIDS = {
+    "tx_load": {"validators": [3, 10, 100], "tx_per_block": [20, 100]},
+    "nothing_at_stake": {"validators": [3]},
+    "attack": {"attacker_share": [0.1, 0.3], "days": [0.5]},
+}
+
+
+if __name__ == "__main__":
+    # uzycie: python benchmark.py run [--case tx_load] [--sweep validators=3,50] [--output wyniki.csv]
+    #         python benchmark.py compare stary.json nowy.json
+    bench_harness.main(CASES, GRIDS)
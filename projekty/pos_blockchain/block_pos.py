@@ -1,6 +1,10 @@
 import time
+import hashlib
 from typing import List
-from transaction import Transaction
+import common_path  # noqa: F401
+from common.transaction import Transaction
+from common.header import HASH_V1, HASH_V2, pos_header
+from common.merkle import MerkleTree
 
 class Block:
     """
@@ -14,13 +18,63 @@ class Block:
         self.transactions: List[Transaction] = []
         self.validator = validator_name  # kto zatwierdza blok
         self.block_hash = ""
+        # nowe bloki uzywaja binarnego naglowka, HASH_V1 zostaje dla starych lancuchow
+        self.hash_version = HASH_V2
+        self._merkle = None
+        self._merkle_source = None
+
+    def to_dict(self) -> dict:
+        return {
+            "index": self.index,
+            "prev_hash": self.prev_hash,
+            "timestamp": self.timestamp,
+            "transactions": [tx.to_dict() for tx in self.transactions],
+            "validator": self.validator,
+            "block_hash": self.block_hash,
+            "hash_version": self.hash_version
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Block":
+        block = cls(index=data["index"], prev_hash=data["prev_hash"], validator_name=data["validator"])
+        block.timestamp = data["timestamp"]
+        block.transactions = [Transaction.from_dict(tx) for tx in data["transactions"]]
+        block.block_hash = data["block_hash"]
+        block.hash_version = data.get("hash_version", HASH_V1)
+        return block
+
+    def merkle_tree(self) -> MerkleTree:
+        """
+        Drzewo Merkle'a transakcji bloku. Drzewo jest zapamietywane: po dopisaniu
+        transakcji do listy dochodza tylko nowe liscie (O(log n) na transakcje),
+        a po podmianie calej listy drzewo budowane jest od nowa.
+        """
+        txs = self.transactions
+        tree = self._merkle
+        if tree is None or self._merkle_source is not txs or len(tree) > len(txs):
+            tree = MerkleTree()
+            self._merkle = tree
+            self._merkle_source = txs
+        if len(tree) < len(txs):
+            tree.extend(tx.serialize() for tx in txs[len(tree):])
+        return tree
+
+    def transactions_root(self) -> bytes:
+        return self.merkle_tree().root()
+
+    def transaction_proof(self, index: int):
+        return self.merkle_tree().proof(index)
 
     def calculate_hash(self) -> str:
         """
         Oblicza hash (skrót) na podstawie index, prev_hash, timestamp,
-        nazwy walidatora i listy transakcji.
+        nazwy walidatora i listy transakcji. Dla HASH_V2 pola sa pakowane
+        do binarnego naglowka o stalym ukladzie, dla HASH_V1 sklejane jako tekst.
         """
-        import hashlib
+        if self.hash_version == HASH_V2:
+            header = pos_header(self.index, self.timestamp, self.prev_hash, self.transactions_root(), self.validator)
+            return hashlib.sha256(header).hexdigest()
+
         block_data = (
             str(self.index)
             + self.prev_hash
@@ -1,38 +1,240 @@
+import common_path  # noqa: F401
 from block_pos import Block
 from validator_info import ValidatorInfo
-from typing import List
-import random
+from validator_registry import ValidatorRegistry
+from leader_schedule import LeaderSchedule, epoch_seed
+from common.block_store import BlockStore
+from validation import ValidationReport, verify_blocks
+from common.block_tree import BlockTree
+from common.account_state import AccountState
+from common.sigverify import SignatureVerifier
+from common.mempool import PriorityMempool
+from common.instrumentation import metrics
+from typing import Dict, List
 import time
 
 class BlockchainPoS:
     """
     Uproszczony łańcuch bloków dla algorytmu Proof of Stake.
     """
-    def __init__(self, validators: List[ValidatorInfo]):
-        self.chain: List[Block] = []
+    def __init__(
+        self,
+        validators: List[ValidatorInfo],
+        store: BlockStore = None,
+        epoch_length: int = None,
+        seed: int = None,
+        state: AccountState = None,
+        verifier: SignatureVerifier = None,
+        mempool: PriorityMempool = None,
+        genesis: Block = None
+    ):
+        self.tree: BlockTree = None
+        self.validated_height = 0  # bloki [0, validated_height) sa juz zweryfikowane
+        # opcjonalny stan kont - transakcje bez pokrycia sa odrzucane
+        self.state = state
+        # opcjonalna weryfikacja podpisow transakcji przed zatwierdzeniem bloku
+        self.verifier = verifier
+        # opcjonalny mempool - zatwierdzone transakcje sa z niego usuwane,
+        # a transakcje z odlaczonych blokow wracaja do niego po reorganizacji
+        self.mempool = mempool
         self.validators = validators  # lista walidatorow z ich stawkami
-        genesis = Block(index=0, prev_hash="0", validator_name="Genesis")
-        genesis.block_hash = genesis.calculate_hash()
-        self.chain.append(genesis)
+        # drzewo Fenwicka nad stake'ami - losowanie i zmiana stake'u w O(log n)
+        self.registry = ValidatorRegistry(validators)
+        # epoch_length wlacza harmonogram liderow liczony z gory dla calej epoki;
+        # seed czyni go powtarzalnym, bez niego ziarno pochodzi z hasha bloku
+        self.epoch_length = epoch_length
+        self.seed = seed
+        self.schedules: Dict[int, LeaderSchedule] = {}  # epoka -> harmonogram
+        self.epoch_stakes: Dict[int, ValidatorRegistry] = {}  # epoka -> zdjecie stake'ow
+        # opcjonalny magazyn - bloki dopisywane sa w chwili dodania do lancucha
+        self.store = store
+        if store is not None and len(store) > 0:
+            # wczytanie istniejacego lancucha (z bocznymi galeziami), rekord po rekordzie
+            for block in store.load(Block.from_dict, lambda block_hash: block_hash in self.tree):
+                if self.tree is None:
+                    self.tree = BlockTree(block, self.block_weight)
+                else:
+                    disconnected, connected = self.tree.insert(block)
+                    if self.state is not None and connected:
+                        self.state.apply_reorg(disconnected, connected)
+            store.sync_main(self.chain)
+        else:
+            # wezly jednej sieci dostaja wspolny genesis
+            if genesis is None:
+                genesis = Block(index=0, prev_hash="0", validator_name="Genesis")
+                genesis.block_hash = genesis.calculate_hash()
+            self.tree = BlockTree(genesis, self.block_weight)
+            if store is not None:
+                store.append(genesis.to_dict())
+
+    def block_weight(self, block: Block) -> float:
+        """
+        Waga bloku przy wyborze galezi - udzial walidatora w stake'u wg zdjecia
+        stake'ow epoki bloku (stake_snapshot). Zdjecie nie zmienia sie po
+        pozniejszym update_stake, wiec waga jest taka sama niezaleznie od chwili
+        wstawienia bloku. Bez harmonogramu liderow caly lancuch to epoka 0.
+        """
+        snapshot = self.stake_snapshot(self.epoch_of(block.index))
+        total = snapshot.total_stake()
+        return snapshot.stake_of(block.validator) / total if total > 0 else 0.0
+
+    @property
+    def chain(self) -> List[Block]:
+        # glowny lancuch - galaz z najwiekszym skumulowanym stake'iem (przy remisie widziana wczesniej)
+        return self.tree.main
 
     def get_last_block(self) -> Block:
-        return self.chain[-1]
+        return self.tree.main[-1]
+
+    def insert_block(self, block: Block):
+        """
+        Wstawia zatwierdzony blok pod dowolnego rodzica w drzewie.
+        Zwraca (odlaczone, dolaczone) bloki glownego lancucha.
+        """
+        if block.block_hash != block.calculate_hash():
+            raise ValueError(f"Blok {block.index}: niezgodny block_hash")
+        if block.block_hash in self.tree:
+            return [], []
+        if block.prev_hash not in self.tree:
+            raise ValueError(f"Nieznany rodzic bloku {block.index}: {block.prev_hash}")
+        self.check_validator(block)
+        if self.verifier is not None:
+            self.verifier.check_block(block)
+        previous_tip = self.tree.tip
+        disconnected, connected = self.tree.insert(block)
+        if self.state is not None and connected:
+            try:
+                # cofamy tylko odlaczone bloki, stosujemy tylko dolaczone
+                self.state.apply_reorg(disconnected, connected)
+            except ValueError:
+                self.tree.discard(block.block_hash, previous_tip)
+                raise
+        if disconnected:
+            # po reorganizacji weryfikacja przyrostowa zaczyna sie od punktu rozwidlenia
+            self.validated_height = min(self.validated_height, disconnected[0].index)
+            self._drop_schedules(disconnected[0].index)
+        if self.mempool is not None:
+            for old in disconnected:
+                self.mempool.add_many(old.transactions)
+            for new in connected:
+                self.mempool.remove_block(new)
+        if self.store is not None:
+            # pozycja w magazynie pozostaje wysokoscia w glownym lancuchu;
+            # dolaczona galaz zaczyna sie na wysokosci len(main) - len(connected)
+            self.store.write_insert(block, disconnected, connected, len(self.chain) - len(connected))
+        return disconnected, connected
+
+    def create_block(self, transactions: List, validator_name: str, parent_hash: str = None) -> Block:
+        """
+        Tworzy i wstawia blok zatwierdzony przez wskazanego walidatora na dowolnym
+        rodzicu (domyslnie na koncu glownego lancucha) - np. blok forka.
+        """
+        parent = self.tree.get(parent_hash) if parent_hash is not None else self.get_last_block()
+        new_block = Block(
+            index=parent.index + 1,
+            prev_hash=parent.block_hash,
+            validator_name=validator_name
+        )
+        new_block.transactions = transactions
+        new_block.block_hash = new_block.calculate_hash()
+        self.insert_block(new_block)
+        return new_block
+
+    def check_validator(self, block: Block):
+        """
+        Walidator bloku musi byc w rejestrze, a przy harmonogramie liderow
+        (epoch_length) - byc liderem slotu block.index na galezi rodzica.
+        """
+        if block.validator not in self.registry.positions:
+            raise ValueError(f"Blok {block.index}: nieznany walidator {block.validator}")
+        if self.epoch_length:
+            leader = self.leader_for(block.index, block.prev_hash)
+            if block.validator != leader:
+                raise ValueError(f"Blok {block.index}: walidator {block.validator}, a liderem jest {leader}")
 
     def select_validator(self) -> str:
         """
         Wybiera walidatora proporcjonalnie do posiadanego stake'u.
         """
-        total_stake = sum(v.stake for v in self.validators)
-        # losowanie z zakresu [0, total_stake]
-        rnd = random.uniform(0, total_stake)
+        return self.registry.draw()
 
-        cumulative = 0.0
-        for validator in self.validators:
-            cumulative += validator.stake
-            if rnd <= cumulative:
-                return validator.name
-        # awaryjnie zwracamy ostatniego jesli cokolwiek poszlo nie tak
-        return self.validators[-1].name
+    def leader_for(self, height: int, parent_hash: str = None) -> str:
+        """
+        Zwraca lidera slotu `height` z harmonogramu epoki. Bez wspolnego ziarna
+        (seed) ziarno epoki pochodzi z bloku tuz przed epoka na galezi rodzica
+        `parent_hash` (domyslnie glowny lancuch); dopoki tego bloku nie ma,
+        lidera nie da sie ustalic - ValueError, bez zapamietywania harmonogramu.
+        Harmonogram losowany jest ze zdjecia stake'ow epoki (stake_snapshot),
+        takze gdy trzeba go policzyc ponownie dla innej galezi.
+        """
+        epoch = self.epoch_of(height)
+        start_height = epoch * self.epoch_length + 1
+        seed_hash = "" if self.seed is not None else self._seed_block_hash(start_height - 1, parent_hash)
+        seed = epoch_seed(epoch, seed_hash, self.seed)
+        schedule = self.schedules.get(epoch)
+        # inne ziarno - harmonogram z innej galezi
+        if schedule is None or schedule.seed != seed:
+            schedule = LeaderSchedule.compute(self.stake_snapshot(epoch), epoch, start_height, self.epoch_length, seed)
+            self.schedules[epoch] = schedule
+        return schedule.leader(height)
+
+    def epoch_of(self, height: int) -> int:
+        # sloty epoki e to wysokosci e * epoch_length + 1 .. (e + 1) * epoch_length
+        return max(height - 1, 0) // self.epoch_length if self.epoch_length else 0
+
+    def stake_snapshot(self, epoch: int) -> ValidatorRegistry:
+        """
+        Stake'i walidatorow w epoce - zdjecie rejestru robione przy pierwszym
+        uzyciu epoki i potem niezmienne; update_stake dziala od epok, ktorych
+        zdjecia jeszcze nie ma.
+        """
+        snapshot = self.epoch_stakes.get(epoch)
+        if snapshot is None:
+            snapshot = self.epoch_stakes[epoch] = self.registry.snapshot()
+        return snapshot
+
+    def _seed_block_hash(self, height: int, parent_hash: str = None) -> str:
+        if parent_hash is None:
+            if height >= len(self.chain):
+                raise ValueError(f"Brak bloku {height} - ziarna epoki od wysokosci {height + 1}")
+            return self.chain[height].block_hash
+        node = self.tree.node(parent_hash)
+        if node.height < height:
+            raise ValueError(f"Brak bloku {height} - ziarna epoki od wysokosci {height + 1}")
+        while node.height > height:
+            node = node.parent
+        return node.block.block_hash
+
+    def _drop_schedules(self, fork_height: int):
+        # harmonogramy epok, ktorych blok ziarna zostal odlaczony
+        for epoch in [e for e in self.schedules if e * self.epoch_length >= fork_height]:
+            del self.schedules[epoch]
+
+    def update_stake(self, name: str, stake: float):
+        self.registry.update_stake(name, stake)
+
+    def add_validator(self, validator: ValidatorInfo):
+        self.registry.add_validator(validator)
+
+    def verify_range(self, start: int = 0, stop: int = None, workers: int = None) -> ValidationReport:
+        return verify_blocks(self.chain, start, stop, workers)
+
+    def validate(self, workers: int = None) -> ValidationReport:
+        """
+        Pelna weryfikacja lancucha: hashe blokow i powiazania prev_hash.
+        """
+        report = self.verify_range(0, len(self.chain), workers)
+        self.validated_height = len(self.chain) if report.ok else 0
+        return report
+
+    def validate_new(self, workers: int = None) -> ValidationReport:
+        """
+        Tryb przyrostowy - tylko bloki dodane od ostatniej udanej weryfikacji.
+        """
+        report = self.verify_range(self.validated_height, len(self.chain), workers)
+        if report.ok:
+            self.validated_height = len(self.chain)
+        return report
 
     def add_block(self, transactions: List):
         """
@@ -43,7 +245,12 @@ class BlockchainPoS:
         new_index = last_block.index + 1
 
         # wybor walidatora w oparciu o stake
-        chosen_validator = self.select_validator()
+        draw_start = time.perf_counter()
+        if self.epoch_length:
+            chosen_validator = self.leader_for(new_index)
+        else:
+            chosen_validator = self.select_validator()
+        draw_time = time.perf_counter() - draw_start
 
         # tworzymy blok
         new_block = Block(
@@ -53,11 +260,16 @@ class BlockchainPoS:
         )
         new_block.transactions = transactions
 
-        start_time = time.time()
+        start_time = time.perf_counter()
         # w pos nie kopiemy wystarczy obliczyc hash z uwzglednieniem walidatora
         new_block.block_hash = new_block.calculate_hash()
-        end_time = time.time()
+        end_time = time.perf_counter()
 
-        self.chain.append(new_block)
-        print(f"[PoS] Block {new_index} created by {chosen_validator}. Hash: {new_block.block_hash}")
-        print(f"      Time to confirm block: {(end_time - start_time):.6f} seconds\n")
+        self.insert_block(new_block)
+        if metrics.enabled:
+            # hash bloku to serializacja naglowka i transakcji + jedno SHA-256
+            metrics.inc("blocks_created_total")
+            metrics.observe("validator_draw_seconds", draw_time)
+            metrics.observe("serialize_seconds", end_time - start_time)
+            metrics.emit("block_created", index=new_index, validator=chosen_validator, hash=new_block.block_hash,
+                         draw_seconds=draw_time, hash_seconds=end_time - start_time)
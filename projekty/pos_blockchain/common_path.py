@@ -0,0 +1,9 @@
+import os
+import sys
+
+# kod wspolny dla PoW i PoS lezy w pakiecie projekty/common; skrypty
+# uruchamiane z tego katalogu potrzebuja katalogu projekty w sys.path
+PROJECTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if PROJECTS not in sys.path:
+    sys.path.append(PROJECTS)
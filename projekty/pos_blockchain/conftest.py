@@ -0,0 +1,21 @@
+import os
+import sys
+
+# pow_blockchain i pos_blockchain to katalogi skryptow z plaskimi importami
+# i modulami o tych samych nazwach - testy katalogu uzywaja jego wlasnych wersji;
+# pakiet common jest wspolny i zostaje zaladowany
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECTS = os.path.dirname(HERE)
+COMMON = os.path.join(PROJECTS, "common")
+
+for name, module in list(sys.modules.items()):
+    path = os.path.abspath(getattr(module, "__file__", None) or "")
+    directory = os.path.dirname(path)
+    if directory not in (HERE, COMMON) and os.path.dirname(directory) == PROJECTS:
+        del sys.modules[name]
+
+if HERE in sys.path:
+    sys.path.remove(HERE)
+sys.path.insert(0, HERE)
+if PROJECTS not in sys.path:
+    sys.path.append(PROJECTS)
@@ -0,0 +1,45 @@
+import hashlib
+import numpy as np
+from typing import List
+from validator_registry import ValidatorRegistry
+
+
+def epoch_seed(epoch: int, prev_hash: str = "", base_seed: int = None) -> int:
+    """
+    Ziarno epoki. Z base_seed wynik zalezy tylko od (base_seed, epoch), wiec
+    przebiegi sa powtarzalne; bez niego ziarno pochodzi z hasha ostatniego
+    bloku przed epoka.
+    """
+    source = f"seed:{base_seed}" if base_seed is not None else f"hash:{prev_hash}"
+    digest = hashlib.sha256(f"{source}:{epoch}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+class LeaderSchedule:
+    """
+    Harmonogram liderow jednej epoki: walidator dla kazdego slotu (wysokosci)
+    policzony z gory, jednym wektorowym losowaniem ze zdjecia stake'ow.
+    """
+    def __init__(self, epoch: int, start_height: int, leaders: List[str], seed: int):
+        self.epoch = epoch
+        self.start_height = start_height
+        self.leaders = leaders
+        self.seed = seed
+
+    @classmethod
+    def compute(
+        cls,
+        registry: ValidatorRegistry,
+        epoch: int,
+        start_height: int,
+        epoch_length: int,
+        seed: int
+    ) -> "LeaderSchedule":
+        rng = np.random.default_rng(seed)
+        return cls(epoch, start_height, registry.draw_many(epoch_length, rng), seed)
+
+    def __contains__(self, height: int) -> bool:
+        return self.start_height <= height < self.start_height + len(self.leaders)
+
+    def leader(self, height: int) -> str:
+        return self.leaders[height - self.start_height]
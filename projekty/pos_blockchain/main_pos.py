@@ -1,215 +1,101 @@
+import common_path  # noqa: F401
 from blockchain_pos import BlockchainPoS
 from validator_info import ValidatorInfo
-from transaction import Transaction
-from block_pos import Block
+from common.transaction import Transaction
+from common.bench_harness import run_case, make_entry, describe, write_results
+from benchmark import validator_set
+import benchmark
+from common.instrumentation import metrics, PrintSink
+from common.montecarlo import fork_overtakes, stake_weights
+from common.cpus import available_cpus
 import matplotlib.pyplot as plt
-import random
-import time
-import psutil
-import numpy as np
 
-def measure_resources():
-    """Pomiar użycia CPU i RAM."""
-    cpu_usage = psutil.cpu_percent(interval=0.1)
-    ram_usage = psutil.virtual_memory().percent
-    return cpu_usage, ram_usage
-
-def scenario_3_and_4_combined(repetitions=20):
+def scenario_3_and_4_combined(repetitions=20, signed=False, jobs=1, seed=None):
     """
     Połączony Scenariusz 3 i 4 z pomiarami zasobów i wielokrotnymi powtórkami.
+    signed=True - transakcje są podpisane, a podpisy weryfikowane przed zatwierdzeniem bloku.
+    jobs > 1 - powtórki w puli procesów; seed - powtarzalne losowanie.
     """
-    total_stake = 100
-    validators = [
-        ValidatorInfo(name="Dominant", stake=60.0),
-        ValidatorInfo(name="Secondary", stake=30.0),
-        ValidatorInfo(name="Minor", stake=10.0)
-    ]
-
-    all_cpu_usage = []
-    all_ram_usage = []
-    all_tps = []
-    all_total_times = []
+    validators = validator_set(3)
+    params = dict(validators=3, tx_per_block=1000 // 50, transactions=1000, blocks=50, signed=signed)
 
     print("=== Połączony Scenariusz 3 i 4: Dominacja walidatora przy 1000 transakcji ===")
-    for rep in range(repetitions):
-        pos_chain = BlockchainPoS(validators=validators)
-        mempool = [Transaction(f"User_{random.randint(1, 100)}", f"User_{random.randint(1, 100)}", 
-                              random.uniform(0.1, 10.0)) for _ in range(1000)]
-
-        transactions_per_block = 1000 // 50
-        total_time = 0.0
-        cpu_usage_list = []
-        ram_usage_list = []
-        count_chosen = {v.name: 0 for v in validators}
-
-        print(f"\nPowtórka {rep + 1}/{repetitions}")
-        for i in range(50):
-            block_transactions = mempool[i * transactions_per_block:(i + 1) * transactions_per_block]
-            start_time = time.time()
-            cpu_before, ram_before = measure_resources()
-            pos_chain.add_block(block_transactions)
-            cpu_after, ram_after = measure_resources()
-            end_time = time.time()
-            block_time = end_time - start_time
-            total_time += block_time
-
-            cpu_usage_list.append((cpu_before + cpu_after) / 2)
-            ram_usage_list.append((ram_before + ram_after) / 2)
-            chosen = pos_chain.get_last_block().validator
-            count_chosen[chosen] += 1
-
-        avg_cpu = np.mean(cpu_usage_list)
-        avg_ram = np.mean(ram_usage_list)
-        total_transactions = 1000
-        tps = total_transactions / total_time if total_time > 0 else 0
-
-        all_cpu_usage.append(avg_cpu)
-        all_ram_usage.append(avg_ram)
-        all_tps.append(tps)
-        all_total_times.append(total_time)
+    # przygotowanie, powtorzenia i statystyki w bench_harness - komunikaty
+    # lancucha nie sa drukowane w trakcie pomiaru
+    case = run_case(benchmark.tx_load, params, repetitions=repetitions, warmup=1, jobs=jobs, seed=seed)
+    entry = make_entry("tx_load", params, case)
+    stats = entry["metrics"]
 
-    # srednie i odchylenia standardowe
-    mean_cpu = np.mean(all_cpu_usage)
-    std_cpu = np.std(all_cpu_usage)
-    mean_ram = np.mean(all_ram_usage)
-    std_ram = np.std(all_ram_usage)
-    mean_tps = np.mean(all_tps)
-    std_tps = np.std(all_tps)
-    mean_total_time = np.mean(all_total_times)
-    std_total_time = np.std(all_total_times)
-
-    # analiza dominacji walidatora ostatnia proba
-    print("\n--- Analiza dominacji walidatora (ostatnia powtórka) ---")
+    print(f"\n--- Analiza dominacji walidatora (średnio z {repetitions} powtórek) ---")
     for validator in validators:
-        percentage = (count_chosen[validator.name] / 50) * 100
+        blocks = stats[f"blocks_{validator.name}"]
         print(f"Walidator: {validator.name}, Stake: {validator.stake} ({validator.stake}%), "
-              f"Bloki: {count_chosen[validator.name]} ({percentage:.2f}%)")
+              f"Bloki: {describe(blocks, 1)} ({blocks['mean'] / params['blocks'] * 100:.2f}%)")
+
+    print(f"\n--- Analiza przepustowości i zasobów (średnie z {repetitions} powtórek) ---")
+    print(f"Średni czas przetwarzania 50 bloków: {describe(stats['seconds'], 6)} sekund")
+    print(f"Średnia przepustowość (TPS): {describe(stats['tps'], 2)} transakcji na sekundę")
+    print(f"Średnie użycie CPU: {describe(stats['cpu_percent'], 2)}%")
+    print(f"Średnie użycie RAM: {describe(stats['rss_mb'], 2)} MB")
+
+    write_results("pos_scenario_3_4.csv", [entry])
+    with open("pos_results.txt", "w") as f:
+        write_scenario(f, "=== Wyniki Scenariusza 3 i 4 ===", case, stats)
 
-    plt.bar([v.name for v in validators], [count_chosen[v.name] for v in validators], color='blue')
+    # wykres po pomiarach
+    blocks = [stats[f"blocks_{v.name}"] for v in validators]
+    plt.bar([v.name for v in validators], [b["mean"] for b in blocks],
+            yerr=[b["ci_high"] - b["mean"] for b in blocks], capsize=5, color='blue')
     plt.xlabel("Walidator")
     plt.ylabel("Liczba wygenerowanych bloków")
     plt.title("Scenariusz 3+4: Wpływ walidatora z ~60% stake (50 bloków)")
     plt.show()
 
-    print("\n--- Analiza przepustowości i zasobów (średnie z 20 powtórek) ---")
-    print(f"Średni czas przetwarzania 50 bloków: {mean_total_time:.6f} ± {std_total_time:.6f} sekund")
-    print(f"Średnia przepustowość (TPS): {mean_tps:.2f} ± {std_tps:.2f} transakcji na sekundę")
-    print(f"Średnie użycie CPU: {mean_cpu:.2f} ± {std_cpu:.2f}%")
-    print(f"Średnie użycie RAM: {mean_ram:.2f} ± {std_ram:.2f}%")
+    return summary_tuple(stats)
 
-    # zapis do txt
-    with open("pos_results.txt", "w") as f:
-        f.write("=== Wyniki Scenariusza 3 i 4 ===\n")
-        for rep in range(repetitions):
-            f.write(f"Powtórka {rep + 1}: CPU={all_cpu_usage[rep]:.2f}%, RAM={all_ram_usage[rep]:.2f}%, "
-                    f"TPS={all_tps[rep]:.2f}, Czas={all_total_times[rep]:.6f}s\n")
-        f.write("\nŚrednie wartości ± Odchylenie standardowe:\n")
-        f.write(f"CPU: {mean_cpu:.2f} ± {std_cpu:.2f}%\n")
-        f.write(f"RAM: {mean_ram:.2f} ± {std_ram:.2f}%\n")
-        f.write(f"TPS: {mean_tps:.2f} ± {std_tps:.2f}\n")
-        f.write(f"Czas: {mean_total_time:.6f} ± {std_total_time:.6f}s\n")
-
-    return mean_cpu, std_cpu, mean_ram, std_ram, mean_tps, std_tps, mean_total_time, std_total_time
-
-def scenario_5_nothing_at_stake(repetitions=20):
+def scenario_5_nothing_at_stake(repetitions=20, jobs=1, seed=None):
     """
     Scenariusz 5 z pomiarami zasobów, TPS, czasem i wielokrotnymi powtórkami.
+    jobs > 1 - powtórki w puli procesów; seed - powtarzalne losowanie.
     """
-    total_stake = 100
-    validators = [
-        ValidatorInfo(name="Dominant", stake=60.0),
-        ValidatorInfo(name="Secondary", stake=30.0),
-        ValidatorInfo(name="Minor", stake=10.0)
-    ]
-
-    all_cpu_usage = []
-    all_ram_usage = []
-    all_total_times = []
-    all_tps = []
+    validators = validator_set(3)
+    params = dict(validators=3, tx_per_block=1000 // 50, blocks=50, fork_at=39, fork_length=10)
 
     print("=== Scenariusz 5: Nothing at Stake ===")
-    for rep in range(repetitions):
-        pos_chain = BlockchainPoS(validators=validators)
-        mempool = [Transaction(f"User_{random.randint(1, 100)}", f"User_{random.randint(1, 100)}", 
-                              random.uniform(0.1, 10.0)) for _ in range(1000)]
-
-        transactions_per_block = 1000 // 50
-        total_time = 0.0
-        cpu_usage_list = []
-        ram_usage_list = []
-        count_chosen_main = {v.name: 0 for v in validators}
-
-        print(f"\nPowtórka {rep + 1}/{repetitions}: Tworzenie głównego łańcucha")
-        for i in range(50):
-            block_transactions = mempool[i * transactions_per_block:(i + 1) * transactions_per_block]
-            start_time = time.time()
-            cpu_before, ram_before = measure_resources()
-            pos_chain.add_block(block_transactions)
-            cpu_after, ram_after = measure_resources()
-            end_time = time.time()
-            total_time += end_time - start_time
-            cpu_usage_list.append((cpu_before + cpu_after) / 2)
-            ram_usage_list.append((ram_before + ram_after) / 2)
-            chosen = pos_chain.get_last_block().validator
-            count_chosen_main[chosen] += 1
-
-        fork_chain = pos_chain.chain[:40]
-        count_chosen_fork = {v.name: 0 for v in validators}
-
-        print(f"Powtórka {rep + 1}/{repetitions}: Atak - tworzenie forka")
-        for i in range(10):
-            new_index = fork_chain[-1].index + 1
-            new_block = Block(new_index, fork_chain[-1].block_hash, "Dominant")
-            block_transactions = mempool[(40 + i) * transactions_per_block:(40 + i + 1) * transactions_per_block]
-            start_time = time.time()
-            cpu_before, ram_before = measure_resources()
-            new_block.transactions = block_transactions
-            new_block.block_hash = new_block.calculate_hash()
-            cpu_after, ram_after = measure_resources()
-            end_time = time.time()
-            total_time += end_time - start_time
-            fork_chain.append(new_block)
-            cpu_usage_list.append((cpu_before + cpu_after) / 2)
-            ram_usage_list.append((ram_before + ram_after) / 2)
-            count_chosen_fork["Dominant"] += 1
-
-        avg_cpu = np.mean(cpu_usage_list)
-        avg_ram = np.mean(ram_usage_list)
-        total_transactions = 1000  # 1000 transkacji w glownym lancuchu
-        tps = total_transactions / total_time if total_time > 0 else 0
-
-        all_cpu_usage.append(avg_cpu)
-        all_ram_usage.append(avg_ram)
-        all_total_times.append(total_time)
-        all_tps.append(tps)
-
-    # srednie i odchylenia standardowe
-    mean_cpu = np.mean(all_cpu_usage)
-    std_cpu = np.std(all_cpu_usage)
-    mean_ram = np.mean(all_ram_usage)
-    std_ram = np.std(all_ram_usage)
-    mean_total_time = np.mean(all_total_times)
-    std_total_time = np.std(all_total_times)
-    mean_tps = np.mean(all_tps)
-    std_tps = np.std(all_tps)
+    case = run_case(benchmark.nothing_at_stake, params, repetitions=repetitions, warmup=1, jobs=jobs, seed=seed)
+    entry = make_entry("nothing_at_stake", params, case)
+    stats = entry["metrics"]
 
-    # analiza ostatnia proba
-    print("\n--- Analiza: Główny łańcuch (bloki 41-50) ---")
+    print(f"\n--- Analiza: Główny łańcuch (średnio z {repetitions} powtórek) ---")
     for validator in validators:
-        percentage = (count_chosen_main[validator.name] / 50) * 100
+        blocks = stats[f"blocks_{validator.name}"]
         print(f"Walidator: {validator.name}, Stake: {validator.stake} ({validator.stake}%), "
-              f"Bloki: {count_chosen_main[validator.name]} ({percentage:.2f}%)")
+              f"Bloki: {describe(blocks, 1)} ({blocks['mean'] / params['blocks'] * 100:.2f}%)")
+    print(f"\n--- Analiza: Fork (bloki {params['fork_at'] + 2}-{params['fork_at'] + params['fork_length'] + 1}) ---")
+    print(f"Walidator: Dominant, Bloki w forku: {params['fork_length']} (100.00%)")
+    print(f"Fork 'Dominant' przejął łańcuch główny w {stats['fork_won']['mean'] * 100:.0f}% powtórek")
+    # ten sam wynik bez budowania lancuchow - Monte Carlo na milionie przebiegow
+    weights = stake_weights(validators)
+    won, _ = fork_overtakes(weights, int(weights.argmax()), params["blocks"] - params["fork_at"], params["fork_length"], 1_000_000)
+    print(f"Monte Carlo (1 000 000 przebiegów): fork przejmuje łańcuch z p = {won.mean():.4f}")
 
-    print("\n--- Analiza: Fork (bloki 41-50) ---")
-    for validator in validators:
-        percentage = (count_chosen_fork[validator.name] / 10) * 100
-        print(f"Walidator: {validator.name}, Bloki w forku: {count_chosen_fork[validator.name]} ({percentage:.2f}%)")
+    print("\n--- Wnioski: Problem 'Nothing at Stake' ---")
+    print(f"Średni czas przetwarzania ({repetitions} powtórek): {describe(stats['seconds'], 6)} sekund")
+    print(f"Średnia przepustowość (TPS): {describe(stats['tps'], 2)} transakcji na sekundę")
+    print(f"Średnie użycie CPU ({repetitions} powtórek): {describe(stats['cpu_percent'], 2)}%")
+    print(f"Średnie użycie RAM ({repetitions} powtórek): {describe(stats['rss_mb'], 2)} MB")
+    print("Brak slashingu pozwala 'Dominant' na tworzenie forka bez konsekwencji.")
+
+    write_results("pos_scenario_5.csv", [entry])
+    with open("pos_results.txt", "a") as f:
+        write_scenario(f, "\n=== Wyniki Scenariusza 5 ===", case, stats)
 
     plt.figure(figsize=(10, 6))
     bar_width = 0.35
     x = range(len(validators))
-    plt.bar(x, [count_chosen_main[v.name] for v in validators], bar_width, label="Główny łańcuch", color='blue')
-    plt.bar([i + bar_width for i in x], [count_chosen_fork[v.name] for v in validators], bar_width, label="Fork", color='red')
+    fork_counts = [params["fork_length"] if v.name == "Dominant" else 0 for v in validators]
+    plt.bar(x, [stats[f"blocks_{v.name}"]["mean"] for v in validators], bar_width, label="Główny łańcuch", color='blue')
+    plt.bar([i + bar_width for i in x], fork_counts, bar_width, label="Fork", color='red')
     plt.xlabel("Walidator")
     plt.ylabel("Liczba wygenerowanych bloków")
     plt.title("Scenariusz 5: Porównanie głównego łańcucha i forka")
@@ -217,26 +103,23 @@ def scenario_5_nothing_at_stake(repetitions=20):
     plt.legend()
     plt.show()
 
-    print("\n--- Wnioski: Problem 'Nothing at Stake' ---")
-    print(f"Średni czas przetwarzania (20 powtórek): {mean_total_time:.6f} ± {std_total_time:.6f} sekund")
-    print(f"Średnia przepustowość (TPS): {mean_tps:.2f} ± {std_tps:.2f} transakcji na sekundę")
-    print(f"Średnie użycie CPU (20 powtórek): {mean_cpu:.2f} ± {std_cpu:.2f}%")
-    print(f"Średnie użycie RAM (20 powtórek): {mean_ram:.2f} ± {std_ram:.2f}%")
-    print("Brak slashingu pozwala 'Dominant' na tworzenie forka bez konsekwencji.")
+    return summary_tuple(stats)
 
-    # zapis do txt
-    with open("pos_results.txt", "a") as f:
-        f.write("\n=== Wyniki Scenariusza 5 ===\n")
-        for rep in range(repetitions):
-            f.write(f"Powtórka {rep + 1}: CPU={all_cpu_usage[rep]:.2f}%, RAM={all_ram_usage[rep]:.2f}%, "
-                    f"TPS={all_tps[rep]:.2f}, Czas={all_total_times[rep]:.6f}s\n")
-        f.write("\nŚrednie wartości ± Odchylenie standardowe:\n")
-        f.write(f"CPU: {mean_cpu:.2f} ± {std_cpu:.2f}%\n")
-        f.write(f"RAM: {mean_ram:.2f} ± {std_ram:.2f}%\n")
-        f.write(f"TPS: {mean_tps:.2f} ± {std_tps:.2f}\n")
-        f.write(f"Czas: {mean_total_time:.6f} ± {std_total_time:.6f}s\n")
+def write_scenario(f, title, samples, stats):
+    f.write(title + "\n")
+    for rep in range(len(samples["seconds"])):
+        f.write(f"Powtórka {rep + 1}: CPU={samples['cpu_percent'][rep]:.2f}%, RAM={samples['rss_mb'][rep]:.2f} MB, "
+                f"TPS={samples['tps'][rep]:.2f}, Czas={samples['seconds'][rep]:.6f}s\n")
+    f.write("\nŚrednie wartości ± 95% przedział ufności:\n")
+    f.write(f"CPU: {describe(stats['cpu_percent'], 2)}%\n")
+    f.write(f"RAM: {describe(stats['rss_mb'], 2)} MB\n")
+    f.write(f"TPS: {describe(stats['tps'], 2)}\n")
+    f.write(f"Czas: {describe(stats['seconds'], 6)}s\n")
 
-    return mean_cpu, std_cpu, mean_ram, std_ram, mean_tps, std_tps, mean_total_time, std_total_time
+def summary_tuple(stats):
+    # dotychczasowy format wyniku scenariuszy: srednie i odchylenia standardowe
+    return tuple(value for name in ("cpu_percent", "rss_mb", "tps", "seconds")
+                 for value in (stats[name]["mean"], stats[name]["stdev"]))
 
 def main():
     validators = [
@@ -267,6 +150,13 @@ def main():
         print("-------------------------\n")
 
 if __name__ == "__main__":
+    # komunikaty o kazdym bloku w demonstracji
+    printer = PrintSink()
+    metrics.add_sink(printer)
     main()
-    scenario_3_and_4_combined(repetitions=20)
-    scenario_5_nothing_at_stake(repetitions=20)
\ No newline at end of file
+    # scenariusze mierza czas - bez instrumentacji, takze w procesach roboczych
+    metrics.remove_sink(printer)
+    metrics.disable()
+    # powtórki są niezależne - równolegle na wszystkich rdzeniach
+    scenario_3_and_4_combined(repetitions=20, jobs=available_cpus())
+    scenario_5_nothing_at_stake(repetitions=20, jobs=available_cpus())
\ No newline at end of file
@@ -0,0 +1,126 @@
+import time
+import random
+import argparse
+import numpy as np
+import common_path  # noqa: F401
+from blockchain_pos import BlockchainPoS
+from validator_info import ValidatorInfo
+from pos_sim import simulate
+from common.montecarlo import block_winners, race, fork_overtakes, stake_weights
+from common.bench_harness import summarize, quiet
+import benchmark
+
+
+def agreement(real: float, real_se: float, mc: float, mc_se: float) -> str:
+    # roznica w granicach 95% przedzialu dla roznicy dwoch estymatorow
+    return "zgodne" if abs(real - mc) <= 1.96 * (real_se ** 2 + mc_se ** 2) ** 0.5 + 1e-12 else "ROZBIEZNE"
+
+
+def attack_stakes(share: float, num_nodes: int = 10):
+    # uklad stake'ow z pos_sim.simulate: atakujacy ostatni, reszta rowno
+    honest = (1.0 - share) / (num_nodes - 1) * 100
+    return [ValidatorInfo(f"Validator_{i}", honest) for i in range(num_nodes - 1)] + [ValidatorInfo("Attacker", share * 100)]
+
+
+def check_winners(validators, blocks: int, trials: int, rng: np.random.Generator):
+    # prawdziwy lancuch: losowanie walidatora i hash kazdego bloku
+    started = time.perf_counter()
+    chain = BlockchainPoS(validators=validators)
+    with quiet():
+        for _ in range(blocks):
+            chain.add_block([])
+    real_seconds = time.perf_counter() - started
+    names = [v.name for v in validators]
+    wins = np.bincount([names.index(block.validator) for block in chain.chain[1:]], minlength=len(names))
+    counts = block_winners(stake_weights(validators), blocks, trials, rng)
+    print(f"BlockchainPoS ({blocks} bloków): {real_seconds:.2f} s")
+    for i, v in enumerate(validators):
+        real = wins[i] / blocks
+        mc = counts[:, i].mean() / blocks
+        real_se = (real * (1 - real) / blocks) ** 0.5
+        mc_se = counts[:, i].std() / blocks / trials ** 0.5
+        print(f"  {v.name} (stake {v.stake:g}): łańcuch {real:.4f} ± {1.96 * real_se:.4f}, "
+              f"Monte Carlo {mc:.4f} ± {1.96 * mc_se:.4f} - {agreement(real, real_se, mc, mc_se)}")
+
+
+def check_fork(validators, fork_length: int, runs: int, trials: int, rng: np.random.Generator):
+    # scenariusz 5: 50 blokow, fork od bloku 39 - po rozwidleniu 11 blokow glownych
+    blocks, fork_at = 50, 39
+    started = time.perf_counter()
+    won = [benchmark.nothing_at_stake(validators=len(validators), blocks=blocks, fork_at=fork_at,
+                                      fork_length=fork_length)["fork_won"] for _ in range(runs)]
+    real_seconds = time.perf_counter() - started
+    weights = stake_weights(validators)
+    mc, _ = fork_overtakes(weights, int(np.argmax(weights)), blocks - fork_at, fork_length, trials, rng=rng)
+    real, p = float(np.mean(won)), float(mc.mean())
+    real_se = (real * (1 - real) / runs) ** 0.5
+    mc_se = (p * (1 - p) / trials) ** 0.5
+    print(f"fork {fork_length} bloków: łańcuch {real:.4f} ± {1.96 * real_se:.4f} ({runs} powtórek, {real_seconds:.1f} s), "
+          f"Monte Carlo {p:.4f} ± {1.96 * mc_se:.4f} - {agreement(real, real_se, p, mc_se)}")
+
+
+def check_race(share: float, confirmations: int, give_up: int, days: float, runs: int, trials: int,
+               rng: np.random.Generator):
+    # proby ataku w jednej symulacji nie sa niezalezne - niepewnosc z rozrzutu miedzy symulacjami
+    started = time.perf_counter()
+    rates = [simulate(duration=days * 24 * 3600, attacker_share=share, confirmations=confirmations,
+                      give_up=give_up, seed=random.getrandbits(32)).attack_success_rate for _ in range(runs)]
+    sim_seconds = time.perf_counter() - started
+    weights = stake_weights(attack_stakes(share))
+    result = race(weights, len(weights) - 1, confirmations, give_up, trials, block_weights=weights, rng=rng)
+    summary = summarize(rates)
+    real_se = (summary["ci_high"] - summary["mean"]) / 1.96
+    print(f"stake={share:.2f}: symulacja sieci {summary['mean']:.4f} ± {summary['ci_high'] - summary['mean']:.4f} "
+          f"({runs} x {days:g} dni, {sim_seconds:.1f} s), Monte Carlo {result.success_rate:.4f} ± "
+          f"{1.96 * result.stderr:.4f} - {agreement(summary['mean'], real_se, result.success_rate, result.stderr)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo dla dominacji walidatora i nothing at stake (PoS)")
+    parser.add_argument("--trials", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--check", action="store_true", help="porownanie z prawdziwym lancuchem i symulacja sieci")
+    parser.add_argument("--check-runs", type=int, default=200, help="powtorzenia scenariusza 5 w porownaniu")
+    parser.add_argument("--check-days", type=float, default=0.5, help="dni sieci jednej symulacji w porownaniu")
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+    random.seed(args.seed)
+
+    # stake'i ze scenariuszy main_pos.py
+    validators = benchmark.validator_set(3)
+    weights = stake_weights(validators)
+    blocks = 50
+    started = time.perf_counter()
+    counts = block_winners(weights, blocks, args.trials, rng)
+    print(f"=== Dominacja walidatora: {blocks} bloków, {args.trials} przebiegów, {time.perf_counter() - started:.2f} s ===")
+    for i, v in enumerate(validators):
+        print(f"{v.name} (stake {v.stake:g}): {counts[:, i].mean():.2f} ± {counts[:, i].std():.2f} bloków")
+    print(f"P(Dominant ma większość bloków) = {(counts[:, 0] > blocks / 2).mean():.4f}")
+
+    main_blocks = 11  # bloki 40-50 glownego lancucha po rozwidleniu w scenariuszu 5
+    print(f"\n=== Nothing at stake: fork Dominant przeciw {main_blocks} blokom głównego łańcucha ===")
+    for fork_length in (4, 6, 8, 10, 12):
+        won, needed = fork_overtakes(weights, 0, main_blocks, fork_length, args.trials, rng=rng)
+        print(f"fork {fork_length:2d} bloków: przejmuje łańcuch z p = {won.mean():.5f}")
+    print(f"Potrzebna długość forka: mediana {np.median(needed):.0f}, 90% {np.percentile(needed, 90):.0f}, "
+          f"99% {np.percentile(needed, 99):.0f} bloków")
+
+    print("\n=== Wyścig prywatnej gałęzi ważonej stake'iem (10 walidatorów, 6 potwierdzeń) ===")
+    for share in (0.1, 0.2, 0.3, 0.4):
+        started = time.perf_counter()
+        w = stake_weights(attack_stakes(share))
+        result = race(w, len(w) - 1, 6, 10, args.trials, block_weights=w, rng=rng)
+        print(f"stake={share:.2f}: {result}, {time.perf_counter() - started:.2f} s")
+
+    if args.check:
+        print("\n=== Porównanie: BlockchainPoS vs Monte Carlo ===")
+        check_winners(validators, 2000, args.trials, rng)
+        for fork_length in (8, 10):
+            check_fork(validators, fork_length, args.check_runs, args.trials, rng)
+        print("\n=== Porównanie: symulacja sieci vs Monte Carlo ===")
+        for share in (0.2, 0.3):
+            check_race(share, 6, 10, args.check_days, 5, args.trials, rng)
+
+
+if __name__ == "__main__":
+    main()
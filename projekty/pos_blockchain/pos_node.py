@@ -0,0 +1,142 @@
+import sys
+import random
+import asyncio
+import argparse
+from typing import List
+import common_path  # noqa: F401
+from block_pos import Block
+from blockchain_pos import BlockchainPoS
+from validator_info import ValidatorInfo
+from common.transaction import Transaction
+from common.node import Node
+from common import instrumentation
+
+
+def network_genesis() -> Block:
+    # staly znacznik czasu - kazdy wezel liczy ten sam blok genesis
+    genesis = Block(index=0, prev_hash="0", validator_name="Genesis")
+    genesis.timestamp = 0.0
+    genesis.block_hash = genesis.calculate_hash()
+    return genesis
+
+
+class PosNode(Node):
+    """
+    Wezel PoS. Lider kazdej wysokosci wynika z harmonogramu epoki, wiec
+    lancuch musi miec epoch_length i wspolne ziarno (seed) - wtedy wszystkie
+    wezly licza tych samych liderow. Wezel co slot_time sekund sprawdza, czy
+    lider nastepnego bloku jest jednym z jego walidatorow, i jesli tak -
+    tworzy blok z szablonu mempoola i rozsyla go do sieci. Walidatora bloku
+    z sieci sprawdza BlockchainPoS.insert_block.
+    """
+    def __init__(self, chain: BlockchainPoS, validator_names: List[str], slot_time: float = 0.5, **kwargs):
+        if not chain.epoch_length:
+            raise ValueError("PosNode wymaga lancucha z harmonogramem liderow (epoch_length)")
+        super().__init__(chain, **kwargs)
+        self.validator_names = set(validator_names)
+        self.slot_time = slot_time
+        self.blocks_created = 0
+
+    def block_from_dict(self, data: dict) -> Block:
+        return Block.from_dict(data)
+
+    async def produce(self):
+        while self.running:
+            await asyncio.sleep(self.slot_time)
+            parent = self.chain.get_last_block()
+            leader = self.chain.leader_for(parent.index + 1)
+            if leader not in self.validator_names:
+                continue
+            transactions = await self.template()
+            # w czasie weryfikacji szablonu mogl przyjsc blok z sieci - lider jest juz inny
+            if self.chain.get_last_block() is not parent:
+                continue
+            block = self.chain.create_block(transactions, leader)
+            self.blocks_created += 1
+            self.publish_block(block)
+            if instrumentation.metrics.enabled:
+                instrumentation.metrics.emit("node_block_created", node=self.name, index=block.index,
+                                             validator=leader, hash=block.block_hash)
+
+
+async def run_local_network(num_transactions: int = 200, duration: float = 10.0, slot_time: float = 0.2):
+    """
+    Trzy wezly na localhost, kazdy z jednym walidatorem, polaczone w pierscien.
+    Na koncu sprawdzamy, czy wszystkie maja ten sam czubek lancucha.
+    """
+    stakes = {"Dominant": 60.0, "Secondary": 30.0, "Minor": 10.0}
+    nodes = []
+    for name in stakes:
+        validators = [ValidatorInfo(n, s) for n, s in stakes.items()]
+        chain = BlockchainPoS(validators, epoch_length=32, seed=0, genesis=network_genesis())
+        nodes.append(PosNode(chain, [name], slot_time=slot_time, name=name))
+    for node in nodes:
+        await node.start()
+    for i, node in enumerate(nodes):
+        host, port = nodes[(i + 1) % len(nodes)].address
+        await node.connect(host, port)
+
+    for i in range(num_transactions):
+        tx = Transaction(f"User_{random.randint(1, 100)}", f"User_{random.randint(1, 100)}",
+                         random.uniform(0.1, 10.0), fee=random.uniform(0.0, 1.0))
+        random.choice(nodes).submit_transaction(tx)
+        await asyncio.sleep(duration / num_transactions / 2)
+    await asyncio.sleep(duration / 2)
+
+    for node in nodes:
+        node.running = False
+    await asyncio.sleep(slot_time * 2)  # ostatnie bloki w drodze
+
+    print("\n=== Stan wezlow ===")
+    for node in nodes:
+        tip = node.chain.get_last_block()
+        print(f"{node.name}: wysokosc {tip.index}, czubek {tip.block_hash[:16]}..., "
+              f"utworzone {node.blocks_created}, mempool {len(node.mempool)}")
+    tips = {node.chain.get_last_block().block_hash for node in nodes}
+    print("Zgodny czubek lancucha" if len(tips) == 1 else "Wezly maja rozne czubki")
+    for node in nodes:
+        await node.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wezel PoS")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--unix", help="sciezka gniazda Unix zamiast TCP")
+    parser.add_argument("--peer", action="append", default=[], help="host:port innego wezla")
+    parser.add_argument("--validator", action="append", default=[], help="nazwa:stake walidatora sieci")
+    parser.add_argument("--own", action="append", default=[], help="walidator prowadzony przez ten wezel")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--epoch-length", type=int, default=32)
+    parser.add_argument("--slot-time", type=float, default=0.5)
+    parser.add_argument("--local", action="store_true", help="uruchom 3 wezly na localhost (test)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+
+    if args.local:
+        asyncio.run(run_local_network())
+        return
+
+    validators = [ValidatorInfo(name, float(stake)) for name, stake in (v.split(":") for v in args.validator)]
+
+    async def run():
+        chain = BlockchainPoS(validators, epoch_length=args.epoch_length, seed=args.seed, genesis=network_genesis())
+        node = PosNode(chain, args.own, slot_time=args.slot_time)
+        await node.start(port=args.port, path=args.unix)
+        print(f"[node] Nasluchuje na {node.address}")
+        for peer in args.peer:
+            host, port = peer.rsplit(":", 1)
+            await node.connect(host, int(port))
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await node.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import sys
+import time
+from typing import List
+import common_path  # noqa: F401
+from block_pos import Block
+from blockchain_pos import BlockchainPoS
+from validator_info import ValidatorInfo
+from validator_registry import ValidatorRegistry
+from common.simulator import Simulator, Network, SimNode, SimReport, finality_times, build_network
+
+
+def simulation_genesis() -> Block:
+    genesis = Block(index=0, prev_hash="0", validator_name="Genesis")
+    genesis.timestamp = 0.0
+    genesis.block_hash = genesis.calculate_hash()
+    return genesis
+
+
+class PosSimNode(SimNode):
+    """
+    Wezel prowadzacy jednego walidatora. W swoim slocie tworzy blok na
+    czubku swojego lancucha (BlockchainPoS, wybor galezi po skumulowanym stake'u).
+    """
+    def __init__(self, node_id: int, chain: BlockchainPoS, sim: Simulator, network: Network,
+                 block_size: int, validator_name: str):
+        super().__init__(node_id, chain, sim, network, block_size)
+        self.validator_name = validator_name
+        self.blocks_created = 0
+
+    def make_block(self, parent: Block) -> Block:
+        block = Block(index=parent.index + 1, prev_hash=parent.block_hash, validator_name=self.validator_name)
+        block.timestamp = self.sim.now
+        block.block_hash = block.calculate_hash()
+        self.sim.created[block.block_hash] = self.sim.now
+        self.blocks_created += 1
+        return block
+
+    def on_slot(self):
+        self.publish(self.make_block(self.chain.get_last_block()))
+
+
+class PosAttackerNode(PosSimNode):
+    """
+    Atakujacy w swoich slotach buduje prywatna galaz i wstrzymuje jej bloki.
+    Ujawnia ja, gdy uczciwy blok nad rozwidleniem ma `confirmations` potwierdzen,
+    a prywatna galaz ma wieksza skumulowana wage stake'u niz publiczna.
+    Przy stracie `give_up` wysokosci zaczyna od nowa na publicznym czubku.
+    """
+    def __init__(self, *args, confirmations: int = 6, give_up: int = 10, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.honest = False
+        self.confirmations = confirmations
+        self.give_up = give_up
+        self.attacks = 0
+        self.successes = 0
+        self.public_tip = self.chain.get_last_block()
+        self._begin()
+
+    def _begin(self):
+        self.fork = self.chain.get_last_block()
+        self.private_tip = self.fork
+        self.private: List[Block] = []
+
+    def _weight(self, block: Block) -> float:
+        return self.chain.tree.node(block.block_hash).cumulative
+
+    def on_slot(self):
+        block = self.make_block(self.private_tip)
+        self.arrivals[block.block_hash] = self.sim.now
+        self.chain.insert_block(block)
+        self.private.append(block)
+        self.private_tip = block
+        self._check()
+
+    def receive(self, block, origin: int = None):
+        super().receive(block, origin)
+        if block.block_hash in self.chain.tree.nodes and self._weight(block) > self._weight(self.public_tip):
+            self.public_tip = block
+            self._check()
+
+    def _check(self):
+        public_height = self.public_tip.index
+        if (self._weight(self.private_tip) > self._weight(self.public_tip)
+                and public_height - self.fork.index >= self.confirmations):
+            for block in self.private:
+                self.broadcast(block)
+            self.public_tip = self.private_tip
+            self.attacks += 1
+            self.successes += 1
+            self._begin()
+        elif public_height - self.private_tip.index >= self.give_up:
+            self.attacks += 1
+            self._begin()
+
+
+def simulate(
+    num_nodes: int = 10,
+    duration: float = 24 * 3600,
+    slot_time: float = 12.0,
+    latency: float = 0.2,
+    bandwidth: float = 1_000_000,
+    block_size: int = 1_000_000,
+    attacker_share: float = 0.0,
+    confirmations: int = 6,
+    give_up: int = 10,
+    partitions=(),
+    seed: int = None
+) -> SimReport:
+    """
+    Symuluje siec PoS przez `duration` sekund czasu sieci. Co slot_time sekund
+    losowany jest lider slotu proporcjonalnie do stake'u (jedno losowanie dla
+    calej sieci, jak wspolna losowosc/VRF). Przy attacker_share > 0 ostatni
+    wezel prowadzi walidatora atakujacego z takim udzialem w stake'u.
+    """
+    started = time.perf_counter()
+    sim = Simulator(seed)
+    network = Network(sim, num_nodes, latency, bandwidth)
+    for start, end, groups in partitions:
+        network.add_partition(start, end, groups)
+
+    honest_count = num_nodes - 1 if attacker_share > 0 else num_nodes
+    honest_stake = (1.0 - attacker_share) / honest_count * 100
+    stakes = [(f"Validator_{i}", honest_stake) for i in range(honest_count)]
+    if attacker_share > 0:
+        stakes.append(("Attacker", attacker_share * 100))
+
+    nodes = []
+    for node_id, (name, _) in enumerate(stakes):
+        validators = [ValidatorInfo(n, s) for n, s in stakes]
+        chain = BlockchainPoS(validators, genesis=simulation_genesis())
+        if node_id < honest_count:
+            nodes.append(PosSimNode(node_id, chain, sim, network, block_size, name))
+        else:
+            nodes.append(PosAttackerNode(node_id, chain, sim, network, block_size, name,
+                                         confirmations=confirmations, give_up=give_up))
+    build_network(nodes)
+
+    registry = ValidatorRegistry([ValidatorInfo(n, s) for n, s in stakes])
+    by_name = {node.validator_name: node for node in nodes}
+
+    def slot():
+        by_name[registry.draw(sim.rng)].on_slot()
+        sim.schedule(slot_time, slot)
+
+    sim.schedule(slot_time, slot)
+    sim.run(duration)
+
+    observer = nodes[0]
+    attacker = nodes[-1] if attacker_share > 0 else None
+    return SimReport(
+        duration=duration,
+        produced=len(observer.chain.tree.nodes) - 1,
+        main_blocks=len(observer.chain.chain) - 1,
+        finality=finality_times(nodes, sim.created, confirmations),
+        attacks=attacker.attacks if attacker else 0,
+        attack_successes=attacker.successes if attacker else 0,
+        events=sim.events,
+        seconds=time.perf_counter() - started
+    )
+
+
+def main():
+    # uzycie: python pos_sim.py [dni_sieci]
+    days = float(sys.argv[1]) if len(sys.argv) > 1 else 1.0
+    duration = days * 24 * 3600
+
+    print(f"=== Osierocone bloki a długość slotu ({days:g} dni sieci, 10 węzłów, 1 MB bloki, 1 MB/s) ===")
+    for slot_time in (12.0, 4.0, 2.0):
+        report = simulate(duration=duration, slot_time=slot_time, seed=1)
+        print(f"slot {slot_time:4.1f} s: {report}")
+
+    print("\n=== Podział sieci na 2 godziny ===")
+    report = simulate(duration=duration, seed=1, partitions=[(3600, 3 * 3600, [set(range(5)), set(range(5, 10))])])
+    print(report)
+
+    print("\n=== Atak prywatnej gałęzi (6 potwierdzeń) a udział w stake'u ===")
+    for share in (0.1, 0.2, 0.3, 0.4, 0.45):
+        report = simulate(duration=duration, attacker_share=share, seed=1)
+        print(f"stake={share:.2f}: sukces {report.attack_success_rate:.4f} "
+              f"({report.attack_successes}/{report.attacks}), symulacja {report.seconds:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
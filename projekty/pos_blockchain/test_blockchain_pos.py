@@ -0,0 +1,132 @@
+import pytest
+import common_path  # noqa: F401
+from block_pos import Block
+from blockchain_pos import BlockchainPoS
+from common.block_store import BlockStore
+from common.chain_reader import ChainReader
+from validator_info import ValidatorInfo
+from validator_registry import ValidatorRegistry
+from leader_schedule import LeaderSchedule, epoch_seed
+
+
+def validators():
+    return [ValidatorInfo("Dominant", 60.0), ValidatorInfo("Secondary", 30.0), ValidatorInfo("Minor", 10.0)]
+
+
+def fork(chain: BlockchainPoS, parent_height: int, length: int, validator: str) -> list:
+    parent = chain.chain[parent_height].block_hash
+    blocks = []
+    for _ in range(length):
+        blocks.append(chain.create_block([], validator, parent_hash=parent))
+        parent = blocks[-1].block_hash
+    return blocks
+
+
+def test_heavier_stake_branch_wins():
+    chain = BlockchainPoS(validators())
+    for _ in range(4):
+        chain.create_block([], "Minor")
+    tip = chain.get_last_block()
+
+    # galaz o tej samej wadze zostaje pierwsza widziana
+    fork(chain, 3, 1, "Minor")
+    assert chain.get_last_block() is tip
+    # krotsza galaz walidatora z wiekszym stake'iem jest ciezsza
+    heavier = fork(chain, 1, 1, "Dominant")
+    assert chain.get_last_block() is heavier[-1]
+    assert chain.tree.node(heavier[-1].block_hash).cumulative == pytest.approx(0.7)
+
+
+def test_fork_choice_uses_epoch_stake_snapshot(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    chain = BlockchainPoS(validators(), store=BlockStore(path))
+    for _ in range(3):
+        chain.create_block([], "Secondary")
+    tip = chain.get_last_block()
+    # pozniejsza zmiana stake'u nie zmienia wag blokow tej epoki
+    chain.update_stake("Minor", 10_000.0)
+    fork(chain, 0, 2, "Minor")
+    assert chain.get_last_block() is tip
+    chain.store.close()
+
+    reloaded = BlockchainPoS(validators(), store=BlockStore(path))
+    assert reloaded.get_last_block().block_hash == tip.block_hash
+
+
+def test_later_epoch_uses_updated_stake():
+    chain = BlockchainPoS(validators(), epoch_length=2, seed=1)
+    chain.create_block([], chain.leader_for(1))
+    chain.update_stake("Minor", 90.0)
+    # epoka 0 (wysokosci 1-2) ma juz zdjecie stake'ow, epoka 1 bierze nowy stake
+    assert chain.block_weight(Block(2, "", "Minor")) == pytest.approx(0.1)
+    assert chain.block_weight(Block(3, "", "Minor")) == pytest.approx(0.5)
+
+
+def test_tampered_block_rejected():
+    chain = BlockchainPoS(validators())
+    block = Block(index=1, prev_hash=chain.get_last_block().block_hash, validator_name="Minor")
+    block.block_hash = block.calculate_hash()
+    block.validator = "Dominant"
+    with pytest.raises(ValueError, match="block_hash"):
+        chain.insert_block(block)
+    assert len(chain.tree) == 1
+
+
+def test_block_index_must_follow_parent_height():
+    chain = BlockchainPoS(validators())
+    block = Block(index=57, prev_hash=chain.get_last_block().block_hash, validator_name="Minor")
+    block.block_hash = block.calculate_hash()
+    with pytest.raises(ValueError, match="indeks"):
+        chain.insert_block(block)
+    assert len(chain.tree) == 1
+
+
+def test_unregistered_validator_rejected():
+    chain = BlockchainPoS(validators())
+    with pytest.raises(ValueError, match="nieznany walidator"):
+        chain.create_block([], "Mallory")
+    assert len(chain.tree) == 1
+
+
+def test_scheduled_leader_enforced():
+    chain = BlockchainPoS(validators(), epoch_length=4, seed=7)
+    leader = chain.leader_for(1)
+    other = next(v.name for v in validators() if v.name != leader)
+    with pytest.raises(ValueError, match="liderem jest"):
+        chain.create_block([], other)
+    assert chain.create_block([], leader).validator == leader
+
+
+def test_schedule_for_other_branch_uses_epoch_stakes():
+    chain = BlockchainPoS(validators(), epoch_length=4)
+    for _ in range(6):
+        chain.add_block([])
+    # zmiana stake'ow po zdjeciu epoki 1 nie zmienia jej liderow
+    chain.update_stake("Minor", 10_000.0)
+
+    parent = chain.chain[3].block_hash
+    seed_block = chain.create_block([], chain.leader_for(4, parent), parent_hash=parent)
+    expected = LeaderSchedule.compute(ValidatorRegistry(validators()), 1, 5, 4, epoch_seed(1, seed_block.block_hash))
+    assert [chain.leader_for(h, seed_block.block_hash) for h in range(5, 9)] == expected.leaders
+    assert chain.stake_snapshot(1).stake_of("Minor") == 10.0
+    assert chain.stake_snapshot(2).stake_of("Minor") == 10_000.0
+
+
+def test_forked_store_keeps_height_positions(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    store = BlockStore(path)
+    chain = BlockchainPoS(validators(), store=store)
+    for _ in range(3):
+        chain.add_block([])
+    fork(chain, 1, 4, "Secondary")
+    store.sync()
+
+    with ChainReader(path, Block) as reader:
+        assert [b.block_hash for b in reader] == [b.block_hash for b in chain.chain]
+        assert [b.index for b in reader] == list(range(len(chain.chain)))
+    store.close()
+
+    reloaded = BlockchainPoS(validators(), store=BlockStore(path))
+    assert reloaded.get_last_block().block_hash == chain.get_last_block().block_hash
+    assert len(reloaded.tree) == len(chain.tree)
+    assert reloaded.validate(workers=1).ok
@@ -0,0 +1,52 @@
+import time
+from typing import List, Sequence
+import common_path  # noqa: F401
+from block_pos import Block
+from common.validation import ValidationReport, read_records, check_links, check_chunks
+
+
+def _link(block: Block) -> tuple:
+    return (block.index, block.prev_hash, block.block_hash)
+
+
+def check_records(records: List[dict]):
+    """
+    Sprawdza bloki niezaleznie od siebie: przelicza hash bloku.
+    Zwraca (bledy, [(index, prev_hash, block_hash)]) do sprawdzenia powiazan.
+    """
+    errors = []
+    links = []
+    for record in records:
+        block = Block.from_dict(record)
+        block_hash = block.calculate_hash()
+        if block_hash != block.block_hash:
+            errors.append((block.index, "niezgodny block_hash"))
+        links.append(_link(block))
+    return errors, links
+
+
+def check_range(path: str, start: int, stop: int):
+    return check_records(read_records(path, Block, start, stop))
+
+
+def verify_blocks(
+    blocks: Sequence[Block],
+    start: int = 0,
+    stop: int = None,
+    workers: int = None,
+    chunk_size: int = 256
+) -> ValidationReport:
+    """
+    Weryfikuje bloki [start, stop). Zakres dzielony jest na paczki sprawdzane
+    w puli procesow; male zakresy i workers=1 sprawdzane sa w biezacym procesie.
+    `blocks` to lista blokow lancucha albo ChainReader - wtedy procesy robocze
+    dostaja tylko zakresy wysokosci i czytaja rekordy z pliku same.
+    """
+    stop = len(blocks) if stop is None else stop
+    start_t = time.perf_counter()
+
+    errors, links = check_chunks(blocks, start, stop, workers, chunk_size, check_records, check_range)
+    prev = _link(blocks[start - 1]) if start > 0 else None
+    errors.extend(check_links(links, prev))
+
+    return ValidationReport(start, stop, sorted(errors), time.perf_counter() - start_t)
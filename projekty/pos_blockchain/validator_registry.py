@@ -0,0 +1,99 @@
+import random
+import numpy as np
+from typing import List
+from validator_info import ValidatorInfo
+
+
+class ValidatorRegistry:
+    """
+    Rejestr walidatorow oparty na drzewie Fenwicka (BIT) nad stake'ami.
+    Zmiana stake'u i losowanie walidatora proporcjonalnie do stake'u
+    kosztuja O(log n) zamiast liniowego przegladu przy kazdym bloku.
+    """
+    def __init__(self, validators: List[ValidatorInfo]):
+        self.validators = validators
+        self.positions = {v.name: i for i, v in enumerate(validators)}
+        self.stakes = [float(v.stake) for v in validators]
+        # budowa drzewa w O(n); tree[i] (od 1) obejmuje przedzial konczacy sie na i
+        self.tree = [0.0] + self.stakes
+        for i in range(1, len(self.tree)):
+            parent = i + (i & -i)
+            if parent < len(self.tree):
+                self.tree[parent] += self.tree[i]
+
+    def __len__(self) -> int:
+        return len(self.validators)
+
+    def _prefix_sum(self, count: int) -> float:
+        total = 0.0
+        while count > 0:
+            total += self.tree[count]
+            count -= count & -count
+        return total
+
+    def _add(self, position: int, delta: float):
+        i = position + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def snapshot(self) -> "ValidatorRegistry":
+        """
+        Niezalezna kopia rejestru - pozniejsze zmiany stake'ow jej nie dotycza.
+        """
+        return ValidatorRegistry([ValidatorInfo(v.name, v.stake) for v in self.validators])
+
+    def stake_of(self, name: str) -> float:
+        position = self.positions.get(name)
+        return self.stakes[position] if position is not None else 0.0
+
+    def total_stake(self) -> float:
+        return self._prefix_sum(len(self.validators))
+
+    def add_validator(self, validator: ValidatorInfo):
+        if validator.name in self.positions:
+            raise ValueError(f"Walidator {validator.name} jest juz w rejestrze")
+        position = len(self.validators)
+        self.validators.append(validator)
+        self.positions[validator.name] = position
+        self.stakes.append(float(validator.stake))
+        # nowy wezel obejmuje siebie i poprzednie (i & -i) - 1 pozycji
+        i = position + 1
+        self.tree.append(validator.stake + self._prefix_sum(i - 1) - self._prefix_sum(i - (i & -i)))
+
+    def update_stake(self, name: str, stake: float):
+        position = self.positions[name]
+        self._add(position, stake - self.stakes[position])
+        self.stakes[position] = float(stake)
+        self.validators[position].stake = stake
+
+    def find(self, value: float) -> int:
+        """
+        Zwraca pozycje pierwszego walidatora, dla ktorego suma stake'ow
+        do niego wlacznie jest >= value (jak w skumulowanym przegladzie).
+        """
+        position = 0
+        step = 1 << (len(self.tree) - 1).bit_length()
+        while step:
+            nxt = position + step
+            if nxt < len(self.tree) and self.tree[nxt] < value:
+                position = nxt
+                value -= self.tree[nxt]
+            step >>= 1
+        # zaokraglenia moga wypchnac wynik poza ostatni indeks
+        return min(position, len(self.validators) - 1)
+
+    def draw(self, rng=random) -> str:
+        rnd = rng.uniform(0, self.total_stake())
+        return self.validators[self.find(rnd)].name
+
+    def draw_many(self, count: int, rng: np.random.Generator = None) -> List[str]:
+        """
+        Wektorowe losowanie `count` slotow naraz (ten sam rozklad co draw()).
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        cumulative = np.cumsum(self.stakes)
+        values = rng.uniform(0, cumulative[-1], count)
+        positions = np.minimum(np.searchsorted(cumulative, values, side="left"), len(self.validators) - 1)
+        names = [v.name for v in self.validators]
+        return [names[p] for p in positions]
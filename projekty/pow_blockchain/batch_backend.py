@@ -0,0 +1,70 @@
+import numpy as np
+from mining import MiningEngine
+
+
+class BatchBackend:
+    """
+    Backend wsadowy: dla zakresu nonce buduje naraz wszystkie kandydaty
+    (zapis dziesietny nonce dla HASH_V1, 8 bajtow big-endian dla HASH_V2)
+    we wczesniej zaalokowanym buforze NumPy,
+    a potem haszuje je w ciasnej petli bez tworzenia napisow na kazdy nonce.
+    """
+    name = "batch"
+
+    MAX_DIGITS = 20  # uint64 ma najwyzej 20 cyfr dziesietnych
+
+    def __init__(self, batch_size: int = 8192):
+        self.batch_size = batch_size
+        self.buffer = np.empty(batch_size * self.MAX_DIGITS, dtype=np.uint8)
+        self.powers = 10 ** np.arange(self.MAX_DIGITS, dtype=np.uint64)
+        self._row_views = {}
+
+    def _rows(self, width: int) -> list:
+        # widoki wierszy bufora tworzymy raz dla danej szerokosci i uzywamy ponownie
+        if width not in self._row_views:
+            view = memoryview(self.buffer)
+            self._row_views[width] = [
+                view[i * width:(i + 1) * width] for i in range(self.batch_size)
+            ]
+        return self._row_views[width]
+
+    def _fill(self, start: int, count: int, width: int):
+        # cyfry wszystkich nonce liczone wektorowo, wiersz o stalej szerokosci
+        nonces = np.arange(start, start + count, dtype=np.uint64)
+        rows = self.buffer[:count * width].reshape(count, width)
+        digits = (nonces[:, None] // self.powers[width - 1::-1]) % 10
+        rows[:] = digits + ord("0")
+
+    def _fill_binary(self, start: int, count: int):
+        nonces = np.arange(start, start + count, dtype=np.uint64)
+        self.buffer[:count * 8] = nonces.astype(">u8").view(np.uint8)
+
+    def search(self, engine: MiningEngine, start: int, stop: int, threshold: bytes):
+        midstate = engine.midstate
+        suffix = engine.suffix
+        attempts = 0
+        nonce = start
+
+        while nonce < stop:
+            if engine.binary_nonce:
+                count = min(stop, nonce + self.batch_size) - nonce
+                self._fill_binary(nonce, count)
+                rows = self._rows(8)
+            else:
+                # wszystkie nonce w partii musza miec te sama liczbe cyfr
+                width = len(str(nonce))
+                count = min(stop, 10 ** width, nonce + self.batch_size) - nonce
+                self._fill(nonce, count, width)
+                rows = self._rows(width)
+
+            for i, row in enumerate(rows[:count]):
+                h = midstate.copy()
+                h.update(row)
+                h.update(suffix)
+                if h.digest() <= threshold:
+                    return nonce + i, attempts + i + 1
+            attempts += count
+
+            nonce += count
+
+        return None, attempts
@@ -0,0 +1,145 @@
+import math
+import random
+import common_path  # noqa: F401
+from block import Block
+from blockchain import Blockchain
+from common.transaction import Transaction, address
+from common.mempool import PriorityMempool
+from common.sigverify import SignatureVerifier
+from common.resource_sampler import ResourceSampler
+from pow_sim import simulate, nakamoto_probability
+from common import bench_harness
+from common import ed25519
+
+# klucze uzytkownikow generowane raz na proces - podpisywanie jest czescia
+# przygotowania, a nie pomiaru
+_keys = []
+
+
+def user_keys(users: int) -> dict:
+    """
+    Adres konta -> klucz prywatny dla `users` uzytkownikow.
+    """
+    while len(_keys) < users:
+        _keys.append(ed25519.generate_private_key())
+    return {address(ed25519.public_key(key)): key for key in _keys[:users]}
+
+
+def random_transactions(count: int, users: int = 100, signed: bool = False):
+    # podpisane transakcje wysylane sa z adresow kluczy, z kolejnymi nonce nadawcy
+    keys = user_keys(users) if signed else {}
+    names = list(keys) if signed else [f"User_{n}" for n in range(1, users + 1)]
+    nonces = {}
+    transactions = []
+    for _ in range(count):
+        sender = random.choice(names)
+        tx = Transaction(sender, random.choice(names), random.uniform(0.1, 10.0))
+        if signed:
+            tx.nonce = nonces.get(sender, 0)
+            nonces[sender] = tx.nonce + 1
+            tx.sign(keys[sender])
+        transactions.append(tx)
+    return transactions
+
+
+def usage_metrics(usage) -> dict:
+    return {
+        "cpu_time": usage.cpu_time,
+        "cpu_percent": usage.cpu_percent,
+        "rss_mb": usage.peak_rss_mb,
+        "ctx_switches": usage.ctx_switches,
+    }
+
+
+def tx_load(difficulty: int = 4, tx_per_block: int = 100, workers: int = 0, transactions: int = 1000,
+            blocks: int = None, signed: bool = False) -> dict:
+    """
+    Przetwarzanie `transactions` transakcji z mempoola: szablon bloku + kopanie.
+    workers > 0 - kopanie w trwalej puli procesow. blocks domyslnie tyle, ile
+    potrzeba na wszystkie transakcje. Mempool, lancuch i pula procesow
+    powstaja przed pomiarem; mierzona jest tylko petla dodawania blokow.
+    """
+    blocks = blocks or math.ceil(transactions / tx_per_block)
+    verifier = SignatureVerifier() if signed else None
+    mempool = PriorityMempool()
+    mempool.add_many(random_transactions(transactions, signed=signed))
+    chain = Blockchain(difficulty=difficulty, use_pool=workers > 0, num_workers=workers or None,
+                       verifier=verifier, mempool=mempool)
+    sampler = ResourceSampler()
+    attempts = 0
+    try:
+        with sampler.measure() as usage:
+            for i in range(1, blocks + 1):
+                block = Block(index=i, difficulty=difficulty)
+                block.transactions = mempool.build_template(max_count=tx_per_block)
+                chain.add_block(block)
+                attempts += block.attempts
+    finally:
+        chain.close()
+        if verifier is not None:
+            verifier.close()
+    return dict(
+        seconds=usage.wall,
+        tps=transactions / usage.wall if usage.wall > 0 else 0.0,
+        block_seconds=usage.wall / blocks,
+        hashrate=attempts / usage.wall if usage.wall > 0 else 0.0,
+        **usage_metrics(usage)
+    )
+
+
+def majority(difficulty: int = 4, attacker_share: float = 0.6, blocks: int = 100) -> dict:
+    """
+    Scenariusz 5 z main.py: kazdy blok przypisywany jest losowo wezlowi
+    uczciwemu albo atakujacemu wg udzialu w mocy obliczeniowej.
+    """
+    chain = Blockchain(difficulty=difficulty)
+    transactions = [Transaction("User1", "User2", 10 * i) for i in range(1, blocks + 1)]
+    miners = random.choices(["Honest", "Attacker"], weights=[1 - attacker_share, attacker_share], k=blocks)
+    sampler = ResourceSampler()
+    with sampler.measure() as usage:
+        for i in range(1, blocks + 1):
+            block = Block(index=i, difficulty=difficulty)
+            block.transactions.append(transactions[i - 1])
+            chain.add_block(block)
+    return dict(
+        seconds=usage.wall,
+        block_seconds=usage.wall / blocks,
+        honest_blocks=miners.count("Honest"),
+        attacker_blocks=miners.count("Attacker"),
+        **usage_metrics(usage)
+    )
+
+
+def attack(attacker_share: float = 0.3, confirmations: int = 6, days: float = 7.0, nodes: int = 10) -> dict:
+    """
+    Atak przepisania lancucha w symulatorze sieci (pow_sim) - kazde powtorzenie
+    z innym ziarnem.
+    """
+    report = simulate(num_nodes=nodes, duration=days * 24 * 3600, attacker_share=attacker_share,
+                      confirmations=confirmations, seed=random.getrandbits(32))
+    return {
+        "success_rate": report.attack_success_rate,
+        "nakamoto": nakamoto_probability(attacker_share, confirmations),
+        "orphan_rate": report.orphan_rate,
+        "seconds": report.seconds,
+    }
+
+
+CASES = {
+    "tx_load": tx_load,
+    "majority": majority,
+    "attack": attack,
+}
+
+# siatki domyslne - nadpisywane przez --sweep param=v1,v2
+GRIDS = {
+    "tx_load": {"difficulty": [3, 4], "tx_per_block": [100], "workers": [0]},
+    "majority": {"difficulty": [3], "blocks": [20]},
+    "attack": {"attacker_share": [0.1, 0.3], "days": [7.0]},
+}
+
+
+if __name__ == "__main__":
+    # uzycie: python benchmark.py run [--case tx_load] [--sweep workers=0,2] [--output wyniki.json]
+    #         python benchmark.py compare stary.json nowy.json
+    bench_harness.main(CASES, GRIDS)
@@ -0,0 +1,39 @@
+import sys
+import time
+import common_path  # noqa: F401
+from block import Block
+from mining import MiningEngine, ReferenceBackend
+from batch_backend import BatchBackend
+from common.transaction import Transaction
+
+
+def measure_backend(backend, engine: MiningEngine, num_nonces: int) -> float:
+    """
+    Przeszukuje `num_nonces` nonce z nieosiagalnym celem i zwraca liczbe hashy na sekunde.
+    """
+    impossible = bytes(32)  # tylko hash zlozony z samych zer spelnilby ten cel
+    start_t = time.perf_counter()
+    _, attempts = backend.search(engine, 0, num_nonces, impossible)
+    elapsed = time.perf_counter() - start_t
+    return attempts / elapsed if elapsed > 0 else 0.0
+
+
+def main():
+    # uzycie: python benchmark_backends.py [liczba_nonce] [transakcje_w_bloku]
+    num_nonces = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    num_transactions = int(sys.argv[2]) if len(sys.argv) > 2 else 100
+
+    block = Block(index=1, difficulty=4, prev_hash="0" * 64)
+    block.transactions = [Transaction(f"User_{j}", f"User_{j + 1}", j) for j in range(num_transactions)]
+    engine = MiningEngine.for_block(block)
+
+    print(f"=== Porównanie backendów haszujących ({num_nonces} nonce, {num_transactions} transakcji) ===")
+    rates = {}
+    for backend in (ReferenceBackend(), BatchBackend()):
+        rates[backend.name] = measure_backend(backend, engine, num_nonces)
+        print(f"{backend.name:10s} {rates[backend.name]:12.0f} H/s")
+    print(f"Przyspieszenie batch/reference: {rates['batch'] / rates['reference']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
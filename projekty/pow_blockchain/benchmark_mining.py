@@ -0,0 +1,49 @@
+import sys
+import time
+import common_path  # noqa: F401
+from block import Block
+from mining_pool import MiningPool
+from mining import MiningEngine
+from common.transaction import Transaction
+from target import Target
+from common.cpus import available_cpus
+
+
+def measure_hash_rate(num_workers: int, difficulty: int, num_blocks: int) -> float:
+    """
+    Kopie `num_blocks` blokow w puli z `num_workers` procesami
+    i zwraca srednia liczbe hashy na sekunde.
+    """
+    total_attempts = 0
+    total_time = 0.0
+    with MiningPool(num_workers) as pool:
+        for i in range(num_blocks):
+            block = Block(index=i, difficulty=difficulty, prev_hash="0" * 64)
+            block.transactions = [Transaction(f"User_{j}", f"User_{j + 1}", j) for j in range(100)]
+            engine = MiningEngine.for_block(block)
+
+            start_t = time.perf_counter()
+            _, attempts = pool.mine(engine.prefix, engine.suffix, Target.from_hex_zeros(difficulty).threshold, engine.binary_nonce)
+            total_time += time.perf_counter() - start_t
+            total_attempts += attempts
+    return total_attempts / total_time if total_time > 0 else 0.0
+
+
+def main():
+    # uzycie: python benchmark_mining.py [trudnosc] [liczba_blokow]
+    difficulty = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    num_blocks = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    max_workers = available_cpus()
+
+    print(f"=== Skalowanie kopania (difficulty={difficulty}, bloki={num_blocks}) ===")
+    base_rate = None
+    for workers in range(1, max_workers + 1):
+        rate = measure_hash_rate(workers, difficulty, num_blocks)
+        if base_rate is None:
+            base_rate = rate
+        speedup = rate / base_rate if base_rate else 0.0
+        print(f"Procesy: {workers:2d}  {rate:12.0f} H/s  przyspieszenie: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
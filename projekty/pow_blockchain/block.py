@@ -2,46 +2,39 @@ import hashlib
 import time
 import multiprocessing
 from typing import List
-from transaction import Transaction
+import common_path  # noqa: F401
+from common.transaction import Transaction
+from mining import MiningEngine, ReferenceBackend, search_shared
+from target import Target
+from common.header import HASH_V1, HASH_V2, HASH_V3, pow_header
+from common.merkle import MerkleTree
+from common.instrumentation import metrics
+from common.cpus import available_cpus
+
+# wielkosc partii nonce, gdy kopanie mozna przerwac (stop_event)
+CANCEL_BATCH = 4096
 
 
 # funkcja wieloprocesowa
 def worker(
-    start_nonce: int,
-    step: int,
-    block: "Block",
-    target_prefix: str,
+    prefix: bytes,
+    suffix: bytes,
+    binary_nonce: bool,
+    threshold: bytes,
+    next_nonce: multiprocessing.Value,
     found_nonce: multiprocessing.Value,
     total_attempts: multiprocessing.Value,
-    stop_flag: multiprocessing.Value
+    stop_flag: multiprocessing.RawValue,
+    batch_size: int = 10_000
 ):
-    nonce = start_nonce
-    local_attempts = 0
-    check_interval = 1000  # ustawiamy stop_flag co 1000 iteracji
-
-    while True:
-        if local_attempts % check_interval == 0:
-            with stop_flag.get_lock():
-                if stop_flag.value == 1:
-                    with total_attempts.get_lock():
-                        total_attempts.value += local_attempts
-                    break
-
-        block.nonce = nonce
-        block_hash = block.calculate_hash()
-        local_attempts += 1
-
-        if block_hash.startswith(target_prefix):
-            with found_nonce.get_lock():
-                if found_nonce.value == -1:  # pierwszy proces znajdujacy hash
-                    found_nonce.value = nonce
-                    with stop_flag.get_lock():
-                        stop_flag.value = 1
-            with total_attempts.get_lock():
-                total_attempts.value += local_attempts
-            break
-
-        nonce += step
+    engine = MiningEngine(prefix, suffix, binary_nonce)
+    local_attempts = search_shared(
+        engine, threshold, next_nonce, batch_size,
+        stop_flag, 0, 1, found_nonce
+    )
+    # licznik prob aktualizujemy tylko raz, po zakonczeniu pracy
+    with total_attempts.get_lock():
+        total_attempts.value += local_attempts
 
 
 # klasa Block
@@ -51,7 +44,9 @@ class Block:
         index: int,
         difficulty: int,
         prev_hash: str = "",
-        use_multiprocessing: bool = False
+        use_multiprocessing: bool = False,
+        mode: str = "hex",
+        backend=None
     ):
         self.index = index
         self.prev_hash = prev_hash
@@ -59,73 +54,210 @@ class Block:
         self.transactions: List[Transaction] = []
         self.nonce = 0
         self.difficulty = difficulty
+        self.target = Target.from_difficulty(difficulty, mode)
         self.block_hash = ""
         self.use_multiprocessing = use_multiprocessing
         self.attempts = 0
+        self.mining_time = 0.0  # czas kopania mierzony przez Blockchain
+        # backend haszujacy dla kopania jednowatkowego (np. BatchBackend)
+        self.backend = backend if backend is not None else ReferenceBackend()
+        # nowe bloki uzywaja binarnego naglowka z celem, HASH_V1/HASH_V2 zostaja dla starych lancuchow
+        self.hash_version = HASH_V3
+        # stary zapis bez celu PoW - pracy bloku nie da sie sprawdzic
+        self.legacy = False
+        self._merkle = None
+        self._merkle_source = None
+
+    def transactions_data(self) -> str:
+        return "".join([f"{tx.sender}{tx.receiver}{tx.amount}" for tx in self.transactions])
+
+    def to_dict(self) -> dict:
+        data = {
+            "index": self.index,
+            "prev_hash": self.prev_hash,
+            "timestamp": self.timestamp,
+            "transactions": [tx.to_dict() for tx in self.transactions],
+            "nonce": self.nonce,
+            "block_hash": self.block_hash,
+            "hash_version": self.hash_version,
+            "difficulty": self.difficulty,
+            "target": f"{self.target.value:064x}",
+            "attempts": self.attempts,
+            "mining_time": self.mining_time
+        }
+        if self.legacy:
+            del data["target"]  # bez wymyslonego celu - zapis zostaje rozpoznawalny jako stary
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Block":
+        # brak pol w starych zapisach (chain_data.json) - schemat HASH_V1
+        difficulty = data.get("difficulty", 0)
+        block = cls(index=data["index"], difficulty=difficulty, prev_hash=data["prev_hash"])
+        block.timestamp = data["timestamp"]
+        block.transactions = [Transaction.from_dict(tx) for tx in data["transactions"]]
+        block.nonce = data["nonce"]
+        block.block_hash = data["block_hash"]
+        block.hash_version = data.get("hash_version", HASH_V1)
+        if "target" in data:
+            block.target = Target(int(data["target"], 16))
+        else:
+            block.legacy = True
+        block.attempts = data.get("attempts", 0)
+        block.mining_time = data.get("mining_time", 0.0)
+        return block
+
+    def merkle_tree(self) -> MerkleTree:
+        """
+        Drzewo Merkle'a transakcji bloku. Drzewo jest zapamietywane: po dopisaniu
+        transakcji do listy dochodza tylko nowe liscie (O(log n) na transakcje),
+        a po podmianie calej listy drzewo budowane jest od nowa.
+        """
+        txs = self.transactions
+        tree = self._merkle
+        if tree is None or self._merkle_source is not txs or len(tree) > len(txs):
+            tree = MerkleTree()
+            self._merkle = tree
+            self._merkle_source = txs
+        if len(tree) < len(txs):
+            tree.extend(tx.serialize() for tx in txs[len(tree):])
+        return tree
+
+    def transactions_root(self) -> bytes:
+        return self.merkle_tree().root()
+
+    def transaction_proof(self, index: int):
+        return self.merkle_tree().proof(index)
 
     def calculate_hash(self) -> str:
+        if self.hash_version != HASH_V1:
+            target = self.target.threshold if self.hash_version == HASH_V3 else None
+            header = pow_header(self.index, self.timestamp, self.prev_hash, self.transactions_root(), self.nonce, target)
+            return hashlib.sha256(header).hexdigest()
+
         block_data = (
             str(self.index)
             + self.prev_hash
             + str(self.timestamp)
             + str(self.nonce)
-            + "".join([f"{tx.sender}{tx.receiver}{tx.amount}" for tx in self.transactions])
+            + self.transactions_data()
         )
         return hashlib.sha256(block_data.encode("utf-8")).hexdigest()
 
-    def mine_block(self):
+    def mine_block(self, pool=None, stop_event=None) -> bool:
+        """
+        Kopie blok. stop_event (threading.Event) pozwala przerwac kopanie z innego
+        watku, np. gdy z sieci przyjdzie konkurencyjny blok - wtedy zwraca False.
+        """
+        started = time.perf_counter()
+        # trwala pula procesow z lancucha ma pierwszenstwo
+        if pool is not None:
+            method = "mining pool"
+            found = self._mine_block_pool(pool, stop_event)
         # dynamicznie decydujemy czy uzyc wieloprocesowosci
-        if self.use_multiprocessing and self.difficulty > 5:
-            self._mine_block_multi()
+        elif self.use_multiprocessing and self.target.zero_bits > 20:
+            method = "multi-process"
+            found = self._mine_block_multi(stop_event)
         else:
-            self._mine_block_single()
+            method = "single-thread"
+            found = self._mine_block_single(stop_event)
+        if metrics.enabled:
+            self._record_mining(method, found, time.perf_counter() - started)
+        return found
+
+    def _record_mining(self, method: str, found: bool, seconds: float):
+        metrics.inc("hashes_total", self.attempts)
+        if not found:
+            metrics.emit("mining_cancelled", index=self.index, attempts=self.attempts, seconds=seconds)
+            return
+        metrics.inc("blocks_sealed_total")
+        metrics.observe("seal_seconds", seconds)
+        if seconds > 0:
+            metrics.observe("hash_rate", self.attempts / seconds)
+        metrics.emit("block_sealed", index=self.index, hash=self.block_hash, method=method,
+                     attempts=self.attempts, seconds=seconds)
+
+    def _engine(self) -> MiningEngine:
+        # prefiks naglowka i transakcje serializowane raz na blok
+        if not metrics.enabled:
+            return MiningEngine.for_block(self)
+        started = time.perf_counter()
+        engine = MiningEngine.for_block(self)
+        metrics.observe("serialize_seconds", time.perf_counter() - started)
+        return engine
 
     
     # kopanie jednowatkowe
-    def _mine_block_single(self):
-        target_prefix = "0" * self.difficulty
+    def _mine_block_single(self, stop_event=None):
+        threshold = self.target.threshold
+        engine = self._engine()
         nonce = 0
         attempts = 0
+        # przy mozliwosci przerwania mniejsze partie - reakcja w milisekundach
+        batch = 100_000 if stop_event is None else CANCEL_BATCH
 
         while True:
-            self.nonce = nonce
-            block_hash = self.calculate_hash()
-            attempts += 1
+            if stop_event is not None and stop_event.is_set():
+                self.attempts = attempts
+                return False
+            found, batch_attempts = self.backend.search(engine, nonce, nonce + batch, threshold)
+            attempts += batch_attempts
 
-            if block_hash.startswith(target_prefix):
-                self.block_hash = block_hash
+            if found is not None:
+                self.nonce = found
+                self.block_hash = engine.hash_nonce(found)
                 self.attempts = attempts
-                print(f"[Block {self.index}] Found valid hash: {self.block_hash}")
-                print(f"Attempts (single-thread): {self.attempts}")
-                break
+                return True
 
-            nonce += 1
+            nonce += batch
 
     
     # kopanie wieloprocesowe
-    def _mine_block_multi(self):
-        target_prefix = "0" * self.difficulty
-        num_workers = min(multiprocessing.cpu_count(), 4)  # Ograniczamy liczbe procesow do 4
+    def _mine_block_multi(self, stop_event=None):
+        threshold = self.target.threshold
+        num_workers = available_cpus()
 
-        found_nonce = multiprocessing.Value("i", -1)
-        total_attempts = multiprocessing.Value("i", 0)
-        stop_flag = multiprocessing.Value("i", 0)
+        engine = self._engine()
+
+        # wartosci 64-bitowe - "i" przepelnialo sie przy wysokiej trudnosci
+        next_nonce = multiprocessing.Value("q", 0)
+        found_nonce = multiprocessing.Value("q", -1)
+        total_attempts = multiprocessing.Value("q", 0)
+        stop_flag = multiprocessing.RawValue("q", 0)  # czytane bez blokady
 
         processes = []
         for i in range(num_workers):
             p = multiprocessing.Process(
                 target=worker,
-                args=(i, num_workers, self, target_prefix, found_nonce, total_attempts, stop_flag)
+                args=(engine.prefix, engine.suffix, engine.binary_nonce, threshold, next_nonce, found_nonce, total_attempts, stop_flag)
             )
             processes.append(p)
             p.start()
 
         for p in processes:
-            p.join()
+            while p.is_alive():
+                if stop_event is not None and stop_event.is_set():
+                    stop_flag.value = 1
+                p.join(0.005)
+
+        if found_nonce.value == -1:  # przerwane przez stop_event
+            self.attempts = total_attempts.value
+            return False
 
         self.nonce = found_nonce.value
-        self.block_hash = self.calculate_hash()
+        self.block_hash = engine.hash_nonce(self.nonce)
         self.attempts = total_attempts.value
+        return True
+
+    # kopanie w trwalej puli procesow
+    def _mine_block_pool(self, pool, stop_event=None):
+        engine = self._engine()
+        found, attempts = pool.mine(engine.prefix, engine.suffix, self.target.threshold, engine.binary_nonce, stop_event)
+        if found == -1:  # przerwane przez stop_event
+            self.attempts = attempts
+            return False
 
-        print(f"[Block {self.index}] Found valid hash: {self.block_hash}")
-        print(f"Attempts (multi-process): {self.attempts}")
\ No newline at end of file
+        self.nonce = found
+        self.block_hash = engine.hash_nonce(found)
+        self.attempts = attempts
+        return True
@@ -1,48 +1,240 @@
 import time
+import common_path  # noqa: F401
 from block import Block
+from mining_pool import MiningPool
+from target import Target
+from retarget import RetargetPolicy, expected_target
+from common.block_store import BlockStore
+from validation import ValidationReport, verify_blocks
+from common.block_tree import BlockTree
+from common.account_state import AccountState
+from common.sigverify import SignatureVerifier
+from common.mempool import PriorityMempool
+from common.instrumentation import metrics
 import json
 
-def save_blockchain_to_file(chain, filename="chain_data.json"):
-    data = []
-    for block in chain:
-        data.append({
-            "index": block.index,
-            "prev_hash": block.prev_hash,
-            "timestamp": block.timestamp,
-            "transactions": [
-                {"sender": tx.sender, "receiver": tx.receiver, "amount": tx.amount}
-                for tx in block.transactions
-            ],
-            "nonce": block.nonce,
-            "block_hash": block.block_hash
-        })
-    with open(filename, "w") as f:
-        json.dump(data, f, indent=4)
+def import_json_chain(filename: str, store: BlockStore):
+    """
+    Jednorazowa migracja starego zapisu (chain_data.json) do magazynu blokow.
+    """
+    with open(filename) as f:
+        for record in json.load(f):
+            store.append(Block.from_dict(record).to_dict())
 
 
 class Blockchain:
-    def __init__(self, difficulty: int):
+    def __init__(
+        self,
+        difficulty: int,
+        use_pool: bool = False,
+        num_workers: int = None,
+        mode: str = "hex",
+        retarget: RetargetPolicy = None,
+        store: BlockStore = None,
+        state: AccountState = None,
+        verifier: SignatureVerifier = None,
+        mempool: PriorityMempool = None,
+        genesis: Block = None
+    ):
+        # mode: "hex" (zera hex), "bits" (zerowe bity) lub "target" (256-bitowa liczba)
         self.difficulty = difficulty
-        self.chain = []
-        # tworzenie bloku genesis
-        genesis = Block(index=0, prev_hash="0", difficulty=self.difficulty)
-        genesis.block_hash = genesis.calculate_hash()
-        self.chain.append(genesis)
+        self.mode = mode
+        self.initial_target = Target.from_difficulty(difficulty, mode)
+        # cel dla kolejnego bloku na czubku glownego lancucha
+        self.target = self.initial_target
+        # opcjonalne dostosowanie trudnosci do zadanego czasu bloku - liczone
+        # z blokow najlepszego lancucha, wiec wezly na tym samym lancuchu licza ten sam cel
+        self.retarget = retarget
+        self.block_times = []  # czasy kopania blokow wykopanych lokalnie (statystyka)
+        self.tree: BlockTree = None
+        self.validated_height = 0  # bloki [0, validated_height) sa juz zweryfikowane
+        # opcjonalny stan kont - transakcje bez pokrycia sa odrzucane
+        self.state = state
+        # opcjonalna weryfikacja podpisow transakcji przed skladaniem bloku
+        self.verifier = verifier
+        # opcjonalny mempool - zatwierdzone transakcje sa z niego usuwane,
+        # a transakcje z odlaczonych blokow wracaja do niego po reorganizacji
+        self.mempool = mempool
+        # pula procesow startuje raz i sluzy do kopania wszystkich blokow
+        self.pool = MiningPool(num_workers) if use_pool else None
+        # bloki dopisywane sa do magazynu w momencie zatwierdzenia
+        self.store = store
+        if store is not None and len(store) > 0:
+            self._load_from_store()
+        else:
+            # tworzenie bloku genesis (wezly jednej sieci dostaja wspolny genesis)
+            if genesis is None:
+                genesis = Block(index=0, prev_hash="0", difficulty=self.difficulty, mode=self.mode)
+                genesis.block_hash = genesis.calculate_hash()
+            self.tree = BlockTree(genesis, self.block_work)
+            if store is not None:
+                store.append(genesis.to_dict())
+
+    def _load_from_store(self):
+        # rekordy czytane strumieniowo, po jednym bloku; bloki z bocznych galezi
+        # trafiaja do drzewa tak samo jak przy dzialaniu wezla
+        for block in self.store.load(Block.from_dict, lambda block_hash: block_hash in self.tree):
+            if self.tree is None:
+                self.tree = BlockTree(block, self.block_work)
+            else:
+                disconnected, connected = self.tree.insert(block)
+                if self.state is not None and connected:
+                    self.state.apply_reorg(disconnected, connected)
+        self.store.sync_main(self.chain)
+        self.block_times = [block.mining_time for block in self.chain[1:]]
+        self.target = self.next_target(self.get_last_block().block_hash)
+
+    @staticmethod
+    def block_work(block: Block) -> int:
+        return block.target.work
+
+    def branch_times(self, parent_hash: str) -> list:
+        """
+        Czasy ostatnich blokow (najwyzej okno polityki) galezi konczacej sie
+        na `parent_hash`: roznice znacznikow czasu kolejnych blokow, od
+        najstarszego. Znacznik czasu jest w naglowku, wiec kazdy wezel liczy
+        te same czasy; blok 1 jest pomijany - genesis sieci ma staly znacznik.
+        """
+        times = []
+        node = self.tree.node(parent_hash)
+        while node.height >= 2 and len(times) < self.retarget.window:
+            times.append(node.block.timestamp - node.parent.block.timestamp)
+            node = node.parent
+        times.reverse()
+        return times
+
+    def next_target(self, parent_hash: str) -> Target:
+        """
+        Cel bloku dolaczanego do `parent_hash` - wynika tylko z galezi rodzica.
+        """
+        if self.retarget is None:
+            return self.initial_target
+        node = self.tree.node(parent_hash)
+        return expected_target(self.retarget, self.initial_target, node.height, node.block.target,
+                               self.branch_times(parent_hash))
+
+    @property
+    def chain(self) -> list:
+        # glowny lancuch - galaz z najwieksza skumulowana praca
+        return self.tree.main
 
     def get_last_block(self) -> Block:
-        return self.chain[-1]
+        return self.tree.main[-1]
+
+    def insert_block(self, block: Block):
+        """
+        Wstawia gotowy (wykopany) blok pod dowolnego rodzica w drzewie, np. blok
+        z konkurencyjnej galezi. Zwraca (odlaczone, dolaczone) bloki glownego lancucha.
+        """
+        if block.block_hash != block.calculate_hash():
+            raise ValueError(f"Blok {block.index}: niezgodny block_hash")
+        if block.block_hash in self.tree:
+            return [], []
+        if block.prev_hash not in self.tree:
+            raise ValueError(f"Nieznany rodzic bloku {block.index}: {block.prev_hash}")
+        # cel wynika z galezi rodzica - blok nie moze sam zadeklarowac latwiejszego
+        if block.target != self.next_target(block.prev_hash):
+            raise ValueError(f"Blok {block.index}: cel PoW niezgodny z historia galezi")
+        if not block.target.is_valid(bytes.fromhex(block.block_hash)):
+            raise ValueError(f"Blok {block.index}: hash nie spelnia celu PoW")
+        if self.verifier is not None:
+            self.verifier.check_block(block)
+        return self._insert(block)
+
+    def _insert(self, block: Block):
+        previous_tip = self.tree.tip
+        disconnected, connected = self.tree.insert(block)
+        if self.state is not None and connected:
+            try:
+                # cofamy tylko odlaczone bloki, stosujemy tylko dolaczone
+                self.state.apply_reorg(disconnected, connected)
+            except ValueError:
+                self.tree.discard(block.block_hash, previous_tip)
+                raise
+        if disconnected:
+            # po reorganizacji weryfikacja przyrostowa zaczyna sie od punktu rozwidlenia
+            self.validated_height = min(self.validated_height, disconnected[0].index)
+        if connected:
+            # nowy czubek (takze z sieci lub po reorganizacji) - cel z jego galezi
+            self.target = self.next_target(self.tree.tip.block.block_hash)
+        if self.mempool is not None:
+            for old in disconnected:
+                self.mempool.add_many(old.transactions)
+            for new in connected:
+                self.mempool.remove_block(new)
+        if self.store is not None:
+            # pozycja w magazynie pozostaje wysokoscia w glownym lancuchu;
+            # dolaczona galaz zaczyna sie na wysokosci len(main) - len(connected)
+            self.store.write_insert(block, disconnected, connected, len(self.chain) - len(connected))
+        return disconnected, connected
 
-    def add_block(self, new_block: Block):
-      
+    def mean_block_time(self, last: int = None) -> float:
+        times = self.block_times[-last:] if last else self.block_times
+        return sum(times) / len(times) if times else 0.0
+
+    def verify_range(self, start: int = 0, stop: int = None, workers: int = None) -> ValidationReport:
+        return verify_blocks(self.chain, start, stop, workers, initial_target=self.initial_target,
+                             retarget=self.retarget)
+
+    def validate(self, workers: int = None) -> ValidationReport:
+        """
+        Pelna weryfikacja lancucha: hashe, warunek PoW i powiazania prev_hash.
+        """
+        report = self.verify_range(0, len(self.chain), workers)
+        self.validated_height = len(self.chain) if report.ok else 0
+        return report
+
+    def validate_new(self, workers: int = None) -> ValidationReport:
+        # tryb przyrostowy - tylko bloki dodane od ostatniej udanej weryfikacji
+        report = self.verify_range(self.validated_height, len(self.chain), workers)
+        if report.ok:
+            self.validated_height = len(self.chain)
+        return report
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool = None
+        if self.store is not None:
+            self.store.sync()
+
+    def prepare_block(self, new_block: Block):
+        """
+        Ustawia rodzica i cel bloku oraz sprawdza jego indeks i transakcje - przed kopaniem.
+        """
+        if new_block.index != len(self.chain):
+            raise ValueError(f"Blok {new_block.index}: indeks niezgodny z wysokoscia rodzica {len(self.chain) - 1}")
         new_block.prev_hash = self.get_last_block().block_hash
         new_block.difficulty = self.difficulty
+        new_block.target = self.target
+        if self.verifier is not None:
+            self.verifier.check_block(new_block)
+        if self.state is not None:
+            # sprawdzamy salda przed kopaniem, zeby nie kopac niepoprawnego bloku
+            self.state.check_block(new_block)
+
+    def commit_block(self, new_block: Block):
+        """
+        Dolacza wykopany blok; cel kolejnego bloku liczy _insert.
+        """
+        self.block_times.append(new_block.mining_time)
+        self._insert(new_block)
+
+    def add_block(self, new_block: Block, stop_event=None) -> bool:
+        self.prepare_block(new_block)
 
-        print(f"[Blockchain] Mining block {new_block.index} with difficulty={self.difficulty}...")
+        if metrics.enabled:
+            metrics.emit("mining_started", index=new_block.index, difficulty=self.difficulty, mode=self.mode)
         start_time = time.time()
 
-        new_block.mine_block()
+        # przerwanie kopania zglasza sam blok (zdarzenie mining_cancelled)
+        if not new_block.mine_block(pool=self.pool, stop_event=stop_event):
+            return False
 
         end_time = time.time()
-        self.chain.append(new_block)
-        print(f"[Blockchain] Block {new_block.index} mined: {new_block.block_hash}")
-        #print(f"             Mining took {end_time - start_time:.4f} seconds\n")
\ No newline at end of file
+        new_block.mining_time = end_time - start_time
+        self.commit_block(new_block)
+        if metrics.enabled:
+            metrics.emit("block_added", index=new_block.index, hash=new_block.block_hash,
+                         mining_time=new_block.mining_time)
+        return True
@@ -1,15 +1,24 @@
 import time
 import matplotlib.pyplot as plt
 import statistics   
-import psutil       
-import threading
-import random
 
-from blockchain import Blockchain, save_blockchain_to_file
+import common_path  # noqa: F401
+from blockchain import Blockchain
+from common.block_store import BlockStore
 from block import Block
-from transaction import Transaction
-
-def measure_and_plot_difficulty(difficulties):
+from common.transaction import Transaction
+from common.resource_sampler import ResourceSampler
+from common.bench_harness import run_case, make_entry, describe, write_results
+import benchmark
+from common.instrumentation import metrics, PrintSink
+from common.montecarlo import block_winners
+from common.cpus import available_cpus
+
+def measure_and_plot_difficulty(difficulties, mode="hex"):
+    """
+    mode: "hex" - trudnosc jako liczba zer hex, "bits" - liczba zerowych bitow
+    (kazdy krok to 2x zamiast 16x), "target" - pelna 256-bitowa liczba.
+    """
     times = []
     print("\n=== Pomiar czasu kopania bloku przy różnych poziomach trudności ===")
     with open("results.txt", "a") as f:
@@ -17,7 +26,7 @@ def measure_and_plot_difficulty(difficulties):
     
     for diff in difficulties:
         print(f"  Kopanie testowego bloku z difficulty={diff}...")
-        test_block = Block(index=999, prev_hash="XYZ", difficulty=diff, use_multiprocessing=False)
+        test_block = Block(index=999, prev_hash="XYZ", difficulty=diff, use_multiprocessing=False, mode=mode)
         
         start_t = time.time()
         test_block.mine_block()
@@ -32,8 +41,9 @@ def measure_and_plot_difficulty(difficulties):
 
     # wykres
     plt.plot(difficulties, times, marker='o')
-    plt.title("Czas kopania bloku vs. poziom trudności (liczba zer)")
-    plt.xlabel("Trudność (liczba zer)")
+    unit = {"hex": "liczba zer", "bits": "liczba zerowych bitów", "target": "cel"}[mode]
+    plt.title(f"Czas kopania bloku vs. poziom trudności ({unit})")
+    plt.xlabel(f"Trudność ({unit})")
     plt.ylabel("Czas [s]")
     plt.show()
 
@@ -42,31 +52,6 @@ def measure_and_plot_difficulty(difficulties):
 
     return times
 
-def monitor_resources(process, stop_monitoring, cpu_measurements, ram_measurements):
-    """
-    Funkcja monitorująca zużycie CPU i RAM w osobnym wątku.
-    """
-    process.cpu_percent(interval=None)
-    for child in process.children(recursive=True):
-        try:
-            child.cpu_percent(interval=0.1)
-        except (psutil.NoSuchProcess, psutil.AccessDenied):
-            pass
-
-    while not stop_monitoring.is_set():
-        children = process.children(recursive=True)
-        cpu_total = process.cpu_percent(interval=0.1)
-        ram_total = process.memory_info().rss / 1024 / 1024
-        for child in children:
-            try:
-                cpu_total += child.cpu_percent(interval=0.1)
-                ram_total += child.memory_info().rss / 1024 / 1024
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
-        cpu_measurements.append(cpu_total)
-        ram_measurements.append(ram_total)
-        time.sleep(0.1)
-
 def main():
     DIFFICULTY = 3
     NUM_BLOCKS = 20
@@ -74,12 +59,14 @@ def main():
     with open("results.txt", "a") as f:
         f.write(f"\n=== Tworzenie łańcucha z difficulty={DIFFICULTY} (liczba bloków: {NUM_BLOCKS}) ===\n")
 
-    my_chain = Blockchain(difficulty=DIFFICULTY)
+    # kazdy blok trafia do pliku w chwili dodania do lancucha
+    store = BlockStore("chain_data.dat", truncate=True)
+    my_chain = Blockchain(difficulty=DIFFICULTY, store=store)
 
     block_times = []
     cpu_usage = []
     ram_usage = []
-    process = psutil.Process()
+    sampler = ResourceSampler()
 
     start_chain_time = time.time()
     for i in range(1, NUM_BLOCKS + 1):
@@ -88,32 +75,22 @@ def main():
         block.transactions.append(Transaction("Nastja", "Igor", 10*i))
         block.transactions.append(Transaction("Igor", "Andrzej", 5*i))
 
-        cpu_measurements = []
-        ram_measurements = []
-        stop_monitoring = threading.Event()
-        monitor_thread = threading.Thread(
-            target=monitor_resources,
-            args=(process, stop_monitoring, cpu_measurements, ram_measurements)
-        )
-        monitor_thread.start()
-
-        my_chain.add_block(block)
-
-        stop_monitoring.set()
-        monitor_thread.join()
+        # pomiar roznicowy przed/po - bez usypiania i bez watku monitorujacego
+        with sampler.measure() as usage:
+            my_chain.add_block(block)
 
         end_block = time.time()
         elapsed_block = end_block - start_block
         block_times.append(elapsed_block)
 
-        cpu_avg = statistics.mean(cpu_measurements) if cpu_measurements else 0.0
-        ram_avg = statistics.mean(ram_measurements) if ram_measurements else 0.0
+        cpu_avg = usage.cpu_percent
+        ram_avg = usage.rss_mb
         cpu_usage.append(cpu_avg)
         ram_usage.append(ram_avg)
 
-        print(f"[Block {i}] Wykopany w {elapsed_block:.3f} s, CPU: {cpu_avg:.1f}%, RAM: {ram_avg:.1f} MB")
+        print(f"[Block {i}] Wykopany w {elapsed_block:.3f} s, CPU: {cpu_avg:.1f}% ({usage.cpu_time:.3f} s), RAM: {ram_avg:.1f} MB, przełączenia kontekstu: {usage.ctx_switches}")
         with open("results.txt", "a") as f:
-            f.write(f"[Block {i}] Wykopany w {elapsed_block:.3f} s, CPU: {cpu_avg:.1f}%, RAM: {ram_avg:.1f} MB\n")
+            f.write(f"[Block {i}] Wykopany w {elapsed_block:.3f} s, CPU: {cpu_avg:.1f}% ({usage.cpu_time:.3f} s), RAM: {ram_avg:.1f} MB, przełączenia kontekstu: {usage.ctx_switches}\n")
 
     end_chain_time = time.time()
     total_chain_time = end_chain_time - start_chain_time
@@ -136,8 +113,8 @@ def main():
         f.write(f"Średnie zużycie CPU: {mean_cpu:.1f}% (±{stdev_cpu:.1f}%)\n")
         f.write(f"Średnie zużycie RAM: {mean_ram:.1f} MB (±{stdev_ram:.1f} MB)\n")
 
-    print("\n=== Zapisujemy łańcuch do pliku chain_data.json ===")
-    save_blockchain_to_file(my_chain.chain, filename="chain_data.json")
+    print("\n=== Łańcuch zapisany w pliku chain_data.dat ===")
+    store.close()
 
     print("\n=== Aktualny stan łańcucha ===")
     with open("results.txt", "a") as f:
@@ -162,238 +139,74 @@ def main():
     with open("results.txt", "a") as f:
         f.write("-------------------\n")
 
-def scenario_4_transaction_load(num_runs=20):
-    DIFFICULTY = 4
-    NUM_BLOCKS = 50
-    TRANSACTIONS_PER_BLOCK = 100
-    results = []
-
-    for run in range(num_runs):
-        print(f"\n=== Scenariusz 4, Uruchomienie {run+1}/{num_runs}: Obciążenie dużą liczbą transakcji (PoW, difficulty={DIFFICULTY}) ===")
-        with open("results.txt", "a") as f:
-            f.write(f"\n=== Scenariusz 4, Uruchomienie {run+1}/{num_runs}: Obciążenie dużą liczbą transakcji (PoW, difficulty={DIFFICULTY}) ===\n")
-
-        my_chain = Blockchain(difficulty=DIFFICULTY)
-
-        mempool = []
-        for i in range(1000):
-            sender = f"User_{random.randint(1, 100)}"
-            receiver = f"User_{random.randint(1, 100)}"
-            amount = random.uniform(0.1, 10.0)
-            mempool.append(Transaction(sender, receiver, amount))
-
-        total_time = 0.0
-        process = psutil.Process()
-        cpu_usage = []
-        ram_usage = []
-
-        for i in range(1, NUM_BLOCKS + 1):
-            block_transactions = mempool[(i-1) * TRANSACTIONS_PER_BLOCK:i * TRANSACTIONS_PER_BLOCK]
-            start_block = time.time()
-            block = Block(index=i, difficulty=DIFFICULTY, use_multiprocessing=False)
-            block.transactions = block_transactions
-
-            cpu_measurements = []
-            ram_measurements = []
-            stop_monitoring = threading.Event()
-            monitor_thread = threading.Thread(
-                target=monitor_resources,
-                args=(process, stop_monitoring, cpu_measurements, ram_measurements)
-            )
-            monitor_thread.start()
-
-            my_chain.add_block(block)
-
-            stop_monitoring.set()
-            monitor_thread.join()
-
-            end_block = time.time()
-            block_time = end_block - start_block
-            total_time += block_time
-
-            cpu_avg = statistics.mean(cpu_measurements) if cpu_measurements else 0.0
-            ram_avg = statistics.mean(ram_measurements) if ram_measurements else 0.0
-            cpu_usage.append(cpu_avg)
-            ram_usage.append(ram_avg)
-
-            print(f"[Block {i}] Wykopany w {block_time:.3f} s, CPU: {cpu_avg:.1f}%, RAM: {ram_avg:.1f} MB")
-            with open("results.txt", "a") as f:
-                f.write(f"[Block {i}] Wykopany w {block_time:.3f} s, CPU: {cpu_avg:.1f}%, RAM: {ram_avg:.1f} MB\n")
-
-        total_transactions = 1000
-        tps = total_transactions / total_time if total_time > 0 else 0
-        mean_cpu = statistics.mean(cpu_usage)
-        mean_ram = statistics.mean(ram_usage)
-
-        print(f"\nŁączny czas przetwarzania {NUM_BLOCKS} bloków: {total_time:.3f} s")
-        print(f"Przepustowość (TPS): {tps:.2f}")
-        print(f"Średnie zużycie CPU: {mean_cpu:.1f}%")
-        print(f"Średnie zużycie RAM: {mean_ram:.1f} MB")
-
-        with open("results.txt", "a") as f:
-            f.write(f"\nŁączny czas przetwarzania {NUM_BLOCKS} bloków: {total_time:.3f} s\n")
-            f.write(f"Przepustowość (TPS): {tps:.2f}\n")
-            f.write(f"Średnie zużycie CPU: {mean_cpu:.1f}%\n")
-            f.write(f"Średnie zużycie RAM: {mean_ram:.1f} MB\n")
-
-        results.append({
-            "run": run + 1,
-            "total_time": total_time,
-            "tps": tps,
-            "mean_cpu": mean_cpu,
-            "mean_ram": mean_ram
-        })
-
-    # obliczam statystyki
-    total_times = [r["total_time"] for r in results]
-    tps_values = [r["tps"] for r in results]
-    cpu_values = [r["mean_cpu"] for r in results]
-    ram_values = [r["mean_ram"] for r in results]
-
-    mean_total_time = statistics.mean(total_times)
-    stdev_total_time = statistics.stdev(total_times) if len(total_times) > 1 else 0.0
-    mean_tps = statistics.mean(tps_values)
-    stdev_tps = statistics.stdev(tps_values) if len(tps_values) > 1 else 0.0
-    mean_cpu = statistics.mean(cpu_values)
-    stdev_cpu = statistics.stdev(cpu_values) if len(cpu_values) > 1 else 0.0
-    mean_ram = statistics.mean(ram_values)
-    stdev_ram = statistics.stdev(ram_values) if len(ram_values) > 1 else 0.0
-
-    print("\n=== Statystyki dla Scenariusza 4 ===")
-    print(f"Średni czas: {mean_total_time:.3f} s (±{stdev_total_time:.3f} s)")
-    print(f"Średni TPS: {mean_tps:.2f} (±{stdev_tps:.2f})")
-    print(f"Średnie zużycie CPU: {mean_cpu:.1f}% (±{stdev_cpu:.1f}%)")
-    print(f"Średnie zużycie RAM: {mean_ram:.1f} MB (±{stdev_ram:.1f} MB)")
-
+def scenario_4_transaction_load(num_runs=20, signed=False, jobs=1, seed=None):
+    # signed=True - transakcje podpisane, weryfikacja podpisow przed kopaniem bloku
+    # jobs > 1 - niezalezne powtorzenia w pulach procesow, seed - powtarzalne losowanie
+    params = dict(difficulty=4, tx_per_block=100, transactions=1000, blocks=50, signed=signed)
+    title = f"Scenariusz 4: Obciążenie dużą liczbą transakcji (PoW, difficulty={params['difficulty']}, {num_runs} uruchomień)"
+    print(f"\n=== {title} ===")
+
+    # przygotowanie, powtorzenia i statystyki w bench_harness - komunikaty
+    # kopania nie sa drukowane w trakcie pomiaru
+    case = run_case(benchmark.tx_load, params, repetitions=num_runs, warmup=1, jobs=jobs, seed=seed)
+    entry = make_entry("tx_load", params, case)
+    stats = entry["metrics"]
+
+    lines = [
+        f"Łączny czas przetwarzania {params['blocks']} bloków: {describe(stats['seconds'])} s",
+        f"Przepustowość (TPS): {describe(stats['tps'], 2)}",
+        f"Czas CPU: {describe(stats['cpu_time'])} s, CPU: {describe(stats['cpu_percent'], 1)}%",
+        f"RAM (szczyt): {describe(stats['rss_mb'], 1)} MB",
+        f"Przełączenia kontekstu: {describe(stats['ctx_switches'], 0)}",
+    ]
+    print("\n".join(lines))
     with open("results.txt", "a") as f:
-        f.write("\n=== Statystyki dla Scenariusza 4 ===\n")
-        f.write(f"Średni czas: {mean_total_time:.3f} s (±{stdev_total_time:.3f} s)\n")
-        f.write(f"Średni TPS: {mean_tps:.2f} (±{stdev_tps:.2f})\n")
-        f.write(f"Średnie zużycie CPU: {mean_cpu:.1f}% (±{stdev_cpu:.1f}%)\n")
-        f.write(f"Średnie zużycie RAM: {mean_ram:.1f} MB (±{stdev_ram:.1f} MB)\n")
-        f.write("-------------------\n")
-
-def scenario_5_51_percent_attack(num_runs=20):
-    DIFFICULTY = 4
-    NUM_BLOCKS = 100
-    results = []
-
-    for run in range(num_runs):
-        print(f"\n=== Scenariusz 5, Uruchomienie {run+1}/{num_runs}: Atak 51% (PoW, difficulty={DIFFICULTY}) ===")
-        with open("results.txt", "a") as f:
-            f.write(f"\n=== Scenariusz 5, Uruchomienie {run+1}/{num_runs}: Atak 51% (PoW, difficulty={DIFFICULTY}) ===\n")
-
-        nodes = {
-            "Honest": 0.4,
-            "Attacker": 0.6
-        }
-        my_chain = Blockchain(difficulty=DIFFICULTY)
-
-        block_counts = {"Honest": 0, "Attacker": 0}
-        process = psutil.Process()
-        cpu_usage = []
-        ram_usage = []
-
-        for i in range(1, NUM_BLOCKS + 1):
-            chosen_node = random.choices(
-                list(nodes.keys()),
-                weights=list(nodes.values()),
-                k=1
-            )[0]
-
-            start_block = time.time()
-            block = Block(index=i, difficulty=DIFFICULTY, use_multiprocessing=False)
-            block.transactions.append(Transaction("User1", "User2", 10*i))
-
-            cpu_measurements = []
-            ram_measurements = []
-            stop_monitoring = threading.Event()
-            monitor_thread = threading.Thread(
-                target=monitor_resources,
-                args=(process, stop_monitoring, cpu_measurements, ram_measurements)
-            )
-            monitor_thread.start()
-
-            my_chain.add_block(block)
-
-            stop_monitoring.set()
-            monitor_thread.join()
-
-            end_block = time.time()
-            block_time = end_block - start_block
-
-            block_counts[chosen_node] += 1
-
-            cpu_avg = statistics.mean(cpu_measurements) if cpu_measurements else 0.0
-            ram_avg = statistics.mean(ram_measurements) if ram_measurements else 0.0
-            cpu_usage.append(cpu_avg)
-            ram_usage.append(ram_avg)
-
-            print(f"[Block {i}] Wykopany przez {chosen_node} w {block_time:.3f} s, CPU: {cpu_avg:.1f}%, RAM: {ram_avg:.1f} MB")
-            with open("results.txt", "a") as f:
-                f.write(f"[Block {i}] Wykopany przez {chosen_node} w {block_time:.3f} s, CPU: {cpu_avg:.1f}%, RAM: {ram_avg:.1f} MB\n")
-
-        print("\n--- Analiza ataku 51% ---")
-        with open("results.txt", "a") as f:
-            f.write("\nAnaliza ataku 51%:\n")
-        for node, count in block_counts.items():
-            percentage = (count / NUM_BLOCKS) * 100
-            print(f"Węzeł {node}: Wygenerował {count} bloków ({percentage:.2f}%)")
-            with open("results.txt", "a") as f:
-                f.write(f"Węzeł {node}: Wygenerował {count} bloków ({percentage:.2f}%)\n")
-
-        mean_cpu = statistics.mean(cpu_usage)
-        mean_ram = statistics.mean(ram_usage)
-        print(f"Średnie zużycie CPU: {mean_cpu:.1f}%")
-        print(f"Średnie zużycie RAM: {mean_ram:.1f} MB")
-        with open("results.txt", "a") as f:
-            f.write(f"Średnie zużycie CPU: {mean_cpu:.1f}%\n")
-            f.write(f"Średnie zużycie RAM: {mean_ram:.1f} MB\n")
-
-        results.append({
-            "run": run + 1,
-            "block_counts": block_counts,
-            "mean_cpu": mean_cpu,
-            "mean_ram": mean_ram
-        })
-
-    # obliczm statystyki
-    honest_counts = [r["block_counts"]["Honest"] for r in results]
-    attacker_counts = [r["block_counts"]["Attacker"] for r in results]
-    cpu_values = [r["mean_cpu"] for r in results]
-    ram_values = [r["mean_ram"] for r in results]
-
-    mean_honest = statistics.mean(honest_counts)
-    stdev_honest = statistics.stdev(honest_counts) if len(honest_counts) > 1 else 0.0
-    mean_attacker = statistics.mean(attacker_counts)
-    stdev_attacker = statistics.stdev(attacker_counts) if len(attacker_counts) > 1 else 0.0
-    mean_cpu = statistics.mean(cpu_values)
-    stdev_cpu = statistics.stdev(cpu_values) if len(cpu_values) > 1 else 0.0
-    mean_ram = statistics.mean(ram_values)
-    stdev_ram = statistics.stdev(ram_values) if len(ram_values) > 1 else 0.0
-
-    print("\n=== Statystyki dla Scenariusza 5 ===")
-    print(f"Średnia liczba bloków Honest: {mean_honest:.1f} (±{stdev_honest:.1f})")
-    print(f"Średnia liczba bloków Attacker: {mean_attacker:.1f} (±{stdev_attacker:.1f})")
-    print(f"Średnie zużycie CPU: {mean_cpu:.1f}% (±{stdev_cpu:.1f}%)")
-    print(f"Średnie zużycie RAM: {mean_ram:.1f} MB (±{stdev_ram:.1f} MB)")
-
+        f.write(f"\n=== {title} ===\n" + "\n".join(lines) + "\n-------------------\n")
+    write_results("scenario_4.json", [entry])
+    return entry
+
+def scenario_5_51_percent_attack(num_runs=20, jobs=1, seed=None):
+    params = dict(difficulty=4, attacker_share=0.6, blocks=100)
+    title = f"Scenariusz 5: Atak 51% (PoW, difficulty={params['difficulty']}, {num_runs} uruchomień)"
+    print(f"\n=== {title} ===")
+
+    case = run_case(benchmark.majority, params, repetitions=num_runs, warmup=1, jobs=jobs, seed=seed)
+    entry = make_entry("majority", params, case)
+    stats = entry["metrics"]
+
+    lines = [
+        f"Średnia liczba bloków Honest: {describe(stats['honest_blocks'], 1)}",
+        f"Średnia liczba bloków Attacker: {describe(stats['attacker_blocks'], 1)}",
+        f"Średni czas 1 bloku: {describe(stats['block_seconds'])} s",
+        f"Czas CPU: {describe(stats['cpu_time'])} s, CPU: {describe(stats['cpu_percent'], 1)}%",
+        f"RAM (szczyt): {describe(stats['rss_mb'], 1)} MB",
+    ]
+    # ta sama odpowiedz statystyczna bez kopania - Monte Carlo na milionie przebiegow
+    share = params["attacker_share"]
+    counts = block_winners([1 - share, share], params["blocks"], 1_000_000)
+    lines.append(f"Monte Carlo (1 000 000 przebiegów): Attacker {counts[:, 1].mean():.1f} ± {counts[:, 1].std():.1f} bloków, "
+                 f"P(większość bloków) = {(counts[:, 1] > params['blocks'] / 2).mean():.4f}")
+    print("\n".join(lines))
     with open("results.txt", "a") as f:
-        f.write("\n=== Statystyki dla Scenariusza 5 ===\n")
-        f.write(f"Średnia liczba bloków Honest: {mean_honest:.1f} (±{stdev_honest:.1f})\n")
-        f.write(f"Średnia liczba bloków Attacker: {mean_attacker:.1f} (±{stdev_attacker:.1f})\n")
-        f.write(f"Średnie zużycie CPU: {mean_cpu:.1f}% (±{stdev_cpu:.1f}%)\n")
-        f.write(f"Średnie zużycie RAM: {mean_ram:.1f} MB (±{stdev_ram:.1f} MB)\n")
-        f.write("-------------------\n")
-
-    # wykres na podstawie srednich 
-    plt.bar(["Honest", "Attacker"], [mean_honest, mean_attacker], yerr=[stdev_honest, stdev_attacker], capsize=5, color=['blue', 'red'])
+        f.write(f"\n=== {title} ===\n" + "\n".join(lines) + "\n-------------------\n")
+    write_results("scenario_5.json", [entry])
+
+    # wykres po pomiarach - srednie z 95% przedzialem ufnosci
+    honest, attacker = stats["honest_blocks"], stats["attacker_blocks"]
+    plt.bar(["Honest", "Attacker"], [honest["mean"], attacker["mean"]],
+            yerr=[honest["ci_high"] - honest["mean"], attacker["ci_high"] - attacker["mean"]],
+            capsize=5, color=['blue', 'red'])
     plt.title("Scenariusz 5: Średnia liczba bloków wygenerowanych przez węzły (Atak 51%)")
     plt.xlabel("Węzeł")
     plt.ylabel("Liczba bloków")
     plt.show()
+    return entry
 
 if __name__ == "__main__":
+    # komunikaty o kazdym bloku w pomiarach pojedynczych blokow
+    printer = PrintSink()
+    metrics.add_sink(printer)
+
     # czyscimy pli 
     with open("results.txt", "w") as f:
         f.write("")
@@ -407,8 +220,15 @@ if __name__ == "__main__":
     # mierzymy czxas kopania i zasoby 
     main()
 
+    # scenariusze mierza czas - bez instrumentacji, takze w procesach roboczych
+    metrics.remove_sink(printer)
+    metrics.disable()
+
+    # powtorzenia scenariuszy sa niezalezne - rownolegle na wszystkich rdzeniach
+    JOBS = available_cpus()
+
     # 1000 transakcji 
-    scenario_4_transaction_load(num_runs=20)
+    scenario_4_transaction_load(num_runs=20, jobs=JOBS)
 
     # atak 51% 
-    scenario_5_51_percent_attack(num_runs=20)
\ No newline at end of file
+    scenario_5_51_percent_attack(num_runs=20, jobs=JOBS)
\ No newline at end of file
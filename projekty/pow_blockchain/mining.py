@@ -0,0 +1,114 @@
+import hashlib
+import common_path  # noqa: F401
+from common.header import HASH_V1, HASH_V3, NONCE, header_prefix
+
+
+# silnik kopania z buforowanym stanem posrednim (midstate) sha256
+class MiningEngine:
+    """
+    Serializuje niezmienna czesc naglowka bloku tylko raz. Obiekt sha256
+    zainicjalizowany prefiksem jest kopiowany (.copy()) dla kazdego nonce,
+    wiec na probe przypada tylko dopisanie nonce i gotowych bajtow transakcji.
+
+    binary_nonce=True oznacza naglowek HASH_V2/HASH_V3: nonce to 8 bajtow na koncu
+    naglowka, suffix jest pusty i koszt proby nie zalezy od liczby transakcji.
+    """
+    def __init__(self, prefix: bytes, suffix: bytes = b"", binary_nonce: bool = False):
+        self.prefix = prefix
+        self.suffix = suffix
+        self.binary_nonce = binary_nonce
+        self.midstate = hashlib.sha256(prefix)
+
+    @classmethod
+    def for_block(cls, block) -> "MiningEngine":
+        if block.hash_version == HASH_V1:
+            prefix = (str(block.index) + block.prev_hash + str(block.timestamp)).encode("utf-8")
+            suffix = block.transactions_data().encode("utf-8")
+            return cls(prefix, suffix)
+        target = block.target.threshold if block.hash_version == HASH_V3 else None
+        prefix = header_prefix(block.index, block.timestamp, block.prev_hash, block.transactions_root(), target)
+        return cls(prefix, binary_nonce=True)
+
+    def encode_nonce(self, nonce: int) -> bytes:
+        if self.binary_nonce:
+            return NONCE.pack(nonce)
+        return str(nonce).encode("ascii")
+
+    def hash_nonce(self, nonce: int) -> str:
+        h = self.midstate.copy()
+        h.update(self.encode_nonce(nonce))
+        h.update(self.suffix)
+        return h.hexdigest()
+
+    def search(self, start: int, stop: int, step: int, threshold: bytes):
+        """
+        Przeszukuje nonce z zakresu [start, stop) co `step`, porownujac
+        digest() z progiem celu (Target.threshold).
+        Zwraca (nonce, liczba_prob); nonce = None gdy nic nie znaleziono.
+        """
+        midstate = self.midstate
+        suffix = self.suffix
+        attempts = 0
+        if self.binary_nonce:
+            pack = NONCE.pack
+            for nonce in range(start, stop, step):
+                h = midstate.copy()
+                h.update(pack(nonce))
+                attempts += 1
+                if h.digest() <= threshold:
+                    return nonce, attempts
+            return None, attempts
+
+        for nonce in range(start, stop, step):
+            h = midstate.copy()
+            h.update(str(nonce).encode("ascii"))
+            h.update(suffix)
+            attempts += 1
+            if h.digest() <= threshold:
+                return nonce, attempts
+        return None, attempts
+
+
+# interfejs backendu haszujacego: search(engine, start, stop, threshold) -> (nonce, liczba_prob)
+class ReferenceBackend:
+    """
+    Domyslny backend - jedna iteracja petli Pythona na kazdy nonce.
+    """
+    name = "reference"
+
+    def search(self, engine: MiningEngine, start: int, stop: int, threshold: bytes):
+        return engine.search(start, stop, 1, threshold)
+
+
+def search_shared(
+    engine: MiningEngine,
+    threshold: bytes,
+    next_nonce,
+    batch_size: int,
+    stop_word,
+    run_value: int,
+    stop_value: int,
+    found_nonce
+) -> int:
+    """
+    Wspolna petla procesow roboczych. Partie nonce pobierane sa ze wspolnego
+    licznika (blokada tylko raz na partie), a slowo stopu czytane jest bez
+    blokady. Zwraca liczbe prob - wywolujacy dodaje ja do sumy raz, na koncu.
+    """
+    attempts = 0
+    while stop_word.value == run_value:
+        with next_nonce.get_lock():
+            start = next_nonce.value
+            next_nonce.value = start + batch_size
+
+        found, batch_attempts = engine.search(start, start + batch_size, 1, threshold)
+        attempts += batch_attempts
+
+        if found is not None:
+            with found_nonce.get_lock():
+                if found_nonce.value == -1:  # pierwszy proces znajdujacy hash
+                    found_nonce.value = found
+            stop_word.value = stop_value
+            break
+
+    return attempts
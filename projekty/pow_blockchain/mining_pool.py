@@ -0,0 +1,109 @@
+import queue
+import multiprocessing
+import common_path  # noqa: F401
+from mining import MiningEngine, search_shared
+from common.cpus import available_cpus
+
+
+# petla procesu roboczego puli
+def pool_worker(
+    task_queue: multiprocessing.Queue,
+    result_queue: multiprocessing.Queue,
+    active_job: multiprocessing.RawValue,
+    next_nonce: multiprocessing.Value,
+    found_nonce: multiprocessing.Value,
+    batch_size: int
+):
+    while True:
+        task = task_queue.get()
+        if task is None:  # sygnal zamkniecia puli
+            break
+
+        job_id, prefix, suffix, binary_nonce, threshold = task
+        attempts = 0
+        if active_job.value == job_id:  # zadanie moglo juz zostac rozwiazane
+            engine = MiningEngine(prefix, suffix, binary_nonce)
+            attempts = search_shared(
+                engine, threshold, next_nonce, batch_size,
+                active_job, job_id, -job_id, found_nonce
+            )
+
+        result_queue.put((job_id, attempts))
+
+
+class MiningPool:
+    """
+    Dlugo zyjaca pula procesow kopiacych. Procesy startuja raz, a dla kazdego
+    bloku dostaja tylko zwarta jednostke pracy: prefiks naglowka (i bajty
+    transakcji w starym schemacie HASH_V1). Zakresy nonce pobierane sa partiami ze wspolnego licznika,
+    a po znalezieniu rozwiazania slowo stopu anuluje pozostala prace.
+    """
+    def __init__(self, num_workers: int = None, batch_size: int = 10_000):
+        self.num_workers = num_workers or available_cpus()
+        self.batch_size = batch_size
+        self.task_queue = multiprocessing.Queue()
+        self.result_queue = multiprocessing.Queue()
+        # wartosci 64-bitowe, slowo stopu czytane bez blokady
+        self.active_job = multiprocessing.RawValue("q", 0)
+        self.next_nonce = multiprocessing.Value("q", 0)
+        self.found_nonce = multiprocessing.Value("q", -1)
+        self._job_id = 0
+        self.processes = []
+        for _ in range(self.num_workers):
+            p = multiprocessing.Process(
+                target=pool_worker,
+                args=(self.task_queue, self.result_queue, self.active_job,
+                      self.next_nonce, self.found_nonce, batch_size),
+                daemon=True
+            )
+            p.start()
+            self.processes.append(p)
+
+    def mine(self, prefix: bytes, suffix: bytes, threshold: bytes, binary_nonce: bool = False, stop_event=None):
+        """
+        Szuka nonce dla podanego naglowka i progu celu (Target.threshold).
+        binary_nonce=True dla naglowkow HASH_V2 (nonce jako 8 bajtow).
+        Ustawienie stop_event anuluje zadanie tak samo jak znalezienie nonce.
+        Zwraca (nonce, liczba_prob); nonce = -1 gdy zadanie przerwano.
+        """
+        self._job_id += 1
+        job_id = self._job_id
+        self.next_nonce.value = 0
+        self.found_nonce.value = -1
+        self.active_job.value = job_id
+
+        for _ in range(self.num_workers):
+            self.task_queue.put((job_id, prefix, suffix, binary_nonce, threshold))
+
+        # czekamy na wszystkie procesy, zeby kolejne zadanie nie nachodzilo na to
+        total_attempts = 0
+        pending = self.num_workers
+        while pending:
+            if stop_event is None:
+                result_job, attempts = self.result_queue.get()
+            else:
+                try:
+                    result_job, attempts = self.result_queue.get(timeout=0.005)
+                except queue.Empty:
+                    if stop_event.is_set() and self.active_job.value == job_id:
+                        self.active_job.value = -job_id
+                    continue
+            if result_job != job_id:
+                continue
+            pending -= 1
+            total_attempts += attempts
+
+        return self.found_nonce.value, total_attempts
+
+    def close(self):
+        for _ in self.processes:
+            self.task_queue.put(None)
+        for p in self.processes:
+            p.join()
+        self.processes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
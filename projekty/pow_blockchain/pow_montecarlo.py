@@ -0,0 +1,126 @@
+import time
+import random
+import argparse
+import numpy as np
+import common_path  # noqa: F401
+from block import Block
+from mining import MiningEngine
+from target import Target
+from common.transaction import Transaction
+from pow_sim import simulate, nakamoto_probability
+from common.montecarlo import block_winners, race
+from common.bench_harness import summarize
+
+# liczba hashy na runde przypadajaca na caly udzial w mocy (1.0) przy kopaniu kontrolnym
+ROUND_HASHES = 20
+
+
+def agreement(real: float, real_se: float, mc: float, mc_se: float) -> str:
+    # roznica w granicach 95% przedzialu dla roznicy dwoch estymatorow
+    return "zgodne" if abs(real - mc) <= 1.96 * (real_se ** 2 + mc_se ** 2) ** 0.5 + 1e-12 else "ROZBIEZNE"
+
+
+def mined_winner(shares, difficulty: int) -> int:
+    """
+    Prawdziwe kopanie jednego bloku przez kilku kopaczy: kazdy ma wlasny
+    naglowek (inna transakcja nagrody) i w kazdej rundzie sprawdza liczbe
+    nonce proporcjonalna do swojego udzialu. Zwraca indeks zwyciezcy.
+    """
+    threshold = Target.from_difficulty(difficulty, "hex").threshold
+    engines = []
+    for i in range(len(shares)):
+        block = Block(index=1, difficulty=difficulty, prev_hash="0" * 64)
+        block.transactions = [Transaction("coinbase", f"Miner_{i}", random.random())]
+        engines.append(MiningEngine.for_block(block))
+    batches = [max(1, round(share * ROUND_HASHES)) for share in shares]
+    nonce = 0
+    while True:
+        best = None
+        for i, (engine, batch) in enumerate(zip(engines, batches)):
+            found, attempts = engine.search(nonce * batch, (nonce + 1) * batch, 1, threshold)
+            # remis w rundzie - wygrywa ten, kto trafil wczesniej w swojej partii
+            if found is not None and (best is None or attempts / batch < best[1]):
+                best = (i, attempts / batch)
+        if best is not None:
+            return best[0]
+        nonce += 1
+
+
+def check_winners(shares, blocks: int, difficulty: int, trials: int, rng: np.random.Generator):
+    started = time.perf_counter()
+    wins = np.bincount([mined_winner(shares, difficulty) for _ in range(blocks)], minlength=len(shares))
+    mined_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    counts = block_winners(shares, blocks, trials, rng)
+    mc_seconds = time.perf_counter() - started
+    print(f"Kopanie (difficulty={difficulty}, {blocks} bloków): {mined_seconds:.2f} s, "
+          f"Monte Carlo ({trials} przebiegów): {mc_seconds:.2f} s")
+    for i, share in enumerate(shares):
+        real = wins[i] / blocks
+        mc = counts[:, i].mean() / blocks
+        real_se = (real * (1 - real) / blocks) ** 0.5
+        mc_se = counts[:, i].std() / blocks / trials ** 0.5
+        print(f"  udział {share:.2f}: kopanie {real:.4f} ± {1.96 * real_se:.4f}, "
+              f"Monte Carlo {mc:.4f} ± {1.96 * mc_se:.4f} - {agreement(real, real_se, mc, mc_se)}")
+
+
+def check_race(share: float, confirmations: int, give_up: int, days: float, runs: int, trials: int,
+               rng: np.random.Generator):
+    # proby ataku w jednej symulacji nie sa niezalezne (wspolny stan sieci) -
+    # niepewnosc liczona z rozrzutu miedzy niezaleznymi symulacjami
+    started = time.perf_counter()
+    rates = [simulate(duration=days * 24 * 3600, attacker_share=share, confirmations=confirmations,
+                      give_up=give_up, seed=random.getrandbits(32)).attack_success_rate for _ in range(runs)]
+    sim_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    result = race([1 - share, share], 1, confirmations, give_up, trials, rng=rng)
+    mc_seconds = time.perf_counter() - started
+    summary = summarize(rates)
+    real_se = (summary["ci_high"] - summary["mean"]) / 1.96
+    print(f"q={share:.2f}: symulacja sieci {summary['mean']:.4f} ± {summary['ci_high'] - summary['mean']:.4f} "
+          f"({runs} x {days:g} dni, {sim_seconds:.1f} s), Monte Carlo {result.success_rate:.4f} ± "
+          f"{1.96 * result.stderr:.4f} ({mc_seconds:.1f} s) - "
+          f"{agreement(summary['mean'], real_se, result.success_rate, result.stderr)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo dla ataku 51% (PoW)")
+    parser.add_argument("--trials", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--check", action="store_true", help="porownanie z prawdziwym kopaniem i symulacja sieci")
+    parser.add_argument("--check-blocks", type=int, default=300, help="liczba kopanych blokow w porownaniu")
+    parser.add_argument("--check-days", type=float, default=28.0, help="dni sieci jednej symulacji w porownaniu")
+    parser.add_argument("--check-runs", type=int, default=5, help="liczba niezaleznych symulacji w porownaniu")
+    args = parser.parse_args()
+    rng = np.random.default_rng(args.seed)
+    random.seed(args.seed)
+
+    # udzialy w mocy obliczeniowej jak w scenariuszu 5 z main.py
+    shares = [0.4, 0.6]
+    blocks = 100
+    started = time.perf_counter()
+    counts = block_winners(shares, blocks, args.trials, rng)
+    print(f"=== Atak 51%: zwycięzcy {blocks} bloków (Honest 0.4 / Attacker 0.6), {args.trials} przebiegów, "
+          f"{time.perf_counter() - started:.2f} s ===")
+    for i, name in enumerate(["Honest", "Attacker"]):
+        print(f"{name}: {counts[:, i].mean():.2f} ± {counts[:, i].std():.2f} bloków")
+    print(f"P(Attacker ma większość bloków) = {(counts[:, 1] > blocks / 2).mean():.4f}")
+
+    print("\n=== Wyścig prywatnej gałęzi (6 potwierdzeń, rezygnacja po 10 blokach straty) ===")
+    for share in (0.1, 0.2, 0.3, 0.4, 0.45):
+        started = time.perf_counter()
+        result = race([1 - share, share], 1, 6, 10, args.trials, rng=rng)
+        print(f"q={share:.2f}: sukces {result.success_rate:.5f} ± {1.96 * result.stderr:.5f}, "
+              f"głębokość reorganizacji {result.mean_depth:.2f}, Nakamoto (bez rezygnacji) "
+              f"{nakamoto_probability(share, 6):.5f}, {time.perf_counter() - started:.2f} s")
+
+    if args.check:
+        print("\n=== Porównanie: prawdziwe kopanie vs Monte Carlo ===")
+        check_winners(shares, args.check_blocks, 2, args.trials, rng)
+        print("\n=== Porównanie: symulacja sieci vs Monte Carlo ===")
+        for share in (0.3, 0.45):
+            check_race(share, 6, 10, args.check_days, args.check_runs, args.trials, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import sys
+import time
+import random
+import asyncio
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import common_path  # noqa: F401
+from block import Block
+from blockchain import Blockchain
+from common.transaction import Transaction
+from common.node import Node
+from common import instrumentation
+
+
+def network_genesis(difficulty: int) -> Block:
+    # staly znacznik czasu - kazdy wezel liczy ten sam blok genesis
+    genesis = Block(index=0, prev_hash="0", difficulty=difficulty)
+    genesis.timestamp = 0.0
+    genesis.block_hash = genesis.calculate_hash()
+    return genesis
+
+
+class PowNode(Node):
+    """
+    Wezel PoW. Kopanie biegnie w executorze (watek, a przy use_pool w lancuchu -
+    pula procesow), wiec petla zdarzen caly czas przyjmuje transakcje i bloki.
+    Gdy z sieci przyjdzie blok zmieniajacy czubek lancucha, biezace zadanie
+    kopania jest przerywane przez stop_event i startuje nowe, na nowym rodzicu.
+    """
+    def __init__(self, chain: Blockchain, mine: bool = True, **kwargs):
+        super().__init__(chain, **kwargs)
+        self.mine = mine
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.stop_event = threading.Event()
+        self.blocks_mined = 0
+        self.blocks_cancelled = 0
+
+    def block_from_dict(self, data: dict) -> Block:
+        return Block.from_dict(data)
+
+    def on_new_tip(self):
+        # konkurencyjny blok - biezace kopanie nie ma juz sensu
+        self.stop_event.set()
+
+    async def produce(self):
+        if not self.mine:
+            return
+        loop = asyncio.get_running_loop()
+        while self.running:
+            transactions = await self.template()
+            if not transactions:
+                self.new_transactions.clear()
+                await self.new_transactions.wait()
+                continue
+
+            parent = self.chain.get_last_block()
+            block = Block(index=parent.index + 1, difficulty=self.chain.difficulty, mode=self.chain.mode)
+            block.transactions = transactions
+            self.chain.prepare_block(block)
+
+            self.stop_event = threading.Event()
+            start_time = time.time()
+            found = await loop.run_in_executor(
+                self.executor, block.mine_block, self.chain.pool, self.stop_event
+            )
+            # blok wykopany na starym rodzicu jest juz nieaktualny
+            if not found or self.chain.get_last_block() is not parent:
+                self.blocks_cancelled += 1
+                continue
+
+            block.mining_time = time.time() - start_time
+            self.chain.commit_block(block)
+            self.blocks_mined += 1
+            self.publish_block(block)
+            if instrumentation.metrics.enabled:
+                instrumentation.metrics.emit("node_block_mined", node=self.name, index=block.index,
+                                             hash=block.block_hash)
+
+    async def close(self):
+        self.stop_event.set()
+        await super().close()
+        self.executor.shutdown()
+
+
+async def run_local_network(num_nodes: int = 3, difficulty: int = 4, num_transactions: int = 200, duration: float = 10.0):
+    """
+    Kilka wezlow na localhost polaczonych w pierscien; transakcje wysylane sa
+    do losowych wezlow, a na koncu sprawdzamy, czy wszystkie maja ten sam czubek.
+    """
+    nodes = [
+        PowNode(Blockchain(difficulty=difficulty, genesis=network_genesis(difficulty)), name=f"node{i}", block_size=20)
+        for i in range(num_nodes)
+    ]
+    for node in nodes:
+        await node.start()
+    for i, node in enumerate(nodes):
+        host, port = nodes[(i + 1) % num_nodes].address
+        await node.connect(host, port)
+
+    for i in range(num_transactions):
+        tx = Transaction(f"User_{random.randint(1, 100)}", f"User_{random.randint(1, 100)}",
+                         random.uniform(0.1, 10.0), fee=random.uniform(0.0, 1.0))
+        random.choice(nodes).submit_transaction(tx)
+        await asyncio.sleep(duration / num_transactions / 2)
+    await asyncio.sleep(duration / 2)
+
+    for node in nodes:
+        node.mine = False
+        node.running = False
+        node.stop_event.set()
+    await asyncio.sleep(0.5)  # ostatnie bloki w drodze
+
+    print("\n=== Stan wezlow ===")
+    for node in nodes:
+        tip = node.chain.get_last_block()
+        print(f"{node.name}: wysokosc {tip.index}, czubek {tip.block_hash[:16]}..., "
+              f"wykopane {node.blocks_mined}, przerwane {node.blocks_cancelled}, mempool {len(node.mempool)}")
+    tips = {node.chain.get_last_block().block_hash for node in nodes}
+    print("Zgodny czubek lancucha" if len(tips) == 1 else "Wezly maja rozne czubki")
+    for node in nodes:
+        await node.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wezel PoW")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--unix", help="sciezka gniazda Unix zamiast TCP")
+    parser.add_argument("--peer", action="append", default=[], help="host:port innego wezla")
+    parser.add_argument("--difficulty", type=int, default=4)
+    parser.add_argument("--no-mine", action="store_true")
+    parser.add_argument("--local", type=int, help="uruchom N wezlow na localhost (test)")
+    instrumentation.add_arguments(parser)
+    args = parser.parse_args()
+    instrumentation.configure(args)
+
+    if args.local:
+        asyncio.run(run_local_network(args.local, args.difficulty))
+        return
+
+    async def run():
+        chain = Blockchain(difficulty=args.difficulty, genesis=network_genesis(args.difficulty))
+        node = PowNode(chain, mine=not args.no_mine)
+        await node.start(port=args.port, path=args.unix)
+        print(f"[node] Nasluchuje na {node.address}")
+        for peer in args.peer:
+            host, port = peer.rsplit(":", 1)
+            await node.connect(host, int(port))
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await node.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import sys
+import math
+import time
+from typing import List
+import common_path  # noqa: F401
+from block import Block
+from blockchain import Blockchain
+from common.simulator import Simulator, Network, SimNode, SimReport, finality_times, build_network
+
+
+def simulation_genesis() -> Block:
+    genesis = Block(index=0, prev_hash="0", difficulty=0)
+    genesis.timestamp = 0.0
+    genesis.block_hash = genesis.calculate_hash()
+    return genesis
+
+
+class PowSimNode(SimNode):
+    """
+    Kopacz z udzialem `hash_share` w mocy sieci. Czas do znalezienia bloku
+    ma rozklad wykladniczy o sredniej block_interval / hash_share, wiec nie
+    trzeba liczyc hashy - lancuch ma trudnosc 0 (kazdy hash spelnia cel),
+    a bloki sa prawdziwymi blokami Blockchain z poprawnym block_hash.
+    Po zmianie czubka kopanie startuje od nowa (brak pamieci w rozkladzie).
+    """
+    def __init__(self, node_id: int, chain: Blockchain, sim: Simulator, network: Network,
+                 block_size: int, hash_share: float, block_interval: float):
+        super().__init__(node_id, chain, sim, network, block_size)
+        self.hash_share = hash_share
+        self.rate = hash_share / block_interval
+        self._job = 0
+        self.blocks_found = 0
+
+    def start(self):
+        self._schedule()
+
+    def _schedule(self):
+        self._job += 1
+        if self.rate > 0:
+            self.sim.schedule(self.sim.rng.expovariate(self.rate), self._found, self._job)
+
+    def make_block(self, parent: Block) -> Block:
+        block = Block(index=parent.index + 1, difficulty=self.chain.difficulty,
+                      prev_hash=parent.block_hash, mode=self.chain.mode)
+        block.timestamp = self.sim.now
+        block.target = self.chain.target
+        block.nonce = 0
+        block.block_hash = block.calculate_hash()
+        self.sim.created[block.block_hash] = self.sim.now
+        self.blocks_found += 1
+        return block
+
+    def _found(self, job: int):
+        if job != self._job:  # zadanie nieaktualne - czubek sie zmienil
+            return
+        self.publish(self.make_block(self.chain.get_last_block()))
+        if job == self._job:
+            self._schedule()
+
+    def on_new_tip(self):
+        self._schedule()
+
+
+class AttackerNode(PowSimNode):
+    """
+    Atakujacy kopie prywatna galaz od biezacego czubka i wstrzymuje jej bloki.
+    Gdy uczciwy blok nad punktem rozwidlenia ma juz `confirmations` potwierdzen,
+    a prywatna galaz jest dluzsza od publicznej, galaz jest ujawniana i przepisuje
+    lancuch (udany atak, np. podwojne wydanie). Przy stracie `give_up` blokow
+    atakujacy rezygnuje i zaczyna od nowa na publicznym czubku.
+    """
+    def __init__(self, *args, confirmations: int = 6, give_up: int = 10, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.honest = False
+        self.confirmations = confirmations
+        self.give_up = give_up
+        self.attacks = 0
+        self.successes = 0
+        self.public_tip = self.chain.get_last_block()
+        self._begin()
+
+    def _begin(self):
+        self.fork = self.chain.get_last_block()
+        self.private_tip = self.fork
+        self.private: List[Block] = []
+
+    def _found(self, job: int):
+        if job != self._job:
+            return
+        block = self.make_block(self.private_tip)
+        self.arrivals[block.block_hash] = self.sim.now
+        self.chain.insert_block(block)
+        self.private.append(block)
+        self.private_tip = block
+        self._check()
+        self._schedule()
+
+    def receive(self, block, origin: int = None):
+        super().receive(block, origin)
+        if block.index > self.public_tip.index:
+            self.public_tip = block
+            self._check()
+
+    def on_new_tip(self):
+        pass  # atakujacy kopie dalej na swojej galezi
+
+    def _check(self):
+        public_height = self.public_tip.index
+        if (self.private_tip.index > public_height
+                and public_height - self.fork.index >= self.confirmations):
+            for block in self.private:
+                self.broadcast(block)
+            self.public_tip = self.private_tip
+            self.attacks += 1
+            self.successes += 1
+            self._begin()
+        elif public_height - self.private_tip.index >= self.give_up:
+            self.attacks += 1
+            self._begin()
+            self._schedule()
+
+
+def nakamoto_probability(q: float, z: int) -> float:
+    """
+    Prawdopodobienstwo dogonienia uczciwego lancucha z z potwierdzeniami (bitcoin.pdf, rozdz. 11).
+    """
+    p = 1.0 - q
+    if q >= p:
+        return 1.0
+    lam = z * q / p
+    total = 1.0
+    for k in range(z + 1):
+        poisson = math.exp(-lam) * lam ** k / math.factorial(k)
+        total -= poisson * (1 - (q / p) ** (z - k))
+    return total
+
+
+def simulate(
+    num_nodes: int = 10,
+    duration: float = 24 * 3600,
+    block_interval: float = 600.0,
+    latency: float = 0.2,
+    bandwidth: float = 1_000_000,
+    block_size: int = 1_000_000,
+    attacker_share: float = 0.0,
+    confirmations: int = 6,
+    give_up: int = 10,
+    partitions=(),
+    seed: int = None
+) -> SimReport:
+    """
+    Symuluje siec PoW przez `duration` sekund czasu sieci. partitions to lista
+    (start, koniec, [zbiory id wezlow]). Przy attacker_share > 0 ostatni wezel
+    jest atakujacym, a reszta mocy dzielona jest rowno miedzy uczciwych.
+    """
+    started = time.perf_counter()
+    sim = Simulator(seed)
+    network = Network(sim, num_nodes, latency, bandwidth)
+    for start, end, groups in partitions:
+        network.add_partition(start, end, groups)
+
+    honest_count = num_nodes - 1 if attacker_share > 0 else num_nodes
+    honest_share = (1.0 - attacker_share) / honest_count
+    nodes = []
+    for node_id in range(num_nodes):
+        chain = Blockchain(difficulty=0, genesis=simulation_genesis())
+        if node_id < honest_count:
+            nodes.append(PowSimNode(node_id, chain, sim, network, block_size, honest_share, block_interval))
+        else:
+            nodes.append(AttackerNode(node_id, chain, sim, network, block_size, attacker_share, block_interval,
+                                      confirmations=confirmations, give_up=give_up))
+    build_network(nodes)
+    for node in nodes:
+        node.start()
+    sim.run(duration)
+
+    observer = nodes[0]
+    attacker = nodes[-1] if attacker_share > 0 else None
+    return SimReport(
+        duration=duration,
+        produced=len(observer.chain.tree.nodes) - 1,
+        main_blocks=len(observer.chain.chain) - 1,
+        finality=finality_times(nodes, sim.created, confirmations),
+        attacks=attacker.attacks if attacker else 0,
+        attack_successes=attacker.successes if attacker else 0,
+        events=sim.events,
+        seconds=time.perf_counter() - started
+    )
+
+
+def main():
+    # uzycie: python pow_sim.py [dni_sieci]
+    days = float(sys.argv[1]) if len(sys.argv) > 1 else 7.0
+    duration = days * 24 * 3600
+
+    print(f"=== Osierocone bloki a czas bloku ({days:g} dni sieci, 10 węzłów, 1 MB bloki, 1 MB/s) ===")
+    for interval in (600, 60, 15):
+        report = simulate(duration=duration, block_interval=interval, seed=1)
+        print(f"czas bloku {interval:4d} s: {report}")
+
+    print("\n=== Podział sieci na 2 godziny ===")
+    report = simulate(duration=duration, seed=1, partitions=[(3600, 3 * 3600, [set(range(5)), set(range(5, 10))])])
+    print(report)
+
+    print(f"\n=== Atak przepisania łańcucha (6 potwierdzeń) - symulacja vs wzór Nakamoto ===")
+    for share in (0.1, 0.2, 0.3, 0.4, 0.45):
+        report = simulate(duration=duration * 4, attacker_share=share, seed=1)
+        print(f"q={share:.2f}: sukces {report.attack_success_rate:.4f} ({report.attack_successes}/{report.attacks}), "
+              f"Nakamoto {nakamoto_probability(share, 6):.4f}, symulacja {report.seconds:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
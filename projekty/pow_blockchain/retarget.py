@@ -0,0 +1,68 @@
+from typing import List
+from target import Target, MAX_TARGET
+
+
+class RetargetPolicy:
+    """
+    Polityka dostosowania trudnosci na podstawie czasow ostatnich blokow.
+
+    method="window" - jak w Bitcoinie: co `window` blokow cel jest skalowany
+                      przez stosunek rzeczywistego do oczekiwanego czasu okna.
+    method="ema"    - po kazdym bloku, na podstawie wykladniczej sredniej
+                      kroczacej czasow z okna `window` blokow.
+    """
+    def __init__(
+        self,
+        target_block_time: float,
+        window: int = 10,
+        method: str = "window",
+        max_adjustment: float = 4.0
+    ):
+        if method not in ("window", "ema"):
+            raise ValueError(f"Nieznana metoda retargetingu: {method}")
+        self.target_block_time = target_block_time
+        self.window = window
+        self.method = method
+        self.max_adjustment = max_adjustment  # maksymalna zmiana celu w jednym kroku
+
+    def next_target(self, current: Target, block_times: List[float], count: int = None) -> Target:
+        """
+        Zwraca cel dla kolejnego bloku. `block_times` to czasy dotychczasowych
+        blokow, od najstarszego - wystarczy ostatnie `window`, gdy `count`
+        podaje liczbe wszystkich czasow w historii (granice okien).
+        """
+        if not block_times:
+            return current
+
+        count = len(block_times) if count is None else count
+        if self.method == "window":
+            if count % self.window != 0:
+                return current
+            actual = sum(block_times[-self.window:])
+            ratio = actual / (self.window * self.target_block_time)
+        else:
+            alpha = 2.0 / (self.window + 1)
+            recent = block_times[-self.window:]
+            ema = recent[0]
+            for t in recent[1:]:
+                ema = alpha * t + (1 - alpha) * ema
+            # tlumimy krok, zeby cel nie oscylowal przy korekcie co blok
+            ratio = 1 + alpha * (ema / self.target_block_time - 1)
+
+        ratio = min(max(ratio, 1 / self.max_adjustment), self.max_adjustment)
+        # dluzszy czas bloku -> wiekszy cel -> latwiej
+        new_value = int(current.value * ratio)
+        return Target(min(max(new_value, 1), MAX_TARGET))
+
+
+def expected_target(policy: RetargetPolicy, initial: Target, parent_height: int, parent_target: Target,
+                    block_times: List[float]) -> Target:
+    """
+    Cel bloku dolaczanego do rodzica na wysokosci `parent_height`. block_times -
+    ostatnie (najwyzej policy.window) czasy blokow galezi rodzica; bez polityki
+    kazdy blok ma cel poczatkowy lancucha.
+    """
+    if policy is None:
+        return initial
+    current = parent_target if parent_height > 0 else initial
+    return policy.next_target(current, block_times, max(parent_height - 1, 0))
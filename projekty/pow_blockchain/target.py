@@ -0,0 +1,56 @@
+MAX_TARGET = 2 ** 256 - 1
+
+
+class Target:
+    """
+    Cel trudnosci PoW jako 256-bitowa liczba: hash jest poprawny, gdy
+    int(hash) <= value. Porownanie odbywa sie bezposrednio na bajtach
+    digest() z wyliczonym raz progiem, bez konwersji do hex.
+    """
+    def __init__(self, value: int):
+        if not 0 <= value <= MAX_TARGET:
+            raise ValueError(f"Target poza zakresem: {value}")
+        self.value = value
+        self.threshold = value.to_bytes(32, "big")
+
+    @classmethod
+    def from_hex_zeros(cls, zeros: int) -> "Target":
+        # odpowiednik hexdigest().startswith("0" * zeros)
+        return cls(2 ** (256 - 4 * zeros) - 1)
+
+    @classmethod
+    def from_zero_bits(cls, bits: int) -> "Target":
+        # kazdy bit to tylko 2x trudniej, zamiast 16x dla cyfry hex
+        return cls(2 ** (256 - bits) - 1)
+
+    @classmethod
+    def from_difficulty(cls, difficulty: int, mode: str = "hex") -> "Target":
+        """
+        mode: "hex" - liczba zer hex, "bits" - liczba zerowych bitow,
+        "target" - pelna 256-bitowa liczba docelowa.
+        """
+        if mode == "hex":
+            return cls.from_hex_zeros(difficulty)
+        if mode == "bits":
+            return cls.from_zero_bits(difficulty)
+        if mode == "target":
+            return cls(difficulty)
+        raise ValueError(f"Nieznany tryb trudnosci: {mode}")
+
+    @property
+    def zero_bits(self) -> int:
+        return 256 - self.value.bit_length()
+
+    @property
+    def work(self) -> int:
+        # oczekiwana liczba hashy potrzebna do trafienia w cel
+        return 2 ** 256 // (self.value + 1)
+
+    def is_valid(self, digest: bytes) -> bool:
+        return digest <= self.threshold
+
+    def __eq__(self, other):
+        return isinstance(other, Target) and self.value == other.value
+
+    def __repr__(self):
+        return f"Target({self.value:#066x})"
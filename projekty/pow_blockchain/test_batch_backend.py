@@ -0,0 +1,50 @@
+import pytest
+import common_path  # noqa: F401
+from batch_backend import BatchBackend
+from block import Block
+from mining import MiningEngine, ReferenceBackend
+from target import Target
+
+# prog, ktory spelnia mniej wiecej co 16. hash
+EASY = Target.from_hex_zeros(1).threshold
+
+
+def found_nonces(backend, engine: MiningEngine, start: int, stop: int, threshold: bytes) -> list:
+    nonces = []
+    while start < stop:
+        nonce, _ = backend.search(engine, start, stop, threshold)
+        if nonce is None:
+            break
+        nonces.append(nonce)
+        start = nonce + 1
+    return nonces
+
+
+@pytest.mark.parametrize("binary_nonce", [False, True])
+def test_batch_backend_matches_reference(binary_nonce):
+    engine = MiningEngine(b"prefix", b"" if binary_nonce else b"suffix", binary_nonce=binary_nonce)
+    # zakres przechodzi przez granice liczby cyfr (99 -> 100, 999 -> 1000)
+    batch = BatchBackend(batch_size=64)
+    expected = found_nonces(ReferenceBackend(), engine, 90, 1100, EASY)
+    assert expected and found_nonces(batch, engine, 90, 1100, EASY) == expected
+    for nonce in expected[:5]:
+        assert bytes.fromhex(engine.hash_nonce(nonce)) <= EASY
+
+
+def test_batch_backend_counts_attempts():
+    engine = MiningEngine(b"prefix", b"suffix")
+    backend = BatchBackend(batch_size=32)
+    # prog zerowy - brak rozwiazania, liczone sa wszystkie proby
+    assert backend.search(engine, 5, 205, bytes(32)) == (None, 200)
+    nonce, attempts = backend.search(engine, 5, 205, b"\xff" * 32)
+    assert (nonce, attempts) == (5, 1)
+
+    expected = ReferenceBackend().search(engine, 0, 2000, EASY)
+    assert backend.search(engine, 0, 2000, EASY) == expected
+
+
+def test_block_mined_with_batch_backend():
+    block = Block(index=1, difficulty=2, backend=BatchBackend(batch_size=256))
+    assert block.mine_block()
+    assert block.block_hash == block.calculate_hash()
+    assert block.target.is_valid(bytes.fromhex(block.block_hash))
@@ -0,0 +1,181 @@
+import pytest
+import common_path  # noqa: F401
+from block import Block
+from blockchain import Blockchain
+from common.block_store import BlockStore
+from common.chain_reader import ChainReader
+from retarget import RetargetPolicy
+from target import Target, MAX_TARGET
+from common.transaction import Transaction
+from validation import verify_blocks
+from common.instrumentation import metrics
+
+
+def mine(chain: Blockchain, count: int, tag: str = "tx") -> list:
+    blocks = []
+    for _ in range(count):
+        block = Block(index=len(chain.chain), difficulty=chain.difficulty, mode=chain.mode)
+        block.transactions = [Transaction(tag, f"{tag}-{len(chain.chain)}", 1.0)]
+        chain.add_block(block)
+        blocks.append(block)
+    return blocks
+
+
+def forked_chain(store: BlockStore = None):
+    """
+    Lancuch z 3 blokami, potem konkurencyjna galaz z 4 blokow od bloku 1.
+    """
+    chain = Blockchain(1, store=store)
+    mine(chain, 3, "a")
+    rival = Blockchain(1, genesis=chain.chain[0])
+    rival.insert_block(chain.chain[1])
+    fork = mine(rival, 4, "b")
+    return chain, fork
+
+
+def test_fork_reorg_and_chain_reader_walk(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    store = BlockStore(path)
+    chain, fork = forked_chain(store)
+    old_main = list(chain.chain)
+
+    for block in fork[:2]:
+        assert chain.insert_block(block) == ([], [])
+    disconnected, connected = chain.insert_block(fork[2])
+    assert disconnected == old_main[2:]
+    assert connected == fork[:3]
+    chain.insert_block(fork[3])
+    assert chain.chain == old_main[:2] + fork
+    store.sync()
+
+    # pozycja w magazynie to wysokosc w glownym lancuchu
+    with ChainReader(path, Block) as reader:
+        assert len(reader) == len(chain.chain)
+        for height, (stored, block) in enumerate(zip(reader, chain.chain)):
+            assert stored.index == height
+            assert stored.block_hash == block.block_hash
+            assert height == 0 or stored.prev_hash == chain.chain[height - 1].block_hash
+        report = verify_blocks(reader, workers=1, chunk_size=2, initial_target=chain.initial_target)
+        assert report.ok, report.errors
+
+
+def test_reload_forked_store(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    store = BlockStore(path)
+    chain, fork = forked_chain(store)
+    for block in fork:
+        chain.insert_block(block)
+    store.close()
+
+    reloaded = Blockchain(1, store=BlockStore(path))
+    assert [b.block_hash for b in reloaded.chain] == [b.block_hash for b in chain.chain]
+    assert len(reloaded.tree) == len(chain.tree)
+    assert reloaded.validate(workers=1).ok
+
+
+def test_duplicate_block_is_not_stored_twice(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    store = BlockStore(path)
+    chain, fork = forked_chain(store)
+    chain.insert_block(fork[0])
+    assert chain.insert_block(fork[0]) == ([], [])
+    assert len(list(store.side_records())) == 1
+
+
+def test_block_index_must_follow_parent_height(tmp_path):
+    path = str(tmp_path / "chain.dat")
+    store = BlockStore(path)
+    chain = Blockchain(1, store=store)
+    with pytest.raises(ValueError, match="indeks"):
+        chain.add_block(Block(index=57, difficulty=1))
+    wrong = Block(index=57, difficulty=1, prev_hash=chain.get_last_block().block_hash)
+    wrong.mine_block()
+    with pytest.raises(ValueError, match="indeks"):
+        chain.insert_block(wrong)
+
+    # fork od genesis po odrzuconych blokach - magazyn dalej trzyma wysokosci
+    mine(chain, 1, "a")
+    rival = Blockchain(1, genesis=chain.chain[0])
+    for block in mine(rival, 2, "b"):
+        chain.insert_block(block)
+    store.sync()
+    with ChainReader(path, Block) as reader:
+        assert [b.index for b in reader] == [0, 1, 2]
+        assert [b.block_hash for b in reader] == [b.block_hash for b in chain.chain]
+
+
+def test_easy_target_rejected():
+    chain = Blockchain(2)
+    mine(chain, 1)
+    block = Block(index=2, difficulty=0, prev_hash=chain.get_last_block().block_hash)
+    block.target = Target(MAX_TARGET)
+    block.mine_block()
+    with pytest.raises(ValueError, match="cel PoW"):
+        chain.insert_block(block)
+    assert len(chain.tree) == 2
+
+
+def test_target_is_committed_in_header():
+    chain = Blockchain(1)
+    block = mine(chain, 1)[0]
+    block.target = Target(MAX_TARGET)
+    assert block.calculate_hash() != block.block_hash
+
+
+def test_validation_recomputes_retarget_history():
+    policy = RetargetPolicy(1e-4, window=2)
+    chain = Blockchain(1, retarget=policy)
+    mine(chain, 7)
+    assert chain.validate(workers=1).ok
+    # inny wezel z ta sama polityka przyjmuje te same bloki
+    other = Blockchain(1, retarget=policy, genesis=chain.chain[0])
+    for block in chain.chain[1:]:
+        other.insert_block(block)
+    assert other.target == chain.target
+
+    forged = chain.chain[5]
+    forged.target = Target(MAX_TARGET)
+    forged.block_hash = forged.calculate_hash()
+    report = verify_blocks(chain.chain, workers=1, initial_target=chain.initial_target, retarget=policy)
+    assert (5, "cel PoW niezgodny z historia galezi") in report.errors
+
+
+def test_legacy_records_are_flagged():
+    chain = Blockchain(1)
+    mine(chain, 2)
+    records = [block.to_dict() for block in chain.chain]
+    for record in records:
+        del record["target"]
+        record["hash_version"] = 2
+    legacy = [Block.from_dict(record) for record in records]
+    for block in legacy:
+        block.block_hash = block.calculate_hash()
+        assert block.legacy and "target" not in block.to_dict()
+    for block, prev in zip(legacy[1:], legacy):
+        block.prev_hash = prev.block_hash
+        block.block_hash = block.calculate_hash()
+
+    report = verify_blocks(legacy, workers=1, initial_target=chain.initial_target)
+    assert report.errors == []
+    assert report.legacy == [1, 2]
+    assert not report.ok
+
+
+def test_mining_reports_to_metric_sinks():
+    events = []
+
+    def sink(event: str, fields: dict):
+        events.append((event, fields))
+
+    metrics.reset()
+    metrics.add_sink(sink)
+    try:
+        chain = Blockchain(2)
+        block = mine(chain, 1)[0]
+    finally:
+        metrics.remove_sink(sink)
+        metrics.disable()
+    assert [event for event, _ in events] == ["mining_started", "block_sealed", "block_added"]
+    assert events[1][1]["attempts"] == block.attempts
+    assert metrics.counters["hashes_total"].value == block.attempts
+    assert metrics.counters["blocks_sealed_total"].value == 1
@@ -0,0 +1,36 @@
+import threading
+import common_path  # noqa: F401
+from block import Block
+from mining_pool import MiningPool
+from common.cpus import available_cpus
+
+
+def test_pool_mines_valid_blocks():
+    with MiningPool(2, batch_size=500) as pool:
+        for index in (1, 2):
+            block = Block(index=index, difficulty=2)
+            assert block.mine_block(pool=pool)
+            assert block.block_hash == block.calculate_hash()
+            assert block.target.is_valid(bytes.fromhex(block.block_hash))
+
+
+def test_stop_event_cancels_job_and_pool_stays_usable():
+    with MiningPool(2, batch_size=500) as pool:
+        block = Block(index=1, difficulty=2)
+        engine = block._engine()
+        stop_event = threading.Event()
+        timer = threading.Timer(0.2, stop_event.set)
+        timer.start()
+        # prog zerowy - rozwiazania nie ma, zadanie konczy tylko stop_event
+        nonce, attempts = pool.mine(engine.prefix, engine.suffix, bytes(32), engine.binary_nonce, stop_event)
+        timer.join()
+        assert nonce == -1 and attempts > 0
+
+        # kolejne zadanie nie widzi stanu przerwanego
+        assert block.mine_block(pool=pool)
+        assert block.target.is_valid(bytes.fromhex(block.block_hash))
+
+
+def test_default_size_follows_available_cpus():
+    with MiningPool() as pool:
+        assert pool.num_workers == available_cpus() == len(pool.processes)
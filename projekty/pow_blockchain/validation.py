@@ -0,0 +1,93 @@
+import time
+from collections import deque
+from typing import List, Sequence, Tuple
+import common_path  # noqa: F401
+from block import Block
+from target import Target
+from retarget import RetargetPolicy, expected_target
+from common.validation import ValidationReport, read_records, check_links, check_chunks
+
+
+def _link(block: Block) -> tuple:
+    return (block.index, block.prev_hash, block.block_hash, block.timestamp, block.target.value, block.legacy)
+
+
+def check_records(records: List[dict]):
+    """
+    Sprawdza bloki niezaleznie od siebie: przelicza hash i warunek PoW.
+    Zwraca (bledy, [(index, prev_hash, block_hash, timestamp, cel, legacy)])
+    do sprawdzenia powiazan i celow. Bloki legacy nie maja celu - nie sa
+    sprawdzane wzgledem wymyslonego MAX_TARGET, tylko oznaczane.
+    """
+    errors = []
+    links = []
+    for record in records:
+        block = Block.from_dict(record)
+        block_hash = block.calculate_hash()
+        if block_hash != block.block_hash:
+            errors.append((block.index, "niezgodny block_hash"))
+        elif block.index > 0 and not block.legacy and not block.target.is_valid(bytes.fromhex(block_hash)):
+            errors.append((block.index, "hash nie spelnia celu PoW"))
+        links.append(_link(block))
+    return errors, links
+
+
+def check_range(path: str, start: int, stop: int):
+    return check_records(read_records(path, Block, start, stop))
+
+
+def check_targets(links: List[tuple], history: List[tuple], initial_target: Target,
+                  retarget: RetargetPolicy = None) -> List[Tuple[int, str]]:
+    """
+    Cel kazdego bloku musi byc celem wyliczonym z galezi jego rodzica (jak
+    Blockchain.next_target) - blok nie moze sam zadeklarowac latwiejszego celu.
+    `history` to bloki tuz przed zakresem (najwyzej okno polityki + 1).
+    """
+    errors = []
+    window = retarget.window if retarget is not None else 1
+    times = deque(maxlen=window)
+    prev = None
+    for position, link in enumerate(history + links):
+        if prev is not None:
+            if position >= len(history) and link[0] > 0 and not link[5] and not prev[5]:
+                expected = expected_target(retarget, initial_target, prev[0], Target(prev[4]), list(times))
+                if link[4] != expected.value:
+                    errors.append((link[0], "cel PoW niezgodny z historia galezi"))
+            if link[0] >= 2:
+                times.append(link[3] - prev[3])
+        prev = link
+    return errors
+
+
+def verify_blocks(
+    blocks: Sequence[Block],
+    start: int = 0,
+    stop: int = None,
+    workers: int = None,
+    chunk_size: int = 256,
+    initial_target: Target = None,
+    retarget: RetargetPolicy = None
+) -> ValidationReport:
+    """
+    Weryfikuje bloki [start, stop). Zakres dzielony jest na paczki sprawdzane
+    w puli procesow; male zakresy i workers=1 sprawdzane sa w biezacym procesie.
+    `blocks` to lista blokow lancucha albo ChainReader - wtedy procesy robocze
+    dostaja tylko zakresy wysokosci i czytaja rekordy z pliku same.
+    Cele blokow porownywane sa z celami z polityki `retarget` liczonymi od
+    `initial_target` (domyslnie cel bloku genesis).
+    """
+    stop = len(blocks) if stop is None else stop
+    start_t = time.perf_counter()
+
+    errors, links = check_chunks(blocks, start, stop, workers, chunk_size, check_records, check_range)
+    prev = _link(blocks[start - 1]) if start > 0 else None
+    errors.extend(check_links(links, prev))
+
+    if links:
+        initial_target = initial_target if initial_target is not None else blocks[0].target
+        window = retarget.window if retarget is not None else 0
+        history = [_link(block) for block in blocks[max(start - window - 1, 0):start]]
+        errors.extend(check_targets(links, history, initial_target, retarget))
+    legacy = [link[0] for link in links if link[5] and link[0] > 0]
+
+    return ValidationReport(start, stop, sorted(errors), time.perf_counter() - start_t, legacy)